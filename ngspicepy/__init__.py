@@ -19,15 +19,26 @@ The library can be used in two ways.
 
 """
 from .netlist import *
-from .ngspicepy import clear_plots, current_plot, get_all_data, get_data,\
-    get_plot_names, get_vector_names, libngspice, load_netlist, reset, run_ac,\
-    run_dc, run_op, run_tran, send_command, set_options
+from .plot import Plot, PlotManager, Vector
+from .worker import Worker, WorkerPool
+from .ngspicepy import clear_plots, current_plot, Dispatcher, get_all_data,\
+    get_data, get_errors, get_plot_names, get_scale_name, get_vector_names,\
+    libngspice, load_netlist, NetlistBuffer, reset, run_ac, run_dc, run_op,\
+    run_tran, send_command, set_options
 
 
 del ngspicepy
 del netlist
+del template
+del graph
+del diff
+del builder
 
 __all__ = ("send_command", "run_dc", "run_ac", "run_tran", "run_op",
            "get_plot_names", "current_plot", "get_vector_names", "get_data",
-           "get_all_data", "set_options", "load_netlist", "Netlist",
+           "get_errors", "get_scale_name", "get_all_data", "set_options",
+           "load_netlist",
+           "Netlist", "NetlistTemplate", "CircuitBuilder", "NetlistGraph",
+           "NetlistDiff", "NetlistBuffer", "Dispatcher",
+           "Plot", "Vector", "PlotManager", "Worker", "WorkerPool",
            "clear_plots", "reset", "libngspice")
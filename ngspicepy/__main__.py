@@ -0,0 +1,7 @@
+"""Run the batch runner, see ngspicepy.batch."""
+import sys
+
+from ngspicepy.batch import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""
+Batch Runner
+============
+
+Runs a JSONL file of jobs, one JSON object per line, across worker processes
+and stores the results of each job in its own directory. It is available as
+the ngspicepy-batch command and as python -m ngspicepy.
+
+A job has the keys:
+
+    id
+        The name of the job's output directory. Defaults to 'job<line>'.
+    netlist
+        The path of a netlist file or the netlist text.
+    analyses
+        A list of analyses, e.g. ["op", "tran 1u 10m", ["ac", "dec 10 1 1g"]].
+        Defaults to ["op"].
+    save
+        A list of the vectors to store. All vectors are stored by default.
+    params
+        A dictionary of .param overrides.
+
+Each analysis is stored as '<output>/<id>/<analysis>.npz' with one array per
+vector, e.g. 'results/amp1/tran.npz', and the status and simulation time of
+the job in 'status.json'. Jobs that already succeeded are skipped, so an
+interrupted batch can be resumed by running it again.
+
+Example
+-------
+
+    $ ngspicepy-batch jobs.jsonl -o results -j 8 --timeout 600
+    ok      amp1                     0.412s
+    failed  amp2                     0.000s  ValueError: Invalid netlist ...
+    2 jobs: 1 ok, 1 failed, 0 skipped in 1.023s
+"""
+from .runner import main, prepare_job, read_jobs, run_batch, run_job,\
+    simulate_job, write_results
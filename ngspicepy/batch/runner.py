@@ -0,0 +1,268 @@
+"""The batch runner."""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import as_completed, Future
+
+import numpy as np
+
+from ngspicepy.netlist import Netlist, NetlistTemplate
+from ngspicepy.optimize.evaluator import simulate
+from ngspicepy.worker.pool import WorkerPool
+
+
+def check_job_id(job_id):
+    """Raise a ValueError if a job id can't be used as a directory name."""
+    if not job_id or os.sep in job_id or job_id in ('.', '..'):
+        raise ValueError('Invalid job id: ' + job_id)
+
+
+def read_jobs(lines):
+    """Parse a JSONL stream of jobs.
+
+    Returns a list of job dictionaries. Blank lines are skipped and jobs
+    without an id get 'job<line number>'. A ValueError is raised for lines
+    that aren't JSON objects, for duplicate ids and for ids that can't be
+    used as directory names.
+    """
+    jobs = []
+    ids = set()
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            job = json.loads(line)
+        except ValueError as e:
+            raise ValueError('Invalid job on line ' + str(number) + ': ' +
+                             str(e))
+        if not isinstance(job, dict):
+            raise ValueError('Invalid job on line ' + str(number))
+        job_id = str(job.setdefault('id', 'job' + str(number)))
+        check_job_id(job_id)
+        if job_id in ids:
+            raise ValueError('Duplicate job id: ' + job_id)
+        ids.add(job_id)
+        jobs.append(job)
+    return jobs
+
+
+def prepare_job(job, templates=None):
+    """Return the netlist lines and the analyses of a job.
+
+    The netlist is checked and the parameter overrides are applied. Analyses
+    are given either as strings, e.g. 'dc v1 0 1 0.1', or as lists of the
+    arguments of Netlist.add_analysis(), e.g. ['ac', 'dec 10 1 1meg'].
+
+    If templates is a dictionary, it is used to cache a NetlistTemplate for
+    each netlist, so that jobs sharing a netlist only read it once.
+    """
+    if 'netlist' not in job:
+        raise KeyError('The job has no netlist')
+
+    params = job.get('params', {})
+    if templates is not None and type(job['netlist']) == str:
+        template = templates.get(job['netlist'])
+        if template is None:
+            template = templates[job['netlist']] =\
+                NetlistTemplate(job['netlist'])
+        netlist_list = template.overrides(**params)
+    elif params:
+        netlist_list = NetlistTemplate(job['netlist']).overrides(**params)
+    else:
+        netlist_list = Netlist(job['netlist']).netlist
+
+    analyses = []
+    for analysis in job.get('analyses', ['op']):
+        if isinstance(analysis, str):
+            sim_type, _, args = analysis.strip().partition(' ')
+            analysis = [sim_type, args] if args.strip() else [sim_type]
+        analyses.append(tuple(analysis))
+    if not analyses:
+        raise ValueError('The job has no analyses')
+    return netlist_list, analyses
+
+
+def is_scale(vector_name):
+    """Return True if a vector is the scale of its plot."""
+    return vector_name in ('time', 'frequency') or\
+        vector_name.endswith('-sweep')
+
+
+def simulate_job(netlist_list, analyses, save=None):
+    """Simulate a job and return its results and simulation time.
+
+    The results are a dictionary of the analyses' dictionaries of arrays,
+    see ngspicepy.optimize.simulate(). If save is given, only the named
+    vectors and the scales are kept.
+    """
+    start = time.time()
+    results = simulate(netlist_list, analyses)
+    elapsed = time.time() - start
+
+    if save is not None:
+        saved = set(name.lower() for name in save)
+        results = dict((name, dict((vector_name, data)
+                                   for vector_name, data in vectors.items()
+                                   if vector_name.lower() in saved or
+                                   is_scale(vector_name)))
+                       for name, vectors in results.items())
+    return results, elapsed
+
+
+def write_results(job_dir, results):
+    """Store each analysis of a job in '<analysis name>.npz' in job_dir."""
+    os.makedirs(job_dir, exist_ok=True)
+    for name, vectors in results.items():
+        np.savez(os.path.join(job_dir, name + '.npz'), **vectors)
+
+
+def run_job(job_dir, netlist_list, analyses, save=None):
+    """Simulate a job and write its results to job_dir.
+
+    Each analysis is stored in '<analysis name>.npz' with one array per
+    vector. If save is given, only the named vectors and the scales are
+    stored. Returns the time taken by the simulation in seconds.
+    """
+    results, elapsed = simulate_job(netlist_list, analyses, save)
+    write_results(job_dir, results)
+    return elapsed
+
+
+def job_status(output, job_id):
+    """Return the status stored for a job, or None if it hasn't run."""
+    status_file = os.path.join(output, job_id, 'status.json')
+    if not os.path.isfile(status_file):
+        return None
+    with open(status_file) as f:
+        return json.load(f)
+
+
+def write_status(output, job_id, status):
+    """Store the status of a job. It is written last, marking it as done."""
+    job_dir = os.path.join(output, job_id)
+    os.makedirs(job_dir, exist_ok=True)
+    with open(os.path.join(job_dir, 'status.json.tmp'), 'w') as f:
+        json.dump(status, f)
+    os.replace(os.path.join(job_dir, 'status.json.tmp'),
+               os.path.join(job_dir, 'status.json'))
+
+
+def run_batch(jobs, output, workers=1, timeout=None, force=False,
+              stream=None):
+    """Run jobs and write their results under the output directory.
+
+    Jobs whose results already exist are skipped unless force is True, so an
+    interrupted batch resumes where it stopped. Failed jobs are run again.
+    A line with the status and timing of each job is printed to stream as it
+    finishes.
+
+    Parameters:
+        jobs
+            A list of job dictionaries, see read_jobs().
+        output
+            The directory in which each job gets a directory named after
+            its id.
+        workers
+            The number of worker processes. The jobs are run in this process
+            if it is 0.
+        timeout
+            The number of seconds after which a job in a worker is
+            considered to be hung.
+        force
+            Run all jobs even if their results exist.
+        stream
+            The file to print to. Defaults to sys.stdout.
+
+    Returns a dictionary with the number of jobs that were 'ok', 'failed'
+    and 'skipped'.
+    """
+    stream = sys.stdout if stream is None else stream
+    counts = {'ok': 0, 'failed': 0, 'skipped': 0}
+    for job in jobs:
+        check_job_id(str(job['id']))
+
+    def finish(job_id, future):
+        exception = future.exception()
+        if exception is None:
+            status = {'status': 'ok', 'time': future.result()}
+        else:
+            status = {'status': 'failed', 'time': 0.0,
+                      'error': type(exception).__name__ + ': ' +
+                      str(exception)}
+        write_status(output, job_id, status)
+        counts[status['status']] += 1
+        line = '{:<7} {:<20} {:9.3f}s'.format(status['status'], job_id,
+                                               status['time'])
+        if 'error' in status:
+            line += '  ' + status['error']
+        print(line, file=stream)
+        stream.flush()
+
+    os.makedirs(output, exist_ok=True)
+    pool = WorkerPool(workers, timeout=timeout) if workers else None
+    templates = {}
+    try:
+        futures = {}
+        for job in jobs:
+            job_id = str(job['id'])
+            if not force:
+                status = job_status(output, job_id)
+                if status is not None and status['status'] == 'ok':
+                    counts['skipped'] += 1
+                    continue
+
+            future = Future()
+            try:
+                netlist_list, analyses = prepare_job(job, templates)
+                args = (os.path.join(output, job_id), netlist_list, analyses,
+                        job.get('save'))
+                if pool is not None:
+                    futures[pool.submit(run_job, *args)] = job_id
+                    continue
+                future.set_result(run_job(*args))
+            except Exception as e:
+                future.set_exception(e)
+            finish(job_id, future)
+
+        for future in as_completed(futures):
+            finish(futures[future], future)
+    finally:
+        if pool is not None:
+            pool.close()
+    return counts
+
+
+def main(argv=None):
+    """Run the batch runner from the command line.
+
+    Returns the exit status: 0 if all jobs succeeded and 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        prog='ngspicepy-batch',
+        description='Run a JSONL file of ngspice jobs.')
+    parser.add_argument('jobs', help="the JSONL job file, or '-' for stdin")
+    parser.add_argument('-o', '--output', default='results',
+                        help='the output directory (default: results)')
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help='the number of worker processes, 0 to run the '
+                        'jobs in this process (default: 1)')
+    parser.add_argument('-t', '--timeout', type=float, default=None,
+                        help='the timeout of a job in seconds')
+    parser.add_argument('-f', '--force', action='store_true',
+                        help='run the jobs whose results exist as well')
+    args = parser.parse_args(argv)
+
+    if args.jobs == '-':
+        jobs = read_jobs(sys.stdin)
+    else:
+        with open(args.jobs) as f:
+            jobs = read_jobs(f)
+
+    start = time.time()
+    counts = run_batch(jobs, args.output, args.workers, args.timeout,
+                       args.force)
+    print('{} jobs: {ok} ok, {failed} failed, {skipped} skipped in '
+          '{:.3f}s'.format(len(jobs), time.time() - start, **counts))
+    return 1 if counts['failed'] else 0
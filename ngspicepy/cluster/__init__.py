@@ -0,0 +1,35 @@
+"""
+Cluster Runner
+==============
+
+A Coordinator shards a list of jobs, e.g. a parameter sweep or a Monte Carlo
+analysis, across nodes on any number of hosts over plain TCP. No broker is
+needed: nodes connect to the Coordinator, ask for a job whenever they're
+idle and send back the results, which the Coordinator stores in the output
+format of the batch runner (see ngspicepy.batch). Idle nodes steal copies of
+slow jobs at the end of a run, and the jobs of nodes that die or stop
+sending heartbeats are handed out again.
+
+The jobs have the format of the batch runner. Netlist files are read by the
+Coordinator, so the nodes don't need them. The messages are pickled, so the
+Coordinator and the nodes require a shared authkey on TCP addresses.
+
+Example
+-------
+
+On the coordinating host:
+
+    >>> jobs = monte_carlo_jobs('CS-Amp.cir', ['ac dec 10 1 1g'], 1000,
+    ...                         {'vth': (0.4, 0.02)}, save=['v(out)'], seed=1)
+    >>> coordinator = Coordinator(('0.0.0.0', 9000), jobs, 'results',
+    ...                           authkey=b'secret')
+    >>> coordinator.run()
+
+On each host, from the command line:
+
+    $ ngspicepy-cluster node coordinator-host:9000 -j 8 -k secret
+"""
+from .coordinator import Coordinator
+from .jobs import monte_carlo_jobs, sweep_jobs
+from .node import run_node, start_nodes
+from .cli import main
@@ -0,0 +1,7 @@
+"""Run the cluster runner, see ngspicepy.cluster."""
+import sys
+
+from ngspicepy.cluster import main
+
+if __name__ == '__main__':
+    sys.exit(main())
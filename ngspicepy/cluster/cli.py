@@ -0,0 +1,71 @@
+"""The command line interface of the cluster runner."""
+import argparse
+import sys
+import time
+
+from ngspicepy.batch.runner import read_jobs
+from ngspicepy.server.server import parse_address
+
+from .coordinator import Coordinator
+from .node import run_node, start_nodes
+
+
+def main(argv=None):
+    """Run a Coordinator or nodes from the command line.
+
+    Returns the exit status. For a Coordinator, it is 1 if a job failed.
+    """
+    parser = argparse.ArgumentParser(
+        prog='ngspicepy-cluster',
+        description='Run ngspice jobs on a cluster of nodes.')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    coordinator = commands.add_parser('coordinator',
+                                      help='hand out the jobs of a file')
+    coordinator.add_argument('jobs',
+                             help="the JSONL job file, or '-' for stdin")
+    coordinator.add_argument('-l', '--listen', default='127.0.0.1:9000',
+                             help='the address to listen on, e.g. '
+                             '0.0.0.0:9000 (default: 127.0.0.1:9000)')
+    coordinator.add_argument('-o', '--output', default='results',
+                             help='the output directory (default: results)')
+    coordinator.add_argument('--heartbeat-timeout', type=float, default=10,
+                             help='the seconds after which a silent node is '
+                             'considered dead (default: 10)')
+    coordinator.add_argument('-f', '--force', action='store_true',
+                             help='run the jobs whose results exist as well')
+
+    node = commands.add_parser('node', help='run the jobs of a coordinator')
+    node.add_argument('address', help='the host:port of the coordinator')
+    node.add_argument('-j', '--nodes', type=int, default=1,
+                      help='the number of node processes (default: 1)')
+
+    for command in (coordinator, node):
+        command.add_argument('-k', '--authkey', required=True,
+                             help='the key shared by the coordinator and '
+                             'the nodes')
+    args = parser.parse_args(argv)
+    authkey = args.authkey.encode()
+
+    if args.command == 'node':
+        address = parse_address(args.address)
+        if args.nodes == 1:
+            run_node(address, authkey)
+        else:
+            for process in start_nodes(address, args.nodes, authkey):
+                process.join()
+        return 0
+
+    if args.jobs == '-':
+        jobs = read_jobs(sys.stdin)
+    else:
+        with open(args.jobs) as f:
+            jobs = read_jobs(f)
+    start = time.time()
+    counts = Coordinator(parse_address(args.listen), jobs, args.output,
+                         authkey, args.heartbeat_timeout,
+                         force=args.force).run()
+    print('{} jobs: {ok} ok, {failed} failed, {skipped} skipped in '
+          '{:.3f}s'.format(len(jobs), time.time() - start, **counts))
+    return 1 if counts['failed'] else 0
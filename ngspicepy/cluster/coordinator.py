@@ -0,0 +1,262 @@
+"""The coordinator of a cluster of nodes."""
+import collections
+import os
+import sys
+import threading
+import time
+from multiprocessing.connection import Listener
+
+from ngspicepy.batch.runner import check_job_id, job_status, prepare_job,\
+    write_results, write_status
+
+
+class Coordinator(object):
+    """Hands out jobs to the nodes that connect to it and stores the results.
+
+    Nodes ask for a job whenever they're idle, so faster nodes take more
+    jobs. Once no job is left to hand out, idle nodes steal a copy of the
+    job that has been running the longest and the first result wins. A node
+    that closes its connection or whose heartbeats stop for longer than
+    heartbeat_timeout is considered dead and its jobs are handed out again.
+    A job fails after max_attempts attempts, e.g. if it keeps crashing
+    nodes.
+
+    The results are stored in the output directory in the format of the
+    batch runner, see ngspicepy.batch, which is also used to skip the jobs
+    that already succeeded.
+
+    Example:
+        >>> coordinator = Coordinator(('0.0.0.0', 9000), jobs, 'results',
+        ...                           authkey=b'secret')
+        >>> coordinator.run()
+        {'ok': 998, 'failed': 2, 'skipped': 0}
+    """
+
+    def __init__(self, address, jobs, output, authkey=None,
+                 heartbeat_timeout=10, max_attempts=3, force=False,
+                 stream=None):
+        """Class constructor. Listens on the address.
+
+        Parameters:
+            address
+                A (host, port) tuple or the path of a Unix socket.
+            jobs
+                A list of job dictionaries, see ngspicepy.batch.
+            output
+                The output directory.
+            authkey
+                A bytes key that the nodes have to know. It is required with
+                a TCP address.
+            heartbeat_timeout
+                The number of seconds without a message from a node after
+                which it's considered dead.
+            max_attempts
+                The number of times a job is handed out before it fails.
+            force
+                Run all jobs even if their results exist.
+            stream
+                The file to which a line is printed for each finished job.
+                Defaults to sys.stdout.
+        """
+        if type(address) != str and authkey is None:
+            raise ValueError('A TCP address requires an authkey')
+        self.listener = Listener(address, authkey=authkey)
+        self.address = self.listener.address
+        self.output = output
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_attempts = max_attempts
+        self.stream = sys.stdout if stream is None else stream
+        self.counts = {'ok': 0, 'failed': 0, 'skipped': 0}
+
+        self.lock = threading.RLock()
+        self.done = threading.Event()
+        self.jobs = {}
+        self.pending = collections.deque()
+        # Job id -> the nodes running it, when it was first handed out and
+        # the number of times it was handed out.
+        self.running = {}
+        self.started = {}
+        self.attempts = collections.Counter()
+        # Node -> the time of its last message and the jobs it's running.
+        self.last_seen = {}
+        self.assigned = {}
+
+        for job in jobs:
+            check_job_id(str(job['id']))
+        os.makedirs(output, exist_ok=True)
+        templates = {}
+        for job in jobs:
+            job_id = str(job['id'])
+            if not force:
+                status = job_status(output, job_id)
+                if status is not None and status['status'] == 'ok':
+                    self.counts['skipped'] += 1
+                    continue
+            try:
+                self.jobs[job_id] = prepare_job(job, templates) +\
+                    (job.get('save'),)
+            except Exception as e:
+                self.__finish__(job_id, None, 0.0,
+                                type(e).__name__ + ': ' + str(e))
+                continue
+            self.pending.append(job_id)
+        self.remaining = len(self.pending)
+        if not self.remaining:
+            self.done.set()
+
+    def run(self, timeout=None):
+        """Serve the nodes until all jobs are finished.
+
+        Returns a dictionary with the number of jobs that were 'ok',
+        'failed' and 'skipped'. A TimeoutError is raised if the jobs aren't
+        finished within timeout seconds.
+        """
+        threading.Thread(target=self.__accept__, daemon=True).start()
+        threading.Thread(target=self.__monitor__, daemon=True).start()
+        try:
+            if not self.done.wait(timeout):
+                raise TimeoutError('The jobs did not finish in time')
+        finally:
+            self.close()
+        return self.counts
+
+    def close(self):
+        """Stop accepting nodes."""
+        self.done.set()
+        self.listener.close()
+
+    def __accept__(self):
+        while not self.done.is_set():
+            try:
+                conn = self.listener.accept()
+            except Exception:
+                continue
+            threading.Thread(target=self.__serve__, args=(conn,),
+                             daemon=True).start()
+
+    def __monitor__(self):
+        """Hand out the jobs of the nodes whose heartbeats stopped again."""
+        while not self.done.wait(self.heartbeat_timeout / 4):
+            now = time.time()
+            with self.lock:
+                for node, last_seen in list(self.last_seen.items()):
+                    if now - last_seen > self.heartbeat_timeout:
+                        self.__drop__(node)
+
+    def __serve__(self, conn):
+        """Handle the messages of one node."""
+        node = object()
+        with self.lock:
+            self.last_seen[node] = time.time()
+            self.assigned[node] = set()
+        try:
+            while True:
+                message = conn.recv()
+                with self.lock:
+                    if node not in self.last_seen:
+                        # The node was considered dead.
+                        break
+                    self.last_seen[node] = time.time()
+                    kind = message[0]
+                    if kind == 'ready':
+                        conn.send(self.__next_job__(node))
+                        continue
+                    if kind not in ('result', 'failed') or\
+                            not self.__claim__(node, message[1], kind):
+                        continue
+                # The results are written without holding the lock.
+                if kind == 'result':
+                    job_id, elapsed, results = message[1:]
+                    self.__finish__(job_id, results, elapsed)
+                else:
+                    job_id, error = message[1:]
+                    self.__finish__(job_id, None, 0.0, error)
+        except (EOFError, OSError):
+            pass
+        finally:
+            with self.lock:
+                self.__drop__(node)
+            conn.close()
+
+    def __next_job__(self, node):
+        """Return the reply to a node that asks for a job."""
+        if self.done.is_set():
+            return ('done',)
+        job_id = None
+        if self.pending:
+            job_id = self.pending.popleft()
+        else:
+            # Steal the job that has been running the longest, unless it
+            # already runs twice.
+            candidates = [running_id for running_id, nodes in
+                          self.running.items()
+                          if node not in nodes and len(nodes) < 2]
+            if candidates:
+                job_id = min(candidates, key=self.started.__getitem__)
+        if job_id is None:
+            return ('wait', min(1.0, self.heartbeat_timeout / 4))
+
+        self.running.setdefault(job_id, set()).add(node)
+        self.started.setdefault(job_id, time.time())
+        self.attempts[job_id] += 1
+        self.assigned[node].add(job_id)
+        return ('job', job_id) + self.jobs[job_id]
+
+    def __claim__(self, node, job_id, kind):
+        """Return True if the result of a job from a node is to be stored.
+
+        It isn't if a stolen copy of the job finished first, or if it failed
+        while another node is still running it.
+        """
+        self.assigned[node].discard(job_id)
+        nodes = self.running.get(job_id)
+        if nodes is None:
+            return False
+        nodes.discard(node)
+        if kind == 'failed' and nodes:
+            return False
+        del self.running[job_id]
+        del self.started[job_id]
+        for other in nodes:
+            self.assigned[other].discard(job_id)
+        return True
+
+    def __drop__(self, node):
+        """Forget a dead node and hand out its jobs again."""
+        if node not in self.last_seen:
+            return
+        del self.last_seen[node]
+        for job_id in self.assigned.pop(node):
+            nodes = self.running[job_id]
+            nodes.discard(node)
+            if nodes:
+                continue
+            del self.running[job_id]
+            del self.started[job_id]
+            if self.attempts[job_id] >= self.max_attempts:
+                self.__finish__(job_id, None, 0.0, 'RuntimeError: ' +
+                                'The job failed on ' +
+                                str(self.attempts[job_id]) + ' nodes')
+            else:
+                self.pending.appendleft(job_id)
+
+    def __finish__(self, job_id, results, elapsed, error=None):
+        """Store the results and the status of a finished job."""
+        if error is None:
+            write_results(os.path.join(self.output, job_id), results)
+            status = {'status': 'ok', 'time': elapsed}
+        else:
+            status = {'status': 'failed', 'time': elapsed, 'error': error}
+        write_status(self.output, job_id, status)
+        with self.lock:
+            self.counts[status['status']] += 1
+            if job_id in self.jobs:
+                self.remaining -= 1
+                if self.remaining == 0:
+                    self.done.set()
+        line = '{:<7} {:<20} {:9.3f}s'.format(status['status'], job_id,
+                                               elapsed)
+        if error is not None:
+            line += '  ' + error
+        print(line, file=self.stream)
+        self.stream.flush()
@@ -0,0 +1,66 @@
+"""Generators of job lists."""
+import itertools
+
+import numpy as np
+
+
+def sweep_jobs(netlist, analyses, grid, save=None, prefix='sweep'):
+    """Return the jobs of a sweep over every combination of parameters.
+
+    Parameters:
+        netlist
+            The path of a netlist file or the netlist text.
+        analyses
+            The analyses of each job, see ngspicepy.batch.
+        grid
+            An ordered dictionary mapping .param names to lists of values.
+        save
+            The vectors to store.
+        prefix
+            The jobs are named '<prefix><index>'.
+
+    Example:
+        >>> jobs = sweep_jobs('CS-Amp.cir', ['ac dec 10 1 1g'],
+        ...                   {'rd': [1e3, 2e3], 'vdd': [1.6, 1.8]})
+        >>> jobs[1]['params']
+        {'rd': 1000.0, 'vdd': 1.8}
+    """
+    names = list(grid)
+    jobs = []
+    for index, values in enumerate(itertools.product(*grid.values())):
+        job = {'id': prefix + str(index), 'netlist': netlist,
+               'analyses': list(analyses), 'params': dict(zip(names, values))}
+        if save is not None:
+            job['save'] = list(save)
+        jobs.append(job)
+    return jobs
+
+
+def monte_carlo_jobs(netlist, analyses, nsamples, params, save=None,
+                     seed=None, prefix='mc'):
+    """Return the jobs of a Monte Carlo analysis.
+
+    Parameters:
+        netlist, analyses, save, prefix
+            See sweep_jobs().
+        nsamples
+            The number of jobs.
+        params
+            A dictionary mapping .param names to the (mean, standard
+            deviation) of their normal distributions.
+        seed
+            The seed of the random numbers.
+    """
+    random = np.random.RandomState(seed)
+    samples = dict((name, random.normal(mean, sigma, nsamples))
+                   for name, (mean, sigma) in params.items())
+    jobs = []
+    for index in range(nsamples):
+        job = {'id': prefix + str(index), 'netlist': netlist,
+               'analyses': list(analyses),
+               'params': dict((name, float(values[index]))
+                              for name, values in samples.items())}
+        if save is not None:
+            job['save'] = list(save)
+        jobs.append(job)
+    return jobs
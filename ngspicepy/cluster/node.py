@@ -0,0 +1,94 @@
+"""The nodes of a cluster."""
+import multiprocessing
+import threading
+import time
+import traceback
+from multiprocessing.connection import Client
+
+from ngspicepy.batch.runner import simulate_job
+
+
+def run_node(address, authkey=None, heartbeat=2.0):
+    """Run the jobs of a Coordinator in this process until they're done.
+
+    The jobs are run with the Netlist path of ngspicepy in this process. A
+    heartbeat is sent every heartbeat seconds while a job runs, so the
+    Coordinator can tell a long job from a dead node. If ngspice crashes
+    the process, the Coordinator hands the job to another node.
+
+    Returns the number of jobs that were run.
+
+    Parameters:
+        address
+            The address of the Coordinator.
+        authkey
+            The Coordinator's key. It is required with a TCP address, since
+            the jobs are pickled.
+        heartbeat
+            The number of seconds between heartbeats. It must be well below
+            the Coordinator's heartbeat_timeout.
+    """
+    if type(address) != str and authkey is None:
+        raise ValueError('A TCP address requires an authkey')
+    conn = Client(address, authkey=authkey)
+    lock = threading.Lock()
+    stopped = threading.Event()
+
+    def send(message):
+        with lock:
+            conn.send(message)
+
+    def beat():
+        while not stopped.wait(heartbeat):
+            try:
+                send(('heartbeat',))
+            except (EOFError, OSError):
+                break
+
+    threading.Thread(target=beat, daemon=True).start()
+    njobs = 0
+    try:
+        while True:
+            send(('ready',))
+            reply = conn.recv()
+            if reply[0] == 'done':
+                break
+            if reply[0] == 'wait':
+                time.sleep(reply[1])
+                continue
+
+            job_id, netlist_list, analyses, save = reply[1:]
+            try:
+                results, elapsed = simulate_job(netlist_list, analyses, save)
+            except Exception as e:
+                send(('failed', job_id, type(e).__name__ + ': ' + str(e)))
+            else:
+                try:
+                    send(('result', job_id, elapsed, results))
+                except (EOFError, OSError):
+                    raise
+                except Exception:
+                    send(('failed', job_id, traceback.format_exc()))
+            njobs += 1
+    except (EOFError, OSError):
+        # The Coordinator finished and closed the connection.
+        pass
+    finally:
+        stopped.set()
+        conn.close()
+    return njobs
+
+
+def start_nodes(address, nnodes, authkey=None, heartbeat=2.0):
+    """Start nnodes processes that run run_node() and return them.
+
+    Each process runs its own ngspice, so a crash only loses one node.
+    """
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=run_node,
+                                 args=(address, authkey, heartbeat),
+                                 daemon=True)
+                 for i in range(nnodes)]
+    for process in processes:
+        process.start()
+    return processes
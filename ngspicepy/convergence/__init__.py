@@ -0,0 +1,17 @@
+"""
+Convergence Retries
+===================
+
+When an analysis fails to converge, the RetryEngine runs it again with an
+escalating ladder of simulator options, e.g. more iterations, gmin and source
+stepping, relaxed tolerances and Gear integration. The rung that worked is
+remembered for each netlist and analysis so that later runs start from it.
+
+Example
+-------
+
+    >>> engine = RetryEngine(cache_file='rungs.json')
+    >>> plot = engine.run('CS-Amp.cir', 'tran', '1u 10m')
+    >>> v_out = plot['v(out)'].data
+"""
+from .retry import RetryEngine, default_ladder, is_converged
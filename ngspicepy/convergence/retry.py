@@ -0,0 +1,153 @@
+"""The retry engine class."""
+import hashlib
+import json
+import os
+
+import ngspicepy as ng
+
+from ngspicepy.netlist import Netlist
+from ngspicepy.ngspicepy import __parse__, ngspice_lock, to_num
+from ngspicepy.plot import Plot
+
+# Each rung adds options to those of the rungs before it. The 'tmax_divisor'
+# key isn't an ngspice option; it divides the maximum time step of transient
+# analyses.
+default_ladder = [
+    {},
+    {'itl1': 500, 'itl2': 200, 'itl4': 50},
+    {'gminsteps': 100},
+    {'srcsteps': 100},
+    {'reltol': 0.01, 'abstol': 1e-10, 'vntol': 1e-5},
+    {'method': 'gear'},
+    {'tmax_divisor': 10},
+]
+
+# Parts of the messages that ngspice prints when an analysis fails.
+failure_messages = ['iteration limit reached',
+                    'timestep too small',
+                    'stepping failed',
+                    'no convergence',
+                    'simulation(s) aborted',
+                    'singular matrix']
+
+
+def is_converged(messages):
+    """Return False if the messages printed by an analysis show a failure."""
+    for message in messages:
+        message = message.lower()
+        if any(failure in message for failure in failure_messages):
+            return False
+    return True
+
+
+class RetryEngine(object):
+    """Runs analyses again with more robust options until they converge."""
+
+    def __init__(self, ladder=None, cache_file=None):
+        """Class constructor.
+
+        Parameters:
+            ladder
+                A list of dictionaries of options, one per rung. Each rung
+                adds its options to those of the previous rungs. Defaults to
+                default_ladder.
+            cache_file
+                A JSON file in which the rung that worked for each netlist
+                and analysis is stored, so that it is remembered across
+                sessions.
+        """
+        self.ladder = default_ladder if ladder is None else ladder
+        self.cache_file = cache_file
+        self.rungs = {}
+        if cache_file is not None and os.path.isfile(cache_file):
+            with open(cache_file) as f:
+                self.rungs = json.load(f)
+
+    def options(self, rung):
+        """Return the options used by a rung, i.e. those of rungs 0 to rung."""
+        options = {}
+        for rung_options in self.ladder[:rung + 1]:
+            options.update(rung_options)
+        return options
+
+    def key(self, netlist, sim_type, parsed_args):
+        """Return the hash under which the rung for an analysis is stored."""
+        text = '\n'.join(netlist.netlist + [sim_type] + parsed_args)
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def run(self, netlist, sim_type, *args, **kwargs):
+        """Run an analysis, retrying with the next rung until it converges.
+
+        The netlist is reloaded before each attempt so that the options of
+        the previous attempt don't carry over.
+
+        Parameters:
+            netlist
+                A Netlist or anything that the Netlist constructor accepts.
+            sim_type
+                The type of the simulation (op, dc, ac or tran)
+            ``*args``
+                The simulation parameters as arguments
+            ``**kwargs``
+                The simulation parameters as keyword arguments
+
+        Returns the Plot created by the analysis. The rung that worked is
+        stored in the attribute last_rung. A RuntimeError is raised if no
+        rung converges.
+        """
+        if not isinstance(netlist, Netlist):
+            netlist = Netlist(netlist)
+        if sim_type == 'op':
+            parsed_args = []
+        else:
+            parsed_args = __parse__(sim_type, *args, **kwargs)
+
+        key = self.key(netlist, sim_type, parsed_args)
+        # The cached rung may be past the end of a ladder that was shortened
+        # since.
+        start = min(self.rungs.get(key, 0), len(self.ladder) - 1)
+        errors = []
+        with ngspice_lock:
+            for rung in range(start, len(self.ladder)):
+                errors = self.__attempt__(netlist, sim_type, parsed_args,
+                                          self.options(rung))
+                if errors is None:
+                    self.last_rung = rung
+                    self.__remember__(key, rung)
+                    return Plot()
+
+        raise RuntimeError('Simulation did not converge: ' +
+                           ' '.join(errors))
+
+    def __attempt__(self, netlist, sim_type, parsed_args, options):
+        """Run one attempt. Returns None if it converged, else the errors."""
+        options = dict(options)
+        tmax_divisor = options.pop('tmax_divisor', None)
+        if sim_type == 'tran' and tmax_divisor is not None:
+            parsed_args = list(parsed_args)
+            # The tran arguments are tstep, tstop, tstart and tmax. tmax
+            # defaults to tstep if it isn't given.
+            tmax = to_num(parsed_args[3 if len(parsed_args) > 3 else 0])
+            parsed_args[3:4] = [str(tmax / tmax_divisor)]
+
+        plots_before = ng.get_plot_names()
+        ng.load_netlist(netlist.get_buffer())
+        for option, value in options.items():
+            ng.set_options(**{option: value})
+        output = ng.send_command(sim_type + ' ' + ' '.join(parsed_args))
+        errors = ng.get_errors()
+
+        if ng.current_plot() in plots_before:
+            errors.append('No plot was created')
+        elif is_converged(output + errors):
+            return None
+        return errors
+
+    def __remember__(self, key, rung):
+        """Store the rung that worked for an analysis."""
+        if self.rungs.get(key) == rung:
+            return
+        self.rungs[key] = rung
+        if self.cache_file is not None:
+            with open(self.cache_file, 'w') as f:
+                json.dump(self.rungs, f)
@@ -0,0 +1,22 @@
+"""
+Co-simulation Sources
+=====================
+
+Independent voltage and current sources declared as EXTERNAL in a netlist,
+e.g. 'V1 in 0 dc 0 external', get their value from python whenever ngspice
+evaluates them during an analysis. Each source is driven by a Table of
+samples, which is interpolated linearly, or by a function of time. Tables
+are cheap to evaluate in the callbacks and can be replaced or extended
+between analyses without loading the netlist again.
+
+Example
+-------
+
+    >>> ng.load_netlist('plant.cir')
+    >>> set_source('vctrl', Table([0, 1e-3, 2e-3], [0, 1.8, 1.8]))
+    >>> set_source('iload', lambda t: 1e-3 * np.sin(2e3 * np.pi * t))
+    >>> ng.run_tran('1u', '2m')
+    >>> raise_errors()
+"""
+from .sources import clear_sources, raise_errors, remove_source, set_source,\
+    Table
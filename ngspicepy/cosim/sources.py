@@ -0,0 +1,166 @@
+"""The external sources."""
+from bisect import bisect_right
+from ctypes import c_char_p, c_double, c_int, c_void_p, CFUNCTYPE, POINTER
+
+import numpy as np
+
+from ngspicepy.ngspicepy import libngspice, ngspice_lock
+
+# The waveforms of the sources, indexed by their lower case names as bytes,
+# which is how ngspice passes them to the callbacks.
+sources = {}
+
+# The exceptions raised by the waveforms during the last analyses. They
+# can't propagate through ngspice.
+errors = []
+
+
+class Table(object):
+    """A waveform given by samples, interpolated linearly between them.
+
+    Before the first sample and after the last one the waveform holds their
+    values. The samples are stored as lists of floats, and the index of the
+    last lookup is kept, since ngspice mostly asks for increasing times, so
+    a lookup creates few python objects.
+
+    Example:
+        >>> table = Table([0, 1, 2], [0, 1, 0])
+        >>> table(0.5)
+        0.5
+    """
+
+    def __init__(self, times, values):
+        """Class constructor.
+
+        Parameters:
+            times
+                The increasing times of the samples.
+            values
+                The values of the samples.
+        """
+        self.times = []
+        self.values = []
+        self.index = 0
+        self.extend(times, values)
+
+    @classmethod
+    def from_function(cls, func, tstop, tstep):
+        """Sample func, a vectorized function of time, from 0 to tstop."""
+        times = np.linspace(0, tstop, int(np.ceil(tstop / tstep)) + 1)
+        return cls(times, np.broadcast_to(func(times), times.shape))
+
+    def extend(self, times, values):
+        """Append samples that come after the existing ones."""
+        times = np.asarray(times, dtype=float).ravel()
+        values = np.asarray(values, dtype=float).ravel()
+        if len(times) != len(values):
+            raise ValueError('times and values must have the same length')
+        if np.any(np.diff(times) < 0) or\
+                (len(times) and self.times and times[0] < self.times[-1]):
+            raise ValueError('The times must be increasing')
+        self.times.extend(times.tolist())
+        self.values.extend(values.tolist())
+
+    def __call__(self, time):
+        times = self.times
+        index = self.index
+        if time < times[index]:
+            index = 0
+        index = bisect_right(times, time, index) - 1
+        if index < 0:
+            return self.values[0]
+        self.index = index
+        if index == len(times) - 1:
+            return self.values[index]
+        t0 = times[index]
+        v0 = self.values[index]
+        return v0 + (self.values[index + 1] - v0) * (time - t0) /\
+            (times[index + 1] - t0)
+
+    def __len__(self):
+        return len(self.times)
+
+
+def source_value(value, time, name):
+    """Store the value of the source name at time in the pointer value."""
+    try:
+        value[0] = sources[name](time)
+    except KeyError:
+        value[0] = 0.0
+        errors.append(KeyError('No waveform for the external source ' +
+                               name.decode()))
+    except Exception as e:
+        value[0] = 0.0
+        errors.append(e)
+    return 0
+
+
+GetSRCData = CFUNCTYPE(c_int, POINTER(c_double), c_double, c_char_p, c_int,
+                       c_void_p)
+
+
+@GetSRCData
+def GetVSRCData(value, time, name, lib_id, ret_ptr):
+    """Callback function that asks for the voltage of an external source."""
+    return source_value(value, time, name)
+
+
+@GetSRCData
+def GetISRCData(value, time, name, lib_id, ret_ptr):
+    """Callback function that asks for the current of an external source."""
+    return source_value(value, time, name)
+
+
+def set_source(name, waveform):
+    """Drive the external source name with a waveform.
+
+    Parameters:
+        name
+            The name of the source, e.g. 'V1'.
+        waveform
+            A Table, a (times, values) tuple of samples, a number or a
+            function of time that returns a number. A function is called
+            each time ngspice evaluates the source, so a Table of samples
+            is faster.
+    """
+    if isinstance(waveform, tuple):
+        waveform = Table(*waveform)
+    elif not callable(waveform):
+        constant = float(waveform)
+
+        def waveform(time):
+            return constant
+    if isinstance(waveform, Table) and not len(waveform):
+        raise ValueError('The table has no samples')
+    sources[name.lower().encode()] = waveform
+
+
+def remove_source(name):
+    """Stop driving the external source name."""
+    sources.pop(name.lower().encode(), None)
+
+
+def clear_sources():
+    """Stop driving all external sources and forget the errors."""
+    sources.clear()
+    del errors[:]
+
+
+def raise_errors():
+    """Raise the first exception that a waveform raised, if any.
+
+    The exceptions are forgotten once they're raised.
+    """
+    if errors:
+        error = errors[0]
+        del errors[:]
+        raise error
+
+
+# Register the callbacks. ngspice then calls them for the sources declared
+# as EXTERNAL.
+libngspice.ngSpice_Init_Sync.argtypes = [GetSRCData, GetSRCData, c_void_p,
+                                         POINTER(c_int), c_void_p]
+libngspice.ngSpice_Init_Sync.restype = c_int
+with ngspice_lock:
+    libngspice.ngSpice_Init_Sync(GetVSRCData, GetISRCData, None, None, None)
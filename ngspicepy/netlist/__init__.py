@@ -22,5 +22,35 @@ Example
     >>> t = amp.get_vector('time')
     >>> v_in = amp.get_vector('nin')
     >>> v_out = amp.get_vector('nout')
+
+Variants of a netlist can be generated from a NetlistTemplate without parsing
+the netlist again:
+
+    >>> amp = NetlistTemplate('CS-Amp.cir')
+    >>> net = amp.netlist(rload='10k')
+
+The connectivity of the netlist is indexed by a NetlistGraph:
+
+    >>> graph = Netlist('CS-Amp.cir').get_graph()
+    >>> graph.elements_at('out')
+
+Changes to a loaded netlist are applied with alter commands where possible:
+
+    >>> amp.run()
+    >>> diff = amp.update(new_version)
+    >>> diff.changes
+
+Large regular circuits, e.g. grids, are built from numpy arrays by a
+CircuitBuilder, which writes the netlist straight into a NetlistBuffer:
+
+    >>> builder = CircuitBuilder('RC ladder')
+    >>> nodes = builder.new_nodes(1000000)
+    >>> builder.add('R', nodes[:-1], nodes[1:], 1e3)
+    >>> builder.add('C', nodes, 0, 1e-12)
+    >>> net = builder.to_netlist()
 """
+from .builder import CircuitBuilder
+from .diff import NetlistDiff
+from .graph import NetlistGraph
 from .netlist import Netlist
+from .template import NetlistTemplate
@@ -0,0 +1,270 @@
+"""The circuit builder class."""
+import re
+
+import numpy as np
+
+from ngspicepy.ngspicepy import NetlistBuffer
+
+from .netlist import Netlist
+
+# The elements that the builder stores in its arrays, by type code.
+element_types = 'RCLVI'
+
+# The names of the ground node.
+ground_names = ('0', 'gnd')
+
+# The names of the elements in the arrays, which added lines can't use.
+array_name_re = re.compile('^[' + element_types + r']\d+$', re.IGNORECASE)
+
+
+# The byte that pads the tokens in their tables. It isn't part of any UTF-8
+# text, so the padding can be dropped with a mask.
+fill = 0xff
+
+
+# The four ASCII digits of each number below 10000
+digit_chunks = np.array([list(b'%04d' % i) for i in range(10000)],
+                        dtype=np.uint8)
+
+
+def digits(numbers):
+    """Return the decimal digits of non-negative integers as a table.
+
+    Returns a 2-D uint8 array with the ASCII digits of each number right
+    aligned in its row, padded with fill.
+    """
+    numbers = np.asarray(numbers, dtype=np.int64)
+    width = len(str(int(numbers.max()))) if len(numbers) else 1
+    nchunks = (width + 3) // 4
+    table = np.empty((len(numbers), 4 * nchunks), dtype=np.uint8)
+    rest = numbers
+    for chunk in range(nchunks - 1, -1, -1):
+        rest, part = np.divmod(rest, 10000)
+        table[:, 4 * chunk:4 * chunk + 4] = digit_chunks[part]
+    table = table[:, 4 * nchunks - width:]
+
+    lengths = np.ones(len(numbers), dtype=np.int64)
+    for power in 10 ** np.arange(1, width, dtype=np.int64):
+        lengths += numbers >= power
+    np.putmask(table, np.arange(width) < (width - lengths)[:, None], fill)
+    return table
+
+
+def text_table(tokens, width=0):
+    """Return strings as a 2-D uint8 table, left aligned and padded."""
+    encoded = [token.encode() for token in tokens]
+    width = max([width] + [len(token) for token in encoded])
+    return np.frombuffer(b''.join(token.ljust(width, b'\xff')
+                                  for token in encoded),
+                         dtype=np.uint8).reshape(len(encoded), width)
+
+
+class CircuitBuilder(object):
+    """Builds large netlists from arrays of elements.
+
+    Resistors, capacitors, inductors and DC sources are stored in columnar
+    arrays, i.e. a type code, two node ids and a value per element, and are
+    added in bulk from numpy arrays. Element n is named after its type and
+    n, e.g. R12. Nodes are integer ids, with 0 the ground. They are written
+    as their ids unless they were given a name with node(). Any other line,
+    e.g. a model, a subcircuit instance or a source with a waveform, is
+    added with add_lines().
+
+    The netlist is written straight into the bytes of a NetlistBuffer with
+    numpy, without a python string per element.
+
+    Example
+    -------
+
+        >>> builder = CircuitBuilder('RC grid')
+        >>> ids = builder.new_nodes(n * n).reshape(n, n)
+        >>> builder.add('R', ids[:, :-1], ids[:, 1:], 1.0)
+        >>> builder.add('R', ids[:-1], ids[1:], 1.0)
+        >>> builder.add('C', ids, 0, 1e-12)
+        >>> builder.add('I', 0, ids, 1e-3)
+        >>> builder.add('V', builder.node('vdd'), 0, 1.8)
+        >>> ng.load_netlist(builder.buffer())
+    """
+
+    def __init__(self, title='* Circuit'):
+        """Class constructor.
+
+        Parameters:
+            title
+                The title line of the netlist.
+        """
+        self.title = title
+        self.lines = []
+        self.node_names = {}
+        self.named_ids = set()
+        self.nnodes = 1
+        self.types = np.empty(0, dtype=np.uint8)
+        self.nodes = np.empty((0, 2), dtype=np.int64)
+        self.values = np.empty(0, dtype=float)
+
+    def __len__(self):
+        """Return the number of elements in the arrays."""
+        return len(self.types)
+
+    def node(self, name):
+        """Return the id of a named node, creating it if needed.
+
+        Names that are integers, e.g. '12', are the nodes with those ids. A
+        ValueError is raised if such an id was given to a named node.
+        """
+        name = str(name)
+        if name.lower() in ground_names:
+            return 0
+        if name.isdigit():
+            if int(name) in self.named_ids:
+                raise ValueError('Node ' + name + ' is the named node ' +
+                                 self.node_name(int(name)))
+            self.nnodes = max(self.nnodes, int(name) + 1)
+            return int(name)
+        if name not in self.node_names:
+            self.node_names[name] = self.nnodes
+            self.named_ids.add(self.nnodes)
+            self.nnodes += 1
+        return self.node_names[name]
+
+    def new_nodes(self, count):
+        """Return an array of the ids of count new nodes."""
+        ids = np.arange(self.nnodes, self.nnodes + count, dtype=np.int64)
+        self.nnodes += count
+        return ids
+
+    def add(self, element_type, n1, n2, values):
+        """Add elements of one type between two arrays of nodes.
+
+        The nodes and values are broadcast against each other, so e.g. a
+        single node or value is shared by all the elements.
+
+        Parameters:
+            element_type
+                One of 'R', 'C', 'L', 'V' and 'I'. Sources are DC sources.
+            n1, n2
+                The node ids, or names, of the elements' terminals. Sources
+                drive their current from n1 to n2 through themselves.
+            values
+                The values of the elements.
+
+        Returns the indices of the new elements.
+        """
+        code = element_types.find(element_type.upper())
+        if len(element_type) != 1 or code < 0:
+            raise ValueError('Invalid element type: ' + element_type)
+        n1 = self.__node_ids__(n1)
+        n2 = self.__node_ids__(n2)
+        n1, n2, values = np.broadcast_arrays(n1, n2, np.asarray(values,
+                                                                dtype=float))
+        if not np.all(np.isfinite(values)):
+            raise ValueError('The values must be finite')
+
+        count = n1.size
+        start = len(self.types)
+        self.types = np.concatenate([self.types,
+                                     np.full(count, code, dtype=np.uint8)])
+        self.nodes = np.concatenate([self.nodes,
+                                     np.stack([n1.ravel(), n2.ravel()], 1)])
+        self.values = np.concatenate([self.values, values.ravel()])
+        return np.arange(start, start + count)
+
+    def __node_ids__(self, nodes):
+        """Return nodes as an array of ids, looking names up with node()."""
+        if isinstance(nodes, str):
+            return np.int64(self.node(nodes))
+        nodes = np.asarray(nodes)
+        if nodes.dtype.kind not in 'iu':
+            nodes = np.vectorize(self.node, otypes=[np.int64])(nodes)
+        if nodes.size and (nodes.min() < 0 or nodes.max() >= self.nnodes):
+            raise ValueError('Unknown node ids')
+        return nodes.astype(np.int64)
+
+    def add_lines(self, lines):
+        """Add element, model and control lines.
+
+        The lines must not have a title, e.g. those of a Netlist are added
+        with net.netlist[1:]. '.end' lines are dropped, since the builder
+        writes its own. A ValueError is raised if the name of an element is
+        that of one of the arrays' elements, i.e. R, C, L, V or I followed
+        by a number.
+        """
+        lines = [line.strip() for line in lines if line.strip() and
+                 line.strip().lower() != '.end']
+        for line in lines:
+            if array_name_re.match(line.split()[0]):
+                raise ValueError('The element name is used by the arrays: ' +
+                                 line)
+        Netlist._from_checked([self.title] + lines).__checkNetlist__()
+        self.lines.extend(lines)
+
+    def name(self, idx):
+        """Return the name of the element idx."""
+        return element_types[self.types[idx]] + str(idx)
+
+    def node_name(self, node_id):
+        """Return the name of a node as it is written in the netlist."""
+        for name, other in self.node_names.items():
+            if other == node_id:
+                return name
+        return str(node_id)
+
+    def to_bytes(self):
+        """Return the netlist as NUL terminated lines, see NetlistBuffer.
+
+        The lines are the title, the added lines, one line per element of
+        the arrays and '.end'.
+        """
+        count = len(self.types)
+        head = b''.join(line.encode() + b'\0'
+                        for line in [self.title] + self.lines)
+        if not count:
+            return head + b'.end\0'
+
+        node_table = digits(np.arange(self.nnodes))
+        if self.node_names:
+            name_table = text_table(list(self.node_names),
+                                    node_table.shape[1])
+            node_table = np.pad(node_table, ((0, 0), (0, name_table.shape[1] -
+                                                      node_table.shape[1])),
+                                constant_values=fill)
+            node_table[list(self.node_names.values())] = name_table
+        unique, value_rows = np.unique(self.values, return_inverse=True)
+        value_table = text_table([repr(float(value)) for value in unique])
+
+        # Each line is written in a row of fixed width fields, whose padding
+        # is then dropped.
+        space = np.full((count, 1), ord(' '), dtype=np.uint8)
+        rows = np.concatenate([
+            np.frombuffer(element_types.encode(), dtype=np.uint8)[
+                self.types][:, None],
+            digits(np.arange(count)),
+            space,
+            node_table[self.nodes[:, 0]],
+            space,
+            node_table[self.nodes[:, 1]],
+            space,
+            value_table[value_rows.ravel()],
+            np.zeros((count, 1), dtype=np.uint8),
+        ], axis=1)
+        return head + rows[rows != fill].tobytes() + b'.end\0'
+
+    def buffer(self):
+        """Return the netlist as a NetlistBuffer to pass to load_netlist()."""
+        return NetlistBuffer.from_bytes(self.to_bytes())
+
+    def to_list(self):
+        """Return the lines of the netlist."""
+        return self.to_bytes()[:-1].decode().split('\0')
+
+    def to_netlist(self):
+        """Return the netlist as a Netlist, which loads the built buffer.
+
+        The Netlist has a python string per line, which takes longer than
+        to_bytes() for large circuits. Pass buffer() to load_netlist() if
+        the lines aren't needed.
+        """
+        buf = self.buffer()
+        net = Netlist._from_checked(buf.to_list())
+        net._buffer = buf
+        return net
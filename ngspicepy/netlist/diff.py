@@ -0,0 +1,236 @@
+"""The netlist diff class."""
+import re
+
+from .graph import element_nodes, join_lines
+
+# An assignment, e.g. w=1u or vto = 0.7
+assign_re = re.compile(r'\s*=\s*')
+# The parameters of a .model line, e.g. .model d1 d(is=1e-14 n=1)
+model_re = re.compile(r'\.model\s+(\S+)\s+([A-Za-z]\w*)\s*\(?([^)]*)\)?',
+                      re.IGNORECASE)
+
+# The instance parameters that alter sets for a value given without a name,
+# e.g. 'dc 1 ac 1' on a voltage source.
+source_params = {'dc': 'dc', 'ac': 'acmag'}
+
+
+def control_lines(netlist_list):
+    """Return the lines of the .control blocks of a netlist."""
+    lines = []
+    in_control = False
+    for line in netlist_list:
+        command = line.split()[0].upper()
+        if command == '.CONTROL':
+            in_control = True
+        if in_control:
+            lines.append(line)
+        if command == '.ENDC':
+            in_control = False
+    return lines
+
+
+def split_values(tokens):
+    """Split tokens into a list of positional values and a dict of keywords.
+
+    Returns None if a keyword is given twice.
+    """
+    positional = []
+    keywords = {}
+    for token in tokens:
+        if '=' in token:
+            key, value = token.split('=', 1)
+            if key in keywords:
+                return None
+            keywords[key] = value
+        else:
+            positional.append(token)
+    return positional, keywords
+
+
+def is_plain(value):
+    """Return True if a value can be passed to alter, i.e. isn't an expression.
+    """
+    return value != '' and not any(char in value for char in "{}'()\"")
+
+
+class NetlistDiff(object):
+    """The differences between two versions of a netlist.
+
+    Every logical line that differs is classified as one of:
+
+        'value'
+            An element or model parameter changed. It is applied to the
+            loaded circuit with alter or altermod.
+        'param'
+            A value on a .param line changed. It is applied with alterparam
+            followed by reset, which makes ngspice re-evaluate the netlist.
+        'topology'
+            Anything else, e.g. an element or node was added, removed or
+            renamed. The netlist has to be loaded again.
+
+    Changes to the title line are ignored.
+
+    Example:
+        >>> diff = NetlistDiff(old.netlist, new.netlist)
+        >>> diff.changes
+        [('value', 4, 'R1 in out 1k', 'R1 in out 2k')]
+        >>> diff.alter_commands
+        ['alter r1 = 2k']
+    """
+
+    def __init__(self, old, new):
+        """Class constructor.
+
+        Parameters:
+            old, new
+                The lists of the lines of the two versions, e.g. the netlist
+                attributes of two Netlists.
+        """
+        self.changes = []
+        self.alter_commands = []
+        self.param_commands = []
+
+        if control_lines(old) != control_lines(new):
+            self.changes.append(('topology', None, None, None))
+            return
+
+        old_lines = join_lines(old)
+        new_lines = join_lines(new)
+        if len(old_lines) != len(new_lines):
+            self.changes.append(('topology', None, None, None))
+            return
+
+        models = set()
+        for idx, line in new_lines:
+            if line[:6].lower() == '.model':
+                models.add(line.split()[1].lower())
+
+        in_subckt = False
+        for (old_idx, old_line), (idx, line) in zip(old_lines, new_lines):
+            command = line.split()[0].lower()
+            if command == '.subckt':
+                in_subckt = True
+            elif command == '.ends':
+                in_subckt = False
+
+            if old_line.lower().split() == line.lower().split():
+                continue
+            # Changes inside subcircuit definitions apply to all instances.
+            commands = None if in_subckt else\
+                self.__classify__(old_line, line, models)
+            if commands is None:
+                self.changes.append(('topology', idx, old_line, line))
+            elif command == '.param':
+                self.changes.append(('param', idx, old_line, line))
+                self.param_commands.extend(commands)
+            else:
+                self.changes.append(('value', idx, old_line, line))
+                self.alter_commands.extend(commands)
+
+    @property
+    def needs_reload(self):
+        """Return True if the netlist has to be loaded again."""
+        return any(change[0] == 'topology' for change in self.changes)
+
+    @property
+    def commands(self):
+        """Return the commands that apply the changes to the loaded circuit.
+
+        alterparam is followed by reset, which discards earlier alter
+        commands, so the alter commands come last.
+        """
+        if self.param_commands:
+            return self.param_commands + ['reset'] + self.alter_commands
+        return list(self.alter_commands)
+
+    def __classify__(self, old_line, line, models):
+        """Return the commands that turn old_line into line.
+
+        Returns None if the change can't be applied to the loaded circuit.
+        """
+        old_line = assign_re.sub('=', old_line.lower())
+        line = assign_re.sub('=', line.lower())
+        if line[0] == '.':
+            if line.startswith('.param') and old_line.startswith('.param'):
+                return self.__param_commands__(old_line, line)
+            if line.startswith('.model') and old_line.startswith('.model'):
+                return self.__model_commands__(old_line, line)
+            return None
+        return self.__element_commands__(old_line, line, models)
+
+    def __param_commands__(self, old_line, line):
+        old_values = split_values(old_line.split()[1:])
+        values = split_values(line.split()[1:])
+        if old_values is None or values is None or old_values[0] or\
+                values[0] or set(old_values[1]) != set(values[1]):
+            return None
+        commands = []
+        for name, value in values[1].items():
+            if value != old_values[1][name]:
+                if not is_plain(value):
+                    return None
+                commands.append('alterparam ' + name + ' = ' + value)
+        return commands
+
+    def __model_commands__(self, old_line, line):
+        old_match = model_re.match(old_line)
+        match = model_re.match(line)
+        if old_match is None or match is None or\
+                old_match.group(1, 2) != match.group(1, 2):
+            return None
+        old_values = split_values(old_match.group(3).split())
+        values = split_values(match.group(3).split())
+        if old_values is None or values is None or old_values[0] or\
+                values[0] or set(old_values[1]) != set(values[1]):
+            return None
+        commands = []
+        for name, value in values[1].items():
+            if value != old_values[1][name]:
+                if name == 'level' or not is_plain(value):
+                    return None
+                commands.append('altermod ' + match.group(1) + ' ' + name +
+                                ' = ' + value)
+        return commands
+
+    def __element_commands__(self, old_line, line, models):
+        old_tokens = old_line.split()
+        tokens = line.split()
+        name = tokens[0]
+        nodes = element_nodes(tokens, models)
+        if old_tokens[0] != name or\
+                element_nodes(old_tokens, models) != nodes:
+            return None
+        old_values = split_values(old_tokens[1 + len(nodes):])
+        values = split_values(tokens[1 + len(nodes):])
+        if old_values is None or values is None or\
+                len(old_values[0]) != len(values[0]) or\
+                set(old_values[1]) != set(values[1]):
+            return None
+
+        commands = []
+        kind = name[0]
+        old_positional, positional = old_values[0], values[0]
+        for i, value in enumerate(positional):
+            if value == old_positional[i]:
+                continue
+            if not is_plain(value):
+                return None
+            if kind in 'rcl' and i == 0:
+                commands.append('alter ' + name + ' = ' + value)
+            elif kind in 'vi' and i > 0 and\
+                    positional[i - 1] in source_params:
+                commands.append('alter ' + name + ' ' +
+                                source_params[positional[i - 1]] + ' = ' +
+                                value)
+            elif kind in 'vi' and i == 0 and len(positional) == 1:
+                commands.append('alter ' + name + ' dc = ' + value)
+            else:
+                # e.g. a different model or source waveform
+                return None
+
+        for key, value in values[1].items():
+            if value != old_values[1][key]:
+                if not is_plain(value):
+                    return None
+                commands.append('alter ' + name + ' ' + key + ' = ' + value)
+        return commands
@@ -0,0 +1,315 @@
+"""The connectivity index of a netlist."""
+from array import array
+from collections import Counter
+
+import numpy as np
+
+# Number of nodes of the elements with a fixed number of nodes.
+fixed_nodes = {'R': 2, 'C': 2, 'L': 2, 'V': 2, 'I': 2, 'D': 2, 'F': 2,
+               'H': 2, 'B': 2, 'W': 2, 'J': 3, 'Z': 3, 'U': 3, 'M': 4,
+               'E': 4, 'G': 4, 'T': 4, 'O': 4, 'S': 4, 'K': 0}
+
+ground_names = ('0', 'gnd')
+
+
+def join_lines(netlist_list):
+    """Join continuation lines and drop comments and control blocks.
+
+    Returns a list of (line number, line) tuples, where the line number is
+    the index in netlist_list of the first line of each logical line. The
+    title line is dropped.
+    """
+    lines = []
+    in_control = False
+    for idx, line in enumerate(netlist_list[1:], start=1):
+        first = line[0]
+        if first == '*':
+            continue
+        if ';' in line or '$' in line:
+            # Inline comments
+            for marker in (' ;', ' $ ', '\t$ '):
+                if marker in line:
+                    line = line[:line.index(marker)]
+        if first == '.':
+            command = line.split()[0].upper()
+            if command == '.CONTROL':
+                in_control = True
+            elif command == '.ENDC':
+                in_control = False
+                continue
+        if in_control:
+            continue
+        if first == '+':
+            if lines:
+                lines[-1] = (lines[-1][0], lines[-1][1] + ' ' + line[1:])
+            continue
+        lines.append((idx, line))
+    return lines
+
+
+def element_nodes(tokens, models):
+    """Return the node names of an element given the tokens of its line.
+
+    The element type is the first letter of its name. The models set is used
+    to tell the optional substrate node of BJTs apart from their model name.
+    """
+    kind = tokens[0][0].upper()
+    nnodes = fixed_nodes.get(kind)
+    if nnodes is not None:
+        if kind in 'EG' and len(tokens) > 3 and\
+                tokens[3].upper().startswith('POLY'):
+            # Polynomial sources only have the two output nodes fixed.
+            nnodes = 2
+        return tokens[1:1 + nnodes]
+
+    if kind == 'Q':
+        # c b e [s] model
+        if len(tokens) > 5 and tokens[4].lower() not in models:
+            return tokens[1:5]
+        return tokens[1:4]
+    if kind == 'X':
+        # The nodes are followed by the subcircuit name and parameters.
+        end = len(tokens)
+        while end > 2 and ('=' in tokens[end - 1] or
+                           tokens[end - 1].lower() == 'params:'):
+            end -= 1
+        return tokens[1:end - 1]
+    if kind == 'A':
+        # XSPICE code models: the nodes are followed by the model name.
+        # Vector brackets and port type prefixes aren't nodes.
+        return [token.strip('[]~') for token in tokens[1:-1]
+                if token.strip('[]~') and token[0] != '%']
+    return []
+
+
+def to_numpy(values):
+    """Convert an array.array of integers into a numpy array of intp."""
+    dtype = np.dtype('i' + str(values.itemsize))
+    return np.frombuffer(values, dtype=dtype).astype(np.intp)
+
+
+class NetlistGraph(object):
+    """A compact index of which elements connect to which nodes.
+
+    Node and element names are stored in lower case, like ngspice does, and
+    node names are interned into integer ids, with the ground node as id 0.
+    Nodes inside a subcircuit definition are local to it and are named
+    '<subckt>.<node>'. The incidence of elements and nodes is stored in CSR
+    form:
+
+        elem_ptr
+            elem_nodes[elem_ptr[i]:elem_ptr[i + 1]] are the ids of the
+            nodes of element i.
+        node_ptr
+            node_elems[node_ptr[j]:node_ptr[j + 1]] are the indices of the
+            elements connected to node j.
+
+    elem_types holds the first letter of each element's name as a byte and
+    elem_lines the line number in the netlist at which it is defined.
+
+    Example:
+        >>> graph = NetlistGraph(net.netlist)
+        >>> graph.elements_at('out')
+        ['r1', 'c1', 'm2']
+        >>> graph.floating_nodes()
+        []
+    """
+
+    def __init__(self, netlist_list):
+        """Class constructor.
+
+        Parameters:
+            netlist_list
+                A list of the stripped lines of a netlist, e.g. the netlist
+                attribute of a Netlist.
+        """
+        self.build(netlist_list)
+
+    def build(self, netlist_list):
+        """Build the index from scratch."""
+        lines = join_lines(netlist_list)
+
+        self.models = set()
+        for idx, line in lines:
+            if line[0] == '.':
+                tokens = line.split()
+                if tokens[0].upper() == '.MODEL' and len(tokens) > 1:
+                    self.models.add(tokens[1].lower())
+
+        self.elem_names = []
+        self.subckt_names = []
+        self.instances = Counter()
+        nodes = []
+        counts = array('l')
+        elem_types = bytearray()
+        elem_lines = array('l')
+
+        elem_names = self.elem_names
+        models = self.models
+        scope = ''
+        # ngspice ignores case, so the names are stored in lower case.
+        for idx, line in lines:
+            tokens = line.lower().split()
+            if line[0] == '.':
+                if tokens[0] == '.subckt':
+                    scope = tokens[1] + '.'
+                    self.subckt_names.append(tokens[1])
+                elif tokens[0] == '.ends':
+                    scope = ''
+                continue
+
+            kind = line[0].upper()
+            if fixed_nodes.get(kind) == 2:
+                elem_nodes = tokens[1:3]
+            else:
+                elem_nodes = element_nodes(tokens, models)
+                if kind == 'X' and len(tokens) > len(elem_nodes) + 1:
+                    self.instances[tokens[len(elem_nodes) + 1]] += 1
+            if scope:
+                elem_nodes = [node if node in ground_names else scope + node
+                              for node in elem_nodes]
+
+            nodes.extend(elem_nodes)
+            counts.append(len(elem_nodes))
+            elem_names.append(scope + tokens[0])
+            elem_types.append(ord(kind))
+            elem_lines.append(idx)
+
+        # Intern the node names in the order in which they first appear.
+        self.node_names = ['0']
+        self.node_names.extend(node for node in dict.fromkeys(nodes)
+                               if node not in ground_names)
+        self.node_ids = dict(zip(self.node_names,
+                                 range(len(self.node_names))))
+        for name in ground_names:
+            self.node_ids[name] = 0
+
+        self.elem_ptr = np.zeros(len(counts) + 1, dtype=np.intp)
+        np.cumsum(to_numpy(counts), out=self.elem_ptr[1:])
+        self.elem_nodes = np.fromiter(map(self.node_ids.__getitem__, nodes),
+                                      dtype=np.intp, count=len(nodes))
+        self.elem_types = np.frombuffer(bytes(elem_types), dtype=np.uint8)
+        self.elem_lines = to_numpy(elem_lines)
+        self.elem_index = dict(zip(elem_names, range(len(elem_names))))
+        self.line_elems = dict(zip(self.elem_lines.tolist(),
+                                   range(len(elem_names))))
+        self.__build_node_index__()
+
+    def __build_node_index__(self):
+        """Build the node to element index by transposing the CSR arrays."""
+        counts = np.diff(self.elem_ptr)
+        elems = np.repeat(np.arange(len(counts)), counts)
+        order = np.argsort(self.elem_nodes, kind='stable')
+        self.node_elems = elems[order]
+        self.node_ptr = np.zeros(len(self.node_names) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(self.elem_nodes,
+                              minlength=len(self.node_names)),
+                  out=self.node_ptr[1:])
+        self.dirty = False
+
+    def update_line(self, netlist_list, idx):
+        """Update the index after line idx of the netlist was replaced.
+
+        If the line is an element whose number of nodes didn't change, only
+        its nodes are updated, and the nodes are renumbered like a rebuild
+        would on the next lookup. Otherwise the index is rebuilt.
+
+        Parameters:
+            netlist_list
+                The lines of the netlist after the change.
+            idx
+                The number of the line that was changed.
+        """
+        line = netlist_list[idx]
+        elem = self.line_elems.get(idx)
+        next_line = netlist_list[idx + 1] if idx + 1 < len(netlist_list)\
+            else ''
+        # Lines that continue, are inside a subcircuit or aren't elements
+        # are handled by rebuilding the index.
+        if elem is None or not line or line[0] in '.*+' or\
+                next_line.startswith('+') or '.' in self.elem_names[elem]:
+            self.build(netlist_list)
+            return
+
+        tokens = line.lower().split()
+        nodes = element_nodes(tokens, self.models)
+        start, stop = self.elem_ptr[elem], self.elem_ptr[elem + 1]
+        if len(nodes) != stop - start or tokens[0] != self.elem_names[elem]:
+            self.build(netlist_list)
+            return
+
+        for i, node in enumerate(nodes):
+            node_id = self.node_ids.get(node)
+            if node_id is None:
+                node_id = self.node_ids[node] = len(self.node_names)
+                self.node_names.append(node)
+            self.elem_nodes[start + i] = node_id
+        self.dirty = True
+
+    def __compact__(self):
+        """Renumber the nodes in the order in which they first appear.
+
+        Nodes that are no longer connected to any element are dropped, so
+        the ids and names are the same as those of a rebuilt index.
+        """
+        ids, first = np.unique(self.elem_nodes, return_index=True)
+        order = ids[np.argsort(first, kind='stable')]
+        order = np.concatenate(([0], order[order != 0]))
+        remap = np.zeros(len(self.node_names), dtype=np.intp)
+        remap[order] = np.arange(len(order))
+        self.elem_nodes = remap[self.elem_nodes]
+        self.node_names = [self.node_names[node_id] for node_id in order]
+        self.node_ids = dict(zip(self.node_names,
+                                 range(len(self.node_names))))
+        for name in ground_names:
+            self.node_ids[name] = 0
+
+    def __check__(self):
+        if self.dirty:
+            self.__compact__()
+            self.__build_node_index__()
+
+    def node_id(self, node):
+        """Return the id of a node, raising a KeyError if it doesn't exist."""
+        self.__check__()
+        return self.node_ids[node.lower()]
+
+    def nodes_of(self, element):
+        """Return the names of the nodes of an element."""
+        elem = self.elem_index[element.lower()]
+        ids = self.elem_nodes[self.elem_ptr[elem]:self.elem_ptr[elem + 1]]
+        return [self.node_names[node_id] for node_id in ids]
+
+    def elements_at(self, node):
+        """Return the names of the elements connected to a node."""
+        self.__check__()
+        node_id = self.node_id(node)
+        elems = self.node_elems[self.node_ptr[node_id]:
+                                self.node_ptr[node_id + 1]]
+        return [self.elem_names[elem] for elem in elems]
+
+    def degrees(self):
+        """Return the number of element terminals connected to each node."""
+        self.__check__()
+        return np.diff(self.node_ptr)
+
+    def floating_nodes(self):
+        """Return the nodes that are connected to fewer than two terminals.
+
+        Nodes of subcircuit definitions are excluded since they can be
+        connected through the subcircuit's ports.
+        """
+        degrees = self.degrees()
+        return [self.node_names[node_id]
+                for node_id in np.flatnonzero(degrees < 2)
+                if node_id != 0 and '.' not in self.node_names[node_id]]
+
+    def type_counts(self):
+        """Return a Counter of the number of elements of each type."""
+        kinds, counts = np.unique(self.elem_types, return_counts=True)
+        return Counter(dict((chr(kind), int(count))
+                            for kind, count in zip(kinds, counts)))
+
+    def subckt_instances(self):
+        """Return a Counter of the number of instances of each subcircuit."""
+        return Counter(self.instances)
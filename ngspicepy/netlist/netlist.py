@@ -1,12 +1,48 @@
 """The netlist class."""
 import ngspicepy as ng
 
-from ngspicepy.ngspicepy import __parse__
+from collections import OrderedDict
+from ngspicepy.ngspicepy import __parse__, loaded_buffer, NetlistBuffer,\
+    ngspice_lock
+from ngspicepy.plot import Plot
+from .diff import NetlistDiff
+from .graph import NetlistGraph
 import os
 
 import string
 
 
+def read_netlist(netlist):
+    """Return the non-empty, stripped lines of a netlist.
+
+    Parameters:
+        1. A string file (with path) of the netlist file.
+        2. A string containing the netlist with each line separated by a
+           newline.
+        3. A list of strings, where each item is a line of the netlist.
+        4. A NetlistBuffer.
+    """
+    if type(netlist) == NetlistBuffer:
+        netlist_list = netlist.to_list()
+    elif type(netlist) == str:
+        if os.path.isfile(netlist):
+            with open(netlist) as f:
+                netlist_list = f.readlines()
+        elif '\n' in netlist:
+            netlist_list = netlist.split('\n')
+        else:
+            raise ValueError('Invalid netlist file or string')
+    elif type(netlist) == list:
+        netlist_list = netlist
+    else:
+        raise TypeError('Netlist format unsupported.\
+                Must be a string or list')
+
+    return [item.strip()
+            for item in netlist_list
+            if item.strip() != '']
+
+
 class Netlist(object):
     """A class that represents SPICE netlists."""
 
@@ -18,27 +54,154 @@ class Netlist(object):
             2. A string containing the netlist with each line separated by a
                newline.
             3. A list of strings, where each item is a line of the netlist.
+            4. A NetlistBuffer, which is reused when loading the netlist if
+               none of its lines are blank or padded.
         """
-        if type(netlist) == str:
-            if os.path.isfile(netlist):
-                with open(netlist) as f:
-                    netlist_list = f.readlines()
-            elif '\n' in netlist:
-                netlist_list = netlist.split('\n')
-            else:
-                raise ValueError('Invalid netlist file or string')
-        elif type(netlist) == list:
-            netlist_list = netlist
-        else:
-            raise TypeError('Netlist format unsupported.\
-                    Must be a string or list')
-
-        self.netlist = [item.strip()
-                        for item in netlist_list
-                        if item.strip() != '']
+        self.netlist = read_netlist(netlist)
 
         self.__checkNetlist__()
 
+        if type(netlist) == NetlistBuffer and\
+                len(netlist) == len(self.netlist) and\
+                netlist.to_list() == self.netlist:
+            self._buffer = netlist
+
+        self.analyses = []
+        self.__forget_circuit__()
+
+    @classmethod
+    def _from_checked(cls, netlist_list):
+        """Create a Netlist from stripped lines that were already checked."""
+        net = cls.__new__(cls)
+        net.netlist = netlist_list
+        net.analyses = []
+        net.__forget_circuit__()
+        return net
+
+    def __forget_circuit__(self):
+        """Forget the circuit loaded into ngspice by load()."""
+        # The lines that were loaded, the lines that the circuit reflects
+        # after update() and the NetlistBuffer that was loaded.
+        self._loaded = None
+        self._applied = None
+        self._loaded_buffer = None
+
+    @property
+    def netlist(self):
+        """The list of the lines of the netlist.
+
+        Assigning a new list discards the cached NetlistBuffer. Call
+        invalidate() after modifying the list in place.
+        """
+        return self._netlist
+
+    @netlist.setter
+    def netlist(self, netlist_list):
+        self._netlist = netlist_list
+        self._buffer = None
+        self._graph = None
+
+    def invalidate(self):
+        """Discard the cached NetlistBuffer and NetlistGraph.
+
+        Call this after the lines were modified in place.
+        """
+        self._buffer = None
+        self._graph = None
+
+    def replace_line(self, idx, line):
+        """Replace a line of the netlist, updating the cached NetlistGraph.
+
+        Parameters:
+            idx
+                The index of the line in the netlist attribute.
+            line
+                The new line.
+        """
+        self._netlist[idx] = line.strip()
+        self._buffer = None
+        if self._graph is not None:
+            self._graph.update_line(self._netlist, idx)
+
+    def get_graph(self):
+        """Return the NetlistGraph of the netlist, building it if needed."""
+        if self._graph is None:
+            self._graph = NetlistGraph(self._netlist)
+        return self._graph
+
+    def get_buffer(self):
+        """Return the netlist as a NetlistBuffer, building it if needed."""
+        if self._buffer is None:
+            self._buffer = NetlistBuffer(self._netlist)
+        return self._buffer
+
+    def load(self):
+        """Load the netlist into ngspice."""
+        buffer = self.get_buffer()
+        ng.load_netlist(buffer)
+        self._loaded = list(self._netlist)
+        self._applied = self._loaded
+        self._loaded_buffer = buffer
+
+    def is_loaded(self):
+        """Return True if the current circuit in ngspice is this netlist.
+
+        This is the case if the netlist was loaded by load(), run() or
+        update(), no other netlist was loaded since and the lines weren't
+        changed. Commands sent to ngspice, e.g. alter, aren't tracked.
+        """
+        return self._loaded_buffer is not None and\
+            loaded_buffer() is self._loaded_buffer and\
+            self._applied == self._netlist
+
+    def update(self, netlist):
+        """Replace the netlist, updating the circuit loaded in ngspice.
+
+        The new version is compared with the loaded one using a NetlistDiff.
+        Changed element values and model parameters are applied with alter
+        and altermod, and changed .param values with alterparam and reset,
+        which is much faster than loading a large netlist again. The netlist
+        is only loaded again if its topology changed or the circuit isn't the
+        current one in ngspice.
+
+        Returns the NetlistDiff, or None if the netlist wasn't loaded.
+
+        Parameters:
+            netlist
+                The new version, as a Netlist or in any of the formats that
+                the constructor accepts.
+
+        Example:
+            >>> net.run()
+            >>> net.update(net.netlist[:4] + ['R2 out 0 2k'] + net.netlist[5:])
+            >>> net.run()
+        """
+        if not isinstance(netlist, Netlist):
+            netlist = Netlist(netlist)
+
+        diff = None
+        if self._applied is not None and\
+                loaded_buffer() is self._loaded_buffer:
+            diff = NetlistDiff(self._applied, netlist.netlist)
+        self.netlist = list(netlist.netlist)
+        if diff is None or diff.needs_reload:
+            self.load()
+            return diff
+
+        commands = diff.alter_commands
+        if diff.param_commands:
+            # reset discards the alter commands sent since the netlist was
+            # loaded, so the element values are set relative to that version.
+            base = NetlistDiff(self._loaded, self._netlist)
+            if base.needs_reload:
+                self.load()
+                return diff
+            commands = diff.param_commands + ['reset'] + base.alter_commands
+        for command in commands:
+            ng.send_command(command)
+        self._applied = list(self._netlist)
+        return diff
+
     def setup_sim(self, sim_type, *args, **kwargs):
         """Set up the simulation.
         
@@ -61,14 +224,163 @@ class Netlist(object):
         else:
             self.parsed_args = __parse__(sim_type, *args, **kwargs)
 
+    def add_analysis(self, sim_type, *args, name=None, **kwargs):
+        """Queue an analysis to be run by the next call to run().
+
+        Parameters:
+            sim_type
+                The type of the simulation (op, dc, ac or tran)
+            ``*args``
+                The simulation parameters as arguments
+            name
+                The key under which the analysis' results are returned by
+                run(). Defaults to sim_type, followed by a count if that
+                type was already queued.
+            ``**kwargs``
+                The simulation parameters as keyword arguments
+
+        Examples:
+            >>> add_analysis('op')
+            >>> add_analysis('dc', 'v1 0 1 .3')
+            >>> add_analysis('ac', 'dec 10 1 10', name='bode')
+        """
+        if sim_type == 'op':
+            parsed_args = []
+        else:
+            parsed_args = __parse__(sim_type, *args, **kwargs)
+
+        if name is None:
+            name = sim_type
+            count = 1
+            while name in (analysis[0] for analysis in self.analyses):
+                count += 1
+                name = sim_type + str(count)
+        elif name in (analysis[0] for analysis in self.analyses):
+            raise ValueError('Analysis name already used: ' + name)
+
+        self.analyses.append((name, sim_type, parsed_args))
+
+    def clear_analyses(self):
+        """Remove all the analyses queued by add_analysis()."""
+        self.analyses = []
+
     def run(self):
         """Run the simulation.
 
         Depending on the arguments set in the set_simu() this function simply
         run that simulation.
+
+        If analyses were queued using add_analysis(), the netlist is loaded
+        once and all of them are run on it instead. The operating point
+        analysis, if queued, is run first. The other analyses aren't seeded
+        with it, each of them computes its own operating point. An
+        OrderedDict is returned whose keys are the analysis names and whose
+        values are the Plots generated by the corresponding analyses. Like
+        get_vectors(), these used to be dictionaries of numpy arrays, use
+        Plot.to_dict() to get one. A RuntimeError is raised if an analysis
+        fails, and ngspice_lock is held while they run so that no other
+        thread changes the current plot.
+
+        The netlist is only loaded again if is_loaded() is False, e.g. when
+        its lines were changed without update().
         """
-        ng.load_netlist(self.netlist)
-        ng.send_command(self.sim_type + ' ' + ' '.join(self.parsed_args))
+        if not self.is_loaded():
+            self.load()
+        if not self.analyses:
+            ng.send_command(self.sim_type + ' ' + ' '.join(self.parsed_args))
+            return
+
+        # The operating point is run first, its plot then comes before those
+        # of the other analyses.
+        analyses = sorted(self.analyses, key=lambda a: a[1] != 'op')
+
+        plots = {}
+        with ngspice_lock:
+            for name, sim_type, parsed_args in analyses:
+                plots[name] = self.__run_analysis__(sim_type, parsed_args)
+
+        results = OrderedDict()
+        for name, sim_type, parsed_args in self.analyses:
+            results[name] = plots[name]
+        return results
+
+    def run_dc(self, *args, workers=None, overlap=1, timeout=None, **kwargs):
+        """Run a DC sweep of the netlist and return its plot.
+
+        The queued analyses aren't run. With workers, the sweep is split
+        over the values of its outer source and the slices are run in
+        parallel, see ngspicepy.parallel. A PlotData is returned in that
+        case, whose vectors are 2-D, outer by inner, for nested sweeps, and
+        a Plot otherwise. A RuntimeError is raised if the analysis fails.
+
+        Parameters:
+            ``*args``, ``**kwargs``
+                The DC parameters, see ngspicepy.run_dc().
+            workers
+                The number of worker processes, or a WorkerPool.
+            overlap
+                The number of values that each slice runs before its own,
+                see ngspicepy.parallel.parallel_dc().
+            timeout
+                The number of seconds after which a worker is considered to
+                be hung.
+
+        Examples:
+            >>> plot = net.run_dc('v1 0 1 1m')
+            >>> plot = net.run_dc('v1 0 1 1m v2 0 1 0.1', workers=4)
+        """
+        parsed_args = __parse__('dc', *args, **kwargs)
+        if workers:
+            from ngspicepy.parallel import parallel_dc
+
+            return parallel_dc(self._netlist, parsed_args, workers, overlap,
+                               timeout)
+        return self.__run_analysis__('dc', parsed_args)
+
+    def run_ac(self, *args, workers=None, timeout=None, **kwargs):
+        """Run an AC analysis of the netlist and return its plot.
+
+        The queued analyses aren't run. With workers, the frequency range is
+        split into one sub-range per worker process and the sub-ranges are
+        run in parallel, see ngspicepy.parallel. A PlotData is returned in
+        that case and a Plot otherwise. A RuntimeError is raised if the
+        analysis fails.
+
+        Parameters:
+            ``*args``, ``**kwargs``
+                The AC parameters, see ngspicepy.run_ac().
+            workers
+                The number of worker processes, or a WorkerPool.
+            timeout
+                The number of seconds after which a worker is considered to
+                be hung.
+
+        Examples:
+            >>> plot = net.run_ac('dec 10 1 1g')
+            >>> plot = net.run_ac('dec 100 1 1g', workers=4)
+        """
+        parsed_args = __parse__('ac', *args, **kwargs)
+        if workers:
+            from ngspicepy.parallel import parallel_ac
+
+            return parallel_ac(self._netlist, parsed_args, workers, timeout)
+        return self.__run_analysis__('ac', parsed_args)
+
+    def __run_analysis__(self, sim_type, parsed_args):
+        """Run an analysis and return its Plot.
+
+        A RuntimeError is raised if the analysis didn't create a plot.
+        """
+        with ngspice_lock:
+            if not self.is_loaded():
+                self.load()
+            plots_before = ng.get_plot_names()
+            ng.send_command(sim_type + ' ' + ' '.join(parsed_args))
+            plot_name = ng.current_plot()
+            if plot_name in plots_before:
+                raise RuntimeError('Simulation failed: ' +
+                                   ' '.join(ng.get_errors()))
+            return Plot(plot_name)
 
     def get_current_plot(self):
         """Return the name of the latest plot."""
@@ -109,13 +421,21 @@ class Netlist(object):
         return ng.get_data(vector_name, plot_name)
 
     def get_vectors(self, plot_name=None):
-        """Return a dictionary of all vectors in the specified plot.
-        
+        """Return a Plot of all vectors in the specified plot.
+
+        The Plot maps the vector names to Vector objects whose data is only
+        fetched when it is used. Use Plot.to_dict() to get a dictionary of
+        numpy arrays.
+
+        Note that this used to return a dictionary of numpy arrays. A Plot
+        is a read-only Mapping and not a dict, so code that modifies the
+        result or checks isinstance(result, dict) has to call to_dict().
+
         Parameter:
             plot_name
                 It specifies the name of the plot.
         """
-        return ng.get_all_data(plot_name)
+        return Plot(plot_name)
 
     def __checkNetlist__(self):
         """Check if the netlist is valid."""
@@ -195,6 +515,13 @@ class Netlist(object):
                                          command + "':\n" +
                                          line)
 
+    def __getstate__(self):
+        """Return the state for pickling, without the NetlistBuffer."""
+        state = self.__dict__.copy()
+        state['_buffer'] = None
+        state['_loaded_buffer'] = None
+        return state
+
     def __str__(self):
         r"""Return the netlist followed by next line character."""
         return '\n'.join(self.netlist)
@@ -0,0 +1,197 @@
+"""The netlist template class."""
+import re
+
+from .netlist import Netlist, read_netlist
+
+# A parameter field is a brace expression holding nothing but a name, e.g.
+# {rload}. Braces holding expressions, e.g. {2*rload}, are left to ngspice.
+field_re = re.compile(r'\{\s*([A-Za-z_]\w*)\s*\}')
+# An assignment on a .param line, e.g. rload=1k or gain={2*rload}
+param_re = re.compile(r"([A-Za-z_]\w*)\s*=\s*(\{[^}]*\}|'[^']*'|\S+)")
+
+
+class NetlistTemplate(object):
+    """A netlist whose parameters can be substituted to create variants.
+
+    The base netlist is parsed and checked once. Parameters are written as
+    ngspice brace expressions, e.g. {rload}, and default values may be given
+    using .param lines. Variants can then be generated either by substituting
+    the values in place or by overriding the .param definitions.
+
+    Example
+    -------
+
+        >>> amp = NetlistTemplate('CS-Amp.cir')
+        >>> amp.params
+        ('rload', 'cload')
+        >>> net = amp.netlist(rload='10k', cload='1p')
+        >>> ng.load_netlist(amp.encode(rload='10k', cload='1p'))
+    """
+
+    def __init__(self, netlist):
+        """Class constructor.
+
+        Parameters:
+            1. A string file (with path) of the netlist file.
+            2. A string containing the netlist with each line separated by a
+               newline.
+            3. A list of strings, where each item is a line of the netlist.
+        """
+        self.lines = read_netlist(netlist)
+
+        params = []
+        self.defaults = {}
+        self.param_lines = {}
+        self.formats = {}
+        for idx, line in enumerate(self.lines):
+            if line.split()[0].upper() == '.PARAM':
+                for name, value in param_re.findall(line):
+                    self.defaults[name] = value
+                    self.param_lines[name] = idx
+
+            names = field_re.findall(line)
+            if not names:
+                continue
+            for name in names:
+                if name not in params:
+                    params.append(name)
+            # Build a format string for str.format_map(), escaping the
+            # braces that aren't parameter fields.
+            pieces = field_re.split(line)
+            fmt = ''.join('{' + piece + '}' if i % 2 else
+                          piece.replace('{', '{{').replace('}', '}}')
+                          for i, piece in enumerate(pieces))
+            self.formats[idx] = fmt
+
+        self.params = tuple(params)
+
+        # Check the netlist with a dummy subcircuit instance in place of the
+        # fields. The substituted values are not checked again.
+        Netlist._from_checked([field_re.sub('X', line)
+                               for line in self.lines]).__checkNetlist__()
+
+        self.encoded = [line.encode() for line in self.lines]
+
+    def check_params(self, params):
+        """Raise a KeyError if a parameter isn't part of the template."""
+        for name in params:
+            if name not in self.params and name not in self.defaults:
+                raise KeyError('invalid keyword argument: ' + name)
+
+    def __values__(self, params):
+        """Merge the given parameter values with the defaults.
+
+        Fields in a default, e.g. r2={rx}, are resolved recursively, since
+        the .param lines that define the fields are substituted as well and
+        a default pasted as is could refer to a name that no longer exists.
+        """
+        values = {}
+        pending = []
+
+        def resolve(name):
+            if name in values:
+                return values[name]
+            if name in params:
+                value = str(params[name])
+            else:
+                if name in pending:
+                    raise ValueError('Circular default: ' + name)
+                pending.append(name)
+                value = field_re.sub(
+                    lambda m: resolve(m.group(1)) if m.group(1) in params or
+                    m.group(1) in self.defaults else m.group(0),
+                    self.defaults[name])
+                pending.pop()
+            values[name] = value
+            return value
+
+        missing = [name for name in self.params
+                   if name not in params and name not in self.defaults]
+        if missing:
+            raise ValueError('Arguments missing: ' + ' '.join(missing))
+        for name in self.params:
+            resolve(name)
+        return values
+
+    def __override__(self, lines, params):
+        """Rewrite the .param lines that define the given parameters.
+
+        The rewritten lines are stored in lines, a list or dictionary indexed
+        by line number, and are based on the lines it already holds. Returns
+        the parameters that aren't defined by any .param line.
+        """
+        undefined = []
+        edited = {}
+        for name, value in params.items():
+            if name in self.param_lines:
+                idx = self.param_lines[name]
+                edited.setdefault(idx, {})[name] = str(value)
+            else:
+                undefined.append(name)
+
+        for idx, values in edited.items():
+            if isinstance(lines, list) or idx in lines:
+                line = lines[idx]
+            else:
+                line = self.lines[idx]
+            lines[idx] = param_re.sub(
+                lambda m: m.group(1) + '=' + values.get(m.group(1),
+                                                        m.group(2)),
+                line)
+        return undefined
+
+    def substitute(self, **params):
+        """Return the lines of the netlist with the parameters substituted.
+
+        Parameters without a value are replaced by their .param default. The
+        .param lines that define the given parameters are updated as well so
+        that expressions using them stay consistent.
+        """
+        self.check_params(params)
+        values = self.__values__(params)
+        lines = list(self.lines)
+        for idx, fmt in self.formats.items():
+            lines[idx] = fmt.format_map(values)
+        self.__override__(lines, params)
+        return lines
+
+    def encode(self, **params):
+        """Return substitute() as a list of bytes that load_netlist accepts.
+
+        Only the lines that change are encoded again.
+        """
+        self.check_params(params)
+        values = self.__values__(params)
+        lines = list(self.encoded)
+        changed = {}
+        for idx, fmt in self.formats.items():
+            changed[idx] = fmt.format_map(values)
+        self.__override__(changed, params)
+        for idx, line in changed.items():
+            lines[idx] = line.encode()
+        return lines
+
+    def netlist(self, **params):
+        """Return substitute() as a Netlist without checking it again."""
+        return Netlist._from_checked(self.substitute(**params))
+
+    def overrides(self, **params):
+        """Return the lines of the netlist with .param overrides.
+
+        The parameter fields are left for ngspice to evaluate. The .param
+        lines that define the given parameters are rewritten with the new
+        values and parameters that aren't defined get a new .param line after
+        the title.
+        """
+        self.check_params(params)
+        lines = list(self.lines)
+        undefined = self.__override__(lines, params)
+        if undefined:
+            lines.insert(1, '.param ' +
+                         ' '.join(name + '=' + str(params[name])
+                                  for name in undefined))
+        return lines
+
+    def __str__(self):
+        r"""Return the netlist followed by next line character."""
+        return '\n'.join(self.lines)
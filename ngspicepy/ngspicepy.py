@@ -1,14 +1,18 @@
 """The API wrapper for ngspice's shared library."""
+import functools
 import os
 import string
+import threading
 from collections import OrderedDict
-from ctypes import c_bool, c_char_p, c_double, c_int, c_short,\
-    c_void_p, cast, cdll, CFUNCTYPE, create_string_buffer,\
-    POINTER, Structure
+from concurrent.futures import ThreadPoolExecutor
+from ctypes import addressof, c_bool, c_char_p, c_double, c_int, c_short,\
+    c_void_p, cdll, CFUNCTYPE, create_string_buffer, POINTER, Structure
 from queue import Queue
 
 import numpy as np
 
+from .waveform import decimate as decimate_fns
+
 # Load the ngspice shared library.
 # TODO: Figure out the path intelligently
 libpath = "/usr/local/lib/libngspice.so.0"
@@ -19,8 +23,25 @@ else:  # pragma: no cover
 
 send_char_queue = Queue()
 send_stat_queue = Queue()
+send_error_queue = Queue()
 is_simulating = False
 
+# Serializes the calls into the shared library. It is reentrant since the user
+# functions call one another.
+ngspice_lock = threading.RLock()
+
+# Functions called with the command after each call to send_command(), e.g. by
+# PlotManager to collect the plots created by an analysis.
+command_hooks = []
+
+# Functions called with a plot name and an object that points into the memory
+# of the plot, i.e. each array returned by get_data() and each Plot and Vector
+# array, e.g. by PlotManager to keep the plot alive while the object is.
+data_hooks = []
+
+# The NetlistBuffer of the circuit that was loaded last, see loaded_buffer().
+last_buffer = None
+
 
 # enums for v_type.
 # See src/include/ngspice/sim.h in the ngspice source.
@@ -162,7 +183,11 @@ def SendChar(output, lib_id, ret_ptr):
             send_char_queue.put(to_print)
     elif 'stderr' in clean_output:  # pragma: no cover
         if 'warning' not in clean_output.lower():
-            raise SystemError(" ".join(clean_output.split(' ')[1:]))
+            # Exceptions raised here can't reach the caller, so the errors
+            # are queued for get_errors() instead.
+            error = " ".join(clean_output.split(' ')[1:]).strip()
+            send_error_queue.put(error)
+            send_char_queue.put(error)
         else:
             send_char_queue.put(clean_output)
     return 0
@@ -194,6 +219,15 @@ libngspice.ngSpice_AllVecs.restype  = POINTER(c_char_p)
 
 
 # Utility functions
+def synchronized(func):
+    """Decorate func so that it holds ngspice_lock while it runs."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with ngspice_lock:
+            return func(*args, **kwargs)
+    return wrapper
+
+
 def xstr(string):
     """Like str(), except that None is converted to ''."""
     if string is None:
@@ -391,15 +425,26 @@ def __parse__(sim_cmd, *args, **kwargs):
 
 
 # User functions
+@synchronized
 def send_command(command):
     """Send a command to ngspice.
 
     The argument `command` is string that contains a valid ngspice
     command. See the chapter 'Interactive Interpreter' of the ngspice
     manual: http://ngspice.sourceforge.net/docs/ngspice26-manual.pdf
+
+    The functions in command_hooks are called with the command after it
+    has run. If any of them raises, the first error is raised once all of
+    them have been called.
     """
     while not send_stat_queue.empty():
         send_stat_queue.get_nowait()
+    # Drop output that wasn't collected so that it isn't attributed to this
+    # command.
+    while not send_char_queue.empty():
+        send_char_queue.get_nowait()
+    while not send_error_queue.empty():
+        send_error_queue.get_nowait()
 
     libngspice.ngSpice_Command(create_string_buffer(command.encode()))
 
@@ -407,9 +452,47 @@ def send_command(command):
 
     while not send_char_queue.empty():
         output.append(send_char_queue.get_nowait())
+
+    # The command has run, so every hook is called before an error of one
+    # of them is raised.
+    error = None
+    for hook in list(command_hooks):
+        try:
+            hook(command)
+        except Exception as e:
+            if error is None:
+                error = e
+    if error is not None:
+        raise error
     return output
 
 
+@synchronized
+def get_errors():
+    """Return the error messages printed by ngspice for the last command.
+
+    The messages are those printed since the last call to send_command() or
+    load_netlist(). They are removed once they're returned.
+    """
+    errors = []
+    while not send_error_queue.empty():
+        errors.append(send_error_queue.get_nowait())
+    return errors
+
+
+def parallel_netlist(analysis):
+    """Return the lines of the loaded netlist for the workers of an analysis.
+
+    Raises a ValueError if the netlist was loaded from a file.
+    """
+    netlist_buffer = loaded_buffer()
+    if netlist_buffer is None:
+        raise ValueError('A parallel ' + analysis + ' analysis needs a '
+                         'netlist that was loaded from lines, not from a '
+                         'file')
+    return netlist_buffer.to_list()
+
+
 def run_dc(*args, **kwargs):
     r"""Run a DC simulation on ngspice.
 
@@ -426,6 +509,20 @@ def run_dc(*args, **kwargs):
         strings or floats. If they are strings, they must contain only a
         float and optionally one of ngspice's scale factors and no spaces.
 
+        workers
+            The number of worker processes, or a WorkerPool. If given, the
+            sweep is split over the values of its outer source and the
+            slices are run in parallel on the netlist that was loaded last,
+            see ngspicepy.parallel. A PlotData with the results is returned
+            instead of ngspice's output. Its vectors are 2-D, outer by
+            inner, for nested sweeps.
+        overlap
+            The number of values that each slice runs before its own, see
+            ngspicepy.parallel.parallel_dc(). Defaults to 1.
+        timeout
+            The number of seconds after which a worker is considered to be
+            hung.
+
     Examples:
 
         >>> run_dc('v1 0 1 0.1')
@@ -433,8 +530,17 @@ def run_dc(*args, **kwargs):
         >>> run_dc('v1', 0, '1meg', '1k')
         >>> run_dc(src='v1', start=0, stop=1, step=0.1\\
                    src2='v2', start2=0, step2=0.3, stop2=1)
+        >>> plot = run_dc('v1 0 1 1m v2 0 1 0.1', workers=4)
     """
+    workers = kwargs.pop('workers', None)
+    overlap = kwargs.pop('overlap', 1)
+    timeout = kwargs.pop('timeout', None)
     parsed_args = __parse__('dc', *args, **kwargs)
+    if workers:
+        from .parallel import parallel_dc
+
+        return parallel_dc(parallel_netlist('DC'), parsed_args, workers,
+                           overlap, timeout)
     return send_command('dc ' + ' '.join(parsed_args))
 
 
@@ -452,14 +558,32 @@ def run_ac(*args, **kwargs):
         ``*kwargs``
             The arguements in variation, npoints, fstart or fstop specified as
             keyword arguments
+        workers
+            The number of worker processes, or a WorkerPool. If given, the
+            frequency range is split into one sub-range per worker and the
+            sub-ranges are run in parallel on the netlist that was loaded
+            last, see ngspicepy.parallel. A PlotData with the results is
+            returned instead of ngspice's output. Commands sent after
+            loading the netlist, e.g. alter, don't reach the workers.
+        timeout
+            The number of seconds after which a worker is considered to be
+            hung.
 
     Examples:
         >>> run_ac('dec 10 1 10')
         >>> run_ac('dec 10 1k 10meg')
         >>> run_ac('dec', 10, '1k', '100k')
         >>> run_ac(variation='dec', npoints=0, fstart=1, fstop=10)
+        >>> plot = run_ac('dec 100 1 10g', workers=4)
     """
+    workers = kwargs.pop('workers', None)
+    timeout = kwargs.pop('timeout', None)
     parsed_args = __parse__('ac', *args, **kwargs)
+    if workers:
+        from .parallel import parallel_ac
+
+        return parallel_ac(parallel_netlist('AC'), parsed_args, workers,
+                           timeout)
     return send_command('ac ' + ' '.join(parsed_args))
 
 
@@ -534,6 +658,7 @@ def reset():
     clear_plots()
 
 
+@synchronized
 def get_plot_names():
     """Return a list of plot names.
 
@@ -555,12 +680,14 @@ def get_plot_names():
     return names_list
 
 
+@synchronized
 def current_plot():
     """Return the name of the current plot."""
     plot_name = libngspice.ngSpice_CurPlot()
     return (plot_name.decode())
 
 
+@synchronized
 def get_vector_names(plot_name=None):
     """Return a list of the names of the vectors in the given plot.
     
@@ -588,27 +715,123 @@ def get_vector_names(plot_name=None):
     return names_list
 
 
-def get_data(vector_arg, plot_arg=None):
+@synchronized
+def get_scale_name(plot_name=None):
+    """Return the name of the scale vector of the given plot.
+
+    The scale is the vector against which the other vectors of the plot are
+    computed: time for transient, frequency for AC and the swept source for
+    DC analyses.
+
+    Parameter:
+        plot_name
+            denotes the plot name. The current plot is used if it is
+            unspecified.
+    """
+    vector_names = get_vector_names(plot_name)
+    for scale_name in ('time', 'frequency'):
+        if scale_name in vector_names:
+            return scale_name
+    for vector_name in vector_names:
+        if vector_name.endswith('-sweep'):
+            return vector_name
+    raise ValueError("Unable to find the scale of the plot")
+
+
+@synchronized
+def get_data(vector_arg, plot_arg=None, t_window=None, decimate=None,
+             mode='minmax', with_scale=False):
     """Get the data in a vector as a numpy array.
 
+    The array points to ngspice's memory and isn't copied unless the vector
+    is decimated.
+
     Parameters:
         vector_arg
             denotes the vector name
         plot_agr
             denotes the plot name
+        t_window
+            A tuple (start, stop) that limits the data to the points where the
+            scale of the plot (see get_scale_name()) lies between start and
+            stop. The window is found by a binary search on the scale.
+        decimate
+            The maximum number of points to return. Only real vectors can be
+            decimated.
+        mode
+            The decimation algorithm. 'minmax' keeps the minimum and maximum
+            of each bucket of points, which preserves the envelope. 'lttb' uses
+            the largest triangle three buckets algorithm, which preserves the
+            visual shape.
+        with_scale
+            If True, a tuple of the scale and data arrays is returned. The
+            decimated points are at different scale values for different
+            vectors, so the scale is needed to plot them.
+
+    Examples:
+        >>> get_data('v(out)')
+        >>> get_data('v(out)', t_window=(1e-3, 2e-3))
+        >>> t, v_out = get_data('tran1.v(out)', decimate=2000, with_scale=True)
     """
     if '.' in vector_arg:
         plot_name, vector_name = vector_arg.split('.')
         if vector_name not in get_vector_names(plot_name):
             raise ValueError("Incorrect vector name")
     else:
+        plot_name = plot_arg
         if vector_arg not in get_vector_names(plot_arg):
             raise ValueError("Incorrect vector name")
         if plot_arg is not None:
             vector_arg = ".".join([plot_arg, vector_arg])
 
+    data = __vector_data__(vector_arg)
+    if plot_name is None and (data_hooks or t_window is not None or
+                              decimate is not None or with_scale):
+        plot_name = current_plot()
+    if t_window is None and decimate is None and not with_scale:
+        __track_data__(plot_name, data)
+        return data
+
+    scale = __vector_data__(".".join([plot_name,
+                                      get_scale_name(plot_name)]))
+
+    if t_window is not None:
+        start, stop = decimate_fns.window(scale, *t_window)
+        scale = scale[start:stop]
+        data = data[start:stop]
+
+    if decimate is not None:
+        if np.iscomplexobj(data):
+            raise TypeError('Only real vectors can be decimated')
+        if mode == 'minmax':
+            scale, data = decimate_fns.minmax(scale, data, decimate)
+        elif mode == 'lttb':
+            scale, data = decimate_fns.lttb(scale, data, decimate)
+        else:
+            raise ValueError('Invalid decimation mode: ' + mode)
+
+    __track_data__(plot_name, scale)
+    __track_data__(plot_name, data)
+    if with_scale:
+        return scale, data
+    return data
+
+
+def __track_data__(plot_name, obj):
+    """Call the data_hooks with an object that points into a plot."""
+    for hook in data_hooks:
+        hook(plot_name, obj)
+
+
+def __vector_data__(vector_arg):
+    """Return the data of a vector without checking if it exists."""
     info = libngspice.ngGet_Vec_Info(
         create_string_buffer(vector_arg.encode()))
+    return info_to_array(info)
+
+
+def info_to_array(info):
+    """Return a numpy array that points to the data of a vector_info."""
     if info.contents.v_flags & v_flags.VF_REAL != 0:
         data = np.ctypeslib.as_array(info.contents.v_realdata,
                                      shape=(info.contents.v_length,))
@@ -619,6 +842,7 @@ def get_data(vector_arg, plot_arg=None):
     return data
 
 
+@synchronized
 def get_all_data(plot_name=None):
     """Return a dictionary of all vectors in the specified plot.
 
@@ -630,7 +854,7 @@ def get_all_data(plot_name=None):
 
     vector_data = {}
     for vector_name in vector_names:
-        vector_data[vector_name] = get_data(vector_name)
+        vector_data[vector_name] = get_data(vector_name, plot_name)
 
     return vector_data
 
@@ -655,6 +879,138 @@ def set_options(*args, **kwargs):
                             str(kwargs[option]))
 
 
+class Dispatcher(object):
+    """Run ngspice calls from any number of threads on a single thread.
+
+    The module level functions are already serialized by a lock, but a
+    sequence of calls, e.g. loading a netlist, running an analysis and reading
+    its vectors, can still be interleaved with the calls of other threads. A
+    Dispatcher owns a thread that runs the submitted calls one after another
+    and returns a concurrent.futures.Future for each of them, so that a
+    sequence can be submitted as one function.
+
+    Example:
+        >>> dispatcher = Dispatcher()
+        >>> future = dispatcher.send_command('dc v1 0 1 0.1')
+        >>> output = future.result()
+        >>> def characterize(netlist):
+        ...     load_netlist(netlist)
+        ...     run_dc('v1 0 1 0.1')
+        ...     return get_data('v(1)').copy()
+        >>> v1 = dispatcher.submit(characterize, 'circuit.net').result()
+        >>> dispatcher.shutdown()
+    """
+
+    def __init__(self):
+        """Class constructor. Starts the dispatcher thread."""
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def submit(self, func, *args, **kwargs):
+        """Schedule func(*args, **kwargs) and return its Future.
+
+        Numpy arrays returned by get_data() point into ngspice's memory which
+        a later call may free, so func should return copies of them.
+        """
+        return self.executor.submit(synchronized(func), *args, **kwargs)
+
+    def send_command(self, command):
+        """Schedule send_command(). The Future's result is its output."""
+        return self.submit(send_command, command)
+
+    def load_netlist(self, netlist):
+        """Schedule load_netlist(). The Future's result is its output."""
+        return self.submit(load_netlist, netlist)
+
+    def get_data(self, vector_arg, plot_arg=None):
+        """Schedule get_data(). The Future's result is a copy of the data."""
+        return self.submit(lambda: get_data(vector_arg, plot_arg).copy())
+
+    def shutdown(self, wait=True):
+        """Stop the dispatcher thread once the scheduled calls are done."""
+        self.executor.shutdown(wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+class NetlistBuffer(object):
+    """A netlist encoded once into a buffer that ngSpice_Circ accepts.
+
+    The lines are stored back to back in one NUL separated byte string and an
+    array of pointers to the start of each line is built using numpy. Passing
+    a NetlistBuffer to load_netlist skips the per-line encoding and copying.
+
+    Example:
+        >>> buf = NetlistBuffer(['* Title', 'R1 1 0 1', '.end'])
+        >>> load_netlist(buf)
+    """
+
+    def __init__(self, netlist_list):
+        """Class constructor.
+
+        Parameters:
+            netlist_list
+                A list of strings or bytes, where each item is a line of the
+                netlist.
+        """
+        try:
+            data = '\0'.join(netlist_list).encode() + b'\0'
+        except TypeError:
+            data = b'\0'.join(line if type(line) == bytes else line.encode()
+                               for line in netlist_list) + b'\0'
+        self.__set_data__(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Create a NetlistBuffer from the lines already joined by NULs.
+
+        Parameters:
+            data
+                The encoded lines, each followed by a NUL, e.g.
+                b'* Title\\0R1 1 0 1\\0.end\\0'.
+        """
+        if data[-1:] != b'\0':
+            raise ValueError('The last line must end with a NUL')
+        buf = cls.__new__(cls)
+        buf.__set_data__(data)
+        return buf
+
+    def __set_data__(self, data):
+        """Store the data and build the pointers to its lines."""
+        self.data = create_string_buffer(data, len(data))
+
+        # Each line starts right after the NUL that ends the previous one.
+        nuls = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == 0)
+        self.pointers = np.empty(len(nuls) + 1, dtype=np.uintp)
+        self.pointers[0] = 0
+        self.pointers[1:] = nuls + 1
+        self.pointers += addressof(self.data)
+        self.pointers[-1] = 0
+        self.lines = self.pointers.ctypes.data_as(POINTER(c_char_p))
+
+    def __len__(self):
+        """Return the number of lines in the netlist."""
+        return len(self.pointers) - 1
+
+    def to_list(self):
+        """Return the lines of the netlist as a list of strings."""
+        return self.data.raw[:-1].decode().split('\0')
+
+
+@synchronized
+def loaded_buffer():
+    """Return the NetlistBuffer of the circuit that was loaded last.
+
+    Returns None if no netlist was loaded or the last one was loaded from a
+    file. This tells a Netlist whether its circuit is still the current one.
+    """
+    return last_buffer
+
+
+@synchronized
 def load_netlist(netlist):
     """Load ngspice with the specified netlist.
 
@@ -662,33 +1018,38 @@ def load_netlist(netlist):
         netlist : str
             1. The path to a file that contains the netlist.
             2. A list of strings where each string is one line of the netlist.
+               The lines may also be given as encoded bytes.
             3. A string containing the entire netlist with each line separated by a
                newline character.
+            4. A NetlistBuffer. This is the fastest way to load the same
+               netlist repeatedly.
 
         The function does not check if the netlist is valid. An invalid
         netlist may cause ngspice to crash.
     """
-    if type(netlist) == str:
+    global last_buffer
+
+    if type(netlist) == NetlistBuffer:
+        netlist_buffer = netlist
+    elif type(netlist) == str:
         if os.path.isfile(netlist):
+            last_buffer = None
             return send_command('source ' + netlist)
         elif '\n' in netlist:
-            netlist_list = netlist.split('\n')
+            netlist_buffer = NetlistBuffer(netlist.split('\n'))
         else:
             raise ValueError('Invalid netlist file or string')
     elif type(netlist) == list:
-        netlist_list = netlist
+        netlist_buffer = NetlistBuffer(netlist)
     else:
         raise TypeError('Netlist format unsupported.\
                 Must be a string or list')
 
-    c_char_p_array = c_char_p * (len(netlist_list) + 1)
-    netlist_str = c_char_p_array()
-
-    for i, line in enumerate(netlist_list):
-        netlist_str[i] = cast(create_string_buffer(line.encode()), c_char_p)
-    netlist_str[len(netlist_list)] = None
+    while not send_error_queue.empty():
+        send_error_queue.get_nowait()
 
-    libngspice.ngSpice_Circ(netlist_str)
+    libngspice.ngSpice_Circ(netlist_buffer.lines)
+    last_buffer = netlist_buffer
 
     output = []
 
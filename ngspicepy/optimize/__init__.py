@@ -0,0 +1,27 @@
+"""
+Circuit Optimization
+====================
+
+optimize() searches for the values of netlist parameters that minimize an
+objective computed from the results of one or more analyses, subject to
+constraints. The local Nelder-Mead method and global differential evolution
+are available. Simulations can be run in parallel by a pool of worker
+processes, points that were already simulated are taken from a cache, and
+the cache can be checkpointed to a file so that long runs can be resumed.
+
+Example
+-------
+
+    >>> def bandwidth(results):
+    ...     ...
+    >>> def max_power(results):
+    ...     return results['op']['i(vdd)'][0] * -1.8 - 1e-3
+    >>> result = optimize('CS-Amp.cir', {'rd': (1e3, 1e5), 'w': (1e-6, 1e-4)},
+    ...                   bandwidth, [('op',), ('ac', 'dec 10 1 1g')],
+    ...                   constraints=[max_power], method='de', workers=8,
+    ...                   seed=1, checkpoint='amp.json')
+    >>> result.x, result.feasible
+"""
+from .evaluator import Evaluator, evaluate, simulate
+from .search import differential_evolution, nelder_mead, optimize,\
+    OptimizeResult
@@ -0,0 +1,185 @@
+"""The evaluator class."""
+import json
+import os
+
+import numpy as np
+
+import ngspicepy as ng
+
+from ngspicepy.netlist import Netlist, NetlistTemplate
+from ngspicepy.ngspicepy import ngspice_lock
+
+# The score of a point whose simulation failed.
+failed = (float('inf'), float('inf'))
+
+
+def simulate(netlist_list, analyses):
+    """Run analyses on a netlist and return copies of the results.
+
+    Returns a dictionary with the analysis names as keys and dictionaries of
+    the vector arrays as values. The plots are destroyed afterwards. A
+    RuntimeError is raised if an analysis didn't create a plot.
+
+    Parameters:
+        netlist_list
+            The lines of a netlist that was already checked.
+        analyses
+            A list of tuples of the arguments of Netlist.add_analysis(),
+            e.g. [('op',), ('ac', 'dec 10 1 1meg')].
+    """
+    with ngspice_lock:
+        net = Netlist._from_checked(netlist_list)
+        for analysis in analyses:
+            net.add_analysis(*analysis)
+        plots_before = ng.get_plot_names()
+        plots = net.run()
+        results = dict((name, dict((vector_name, np.array(plot[vector_name]))
+                                   for vector_name in plot))
+                       for name, plot in plots.items())
+        new_plots = [plot_name for plot_name in ng.get_plot_names()
+                     if plot_name not in plots_before]
+        if new_plots:
+            ng.clear_plots(new_plots)
+
+    if any(plot.name in plots_before for plot in plots.values()):
+        raise RuntimeError('Simulation failed: ' + ' '.join(ng.get_errors()))
+    return results
+
+
+def evaluate(netlist_list, analyses, objective, constraints):
+    """Simulate a netlist and return its (objective, violation) pair.
+
+    The violation is the sum of the positive values of the constraints. This
+    function is what the Workers run, so objective and constraints have to
+    be top level functions.
+    """
+    results = simulate(netlist_list, analyses)
+    value = float(objective(results))
+    violation = sum(max(0.0, float(constraint(results)))
+                    for constraint in constraints)
+    return value, violation
+
+
+class Evaluator(object):
+    """Evaluates batches of design points, in parallel if a pool is given.
+
+    The design variables are netlist parameters, which are set through .param
+    overrides of a NetlistTemplate. A point is scored by the (violation,
+    objective) tuple of its simulation so that feasible points are better
+    than infeasible ones and are compared by their objective. Points that
+    fail to simulate score (inf, inf).
+
+    The scores are memoized, so points that are visited again aren't
+    simulated again. If a checkpoint file is given, the scores are written to
+    it after every batch and read back by the next Evaluator. A search with a
+    fixed seed then replays the same points and resumes where it stopped.
+    Failed points aren't written, since their failure may be transient,
+    e.g. a worker that timed out, so a resumed search simulates them again.
+    """
+
+    def __init__(self, netlist, variables, objective, analyses,
+                 constraints=(), pool=None, checkpoint=None):
+        """Class constructor.
+
+        Parameters:
+            netlist
+                A NetlistTemplate or anything its constructor accepts.
+            variables
+                An ordered dictionary mapping the names of the parameters to
+                their (lower, upper) bounds.
+            objective
+                A function that takes the results returned by simulate() and
+                returns the value to be minimized.
+            analyses
+                The analyses to run, see simulate().
+            constraints
+                A list of functions that take the results, like objective.
+                A point is feasible if they all return values <= 0.
+            pool
+                A WorkerPool that runs the simulations. They're run in this
+                process if it is None.
+            checkpoint
+                A JSON file in which the scores are stored.
+        """
+        if not isinstance(netlist, NetlistTemplate):
+            netlist = NetlistTemplate(netlist)
+        self.template = netlist
+        self.names = list(variables)
+        self.template.check_params(self.names)
+        self.bounds = np.array([variables[name] for name in self.names],
+                               dtype=float).reshape(-1, 2)
+        if np.any(self.bounds[:, 0] >= self.bounds[:, 1]):
+            raise ValueError('The lower bounds must be below the upper bounds')
+        self.objective = objective
+        self.analyses = [tuple(analysis) for analysis in analyses]
+        self.constraints = list(constraints)
+        self.pool = pool
+        self.checkpoint = checkpoint
+
+        self.cache = {}
+        # The points whose simulations failed, which aren't checkpointed.
+        self.failures = set()
+        # The number of points asked for and of simulations run.
+        self.nevals = 0
+        self.nsims = 0
+        if checkpoint is not None and os.path.isfile(checkpoint):
+            with open(checkpoint) as f:
+                state = json.load(f)
+            if state['names'] != self.names:
+                raise ValueError('The checkpoint has different variables: ' +
+                                 ' '.join(state['names']))
+            for x, value, violation in state['scores']:
+                self.cache[tuple(x)] = (violation, value)
+
+    def to_params(self, u):
+        """Map a point of the unit cube to the design variables."""
+        lower, upper = self.bounds[:, 0], self.bounds[:, 1]
+        return lower + np.clip(u, 0, 1) * (upper - lower)
+
+    def netlist(self, x):
+        """Return the lines of the netlist for the design variables x."""
+        return self.template.overrides(**dict(
+            (name, repr(float(value))) for name, value in zip(self.names, x)))
+
+    def __call__(self, points):
+        """Return the scores of a batch of points of the unit cube."""
+        keys = [tuple(float(value) for value in self.to_params(u))
+                for u in points]
+        self.nevals += len(keys)
+        new = [key for key in dict.fromkeys(keys) if key not in self.cache]
+        if new:
+            args_list = [(self.netlist(key), self.analyses, self.objective,
+                          self.constraints) for key in new]
+            if self.pool is not None:
+                results = self.pool.map(evaluate, args_list,
+                                        return_exceptions=True)
+            else:
+                results = []
+                for args in args_list:
+                    try:
+                        results.append(evaluate(*args))
+                    except Exception as e:
+                        results.append(e)
+            for key, result in zip(new, results):
+                if isinstance(result, Exception):
+                    self.cache[key] = failed
+                    self.failures.add(key)
+                else:
+                    self.cache[key] = (result[1], result[0])
+            self.nsims += len(new)
+            self.save()
+        return [self.cache[key] for key in keys]
+
+    def save(self):
+        """Write the scores to the checkpoint file."""
+        if self.checkpoint is None:
+            return
+        state = {'names': self.names,
+                 'scores': [[list(key), value, violation]
+                            for key, (violation, value) in self.cache.items()
+                            if key not in self.failures]}
+        # Write to a temporary file first so that an interrupted run doesn't
+        # leave a truncated checkpoint.
+        with open(self.checkpoint + '.tmp', 'w') as f:
+            json.dump(state, f)
+        os.replace(self.checkpoint + '.tmp', self.checkpoint)
@@ -0,0 +1,262 @@
+"""The search methods and the optimize function."""
+import numpy as np
+
+from ngspicepy.worker.pool import WorkerPool
+
+from .evaluator import Evaluator
+
+
+def nelder_mead(evaluate, u0, max_evals, xtol=1e-4, step=0.1):
+    """Minimize with the Nelder-Mead simplex method in the unit cube.
+
+    The method only compares scores, so it works with the (violation,
+    objective) tuples of an Evaluator. The vertices of the initial simplex
+    and those of a shrink step are evaluated in one batch.
+
+    Parameters:
+        evaluate
+            A function that returns the scores of a list of points.
+        u0
+            The starting point.
+        max_evals
+            The maximum number of points to evaluate.
+        xtol
+            The search stops when all the vertices are within xtol of the
+            best one.
+        step
+            The size of the initial simplex.
+
+    Returns the best point and its score.
+    """
+    ndim = len(u0)
+    simplex = [np.clip(u0, 0, 1)]
+    for i in range(ndim):
+        vertex = simplex[0].copy()
+        # Step away from the nearest bound.
+        vertex[i] += step if vertex[i] + step <= 1 else -step
+        simplex.append(vertex)
+    scores = evaluate(simplex)
+    nevals = len(simplex)
+
+    while nevals < max_evals:
+        order = sorted(range(ndim + 1), key=scores.__getitem__)
+        simplex = [simplex[i] for i in order]
+        scores = [scores[i] for i in order]
+        if max(np.max(np.abs(vertex - simplex[0]))
+               for vertex in simplex[1:]) < xtol:
+            break
+
+        centroid = np.mean(simplex[:-1], axis=0)
+        reflected = np.clip(2 * centroid - simplex[-1], 0, 1)
+        reflected_score, = evaluate([reflected])
+        nevals += 1
+        if reflected_score < scores[0]:
+            expanded = np.clip(3 * centroid - 2 * simplex[-1], 0, 1)
+            expanded_score, = evaluate([expanded])
+            nevals += 1
+            if expanded_score < reflected_score:
+                simplex[-1], scores[-1] = expanded, expanded_score
+            else:
+                simplex[-1], scores[-1] = reflected, reflected_score
+            continue
+        if reflected_score < scores[-2]:
+            simplex[-1], scores[-1] = reflected, reflected_score
+            continue
+
+        if reflected_score < scores[-1]:
+            contracted = (centroid + reflected) / 2
+        else:
+            contracted = (centroid + simplex[-1]) / 2
+        contracted_score, = evaluate([contracted])
+        nevals += 1
+        if contracted_score < min(reflected_score, scores[-1]):
+            simplex[-1], scores[-1] = contracted, contracted_score
+            continue
+
+        # Shrink towards the best vertex.
+        simplex[1:] = [(simplex[0] + vertex) / 2 for vertex in simplex[1:]]
+        scores[1:] = evaluate(simplex[1:])
+        nevals += ndim
+
+    best = min(range(ndim + 1), key=scores.__getitem__)
+    return simplex[best], scores[best]
+
+
+def differential_evolution(evaluate, ndim, max_evals, popsize=None,
+                           mutation=0.8, crossover=0.9, xtol=1e-4, seed=None,
+                           u0=None):
+    """Minimize with differential evolution (rand/1/bin) in the unit cube.
+
+    Each generation is evaluated in one batch, so it runs in parallel when
+    the Evaluator has a WorkerPool.
+
+    Parameters:
+        evaluate
+            A function that returns the scores of a list of points.
+        ndim
+            The number of design variables.
+        max_evals
+            The maximum number of points to evaluate.
+        popsize
+            The size of the population. Defaults to 10 * ndim, but at least
+            5.
+        mutation, crossover
+            The differential weight and the crossover probability.
+        xtol
+            The search stops when the population is within xtol of the best
+            point in every dimension.
+        seed
+            The seed of the random numbers. Runs with the same seed visit the
+            same points.
+        u0
+            A point that replaces the first member of the initial population.
+
+    Returns the best point and its score.
+    """
+    if popsize is None:
+        popsize = max(5, 10 * ndim)
+    random = np.random.RandomState(seed)
+    population = random.uniform(size=(popsize, ndim))
+    if u0 is not None:
+        population[0] = np.clip(u0, 0, 1)
+    scores = evaluate(list(population))
+    nevals = popsize
+
+    while nevals + popsize <= max_evals:
+        best = min(range(popsize), key=scores.__getitem__)
+        if np.all(np.ptp(population, axis=0) < xtol):
+            break
+
+        trials = np.empty_like(population)
+        for i in range(popsize):
+            others = [j for j in range(popsize) if j != i]
+            a, b, c = population[random.choice(others, 3, replace=False)]
+            mutant = np.clip(a + mutation * (b - c), 0, 1)
+            crossed = random.uniform(size=ndim) < crossover
+            # At least one variable comes from the mutant.
+            crossed[random.randint(ndim)] = True
+            trials[i] = np.where(crossed, mutant, population[i])
+        trial_scores = evaluate(list(trials))
+        nevals += popsize
+
+        for i in range(popsize):
+            if trial_scores[i] <= scores[i]:
+                population[i] = trials[i]
+                scores[i] = trial_scores[i]
+
+    best = min(range(popsize), key=scores.__getitem__)
+    return population[best], scores[best]
+
+
+class OptimizeResult(object):
+    """The result of optimize().
+
+    Attributes:
+        x
+            A dictionary of the best values of the design variables.
+        value
+            The objective at x.
+        violation
+            The sum of the positive constraint values at x.
+        feasible
+            True if all the constraints are met at x.
+        nevals
+            The number of points that were evaluated.
+        nsims
+            The number of simulations that were run. Points found in the
+            cache or the checkpoint aren't simulated.
+    """
+
+    def __init__(self, x, score, nevals, nsims):
+        self.x = x
+        self.violation, self.value = score
+        self.feasible = self.violation == 0
+        self.nevals = nevals
+        self.nsims = nsims
+
+    def __repr__(self):
+        return 'OptimizeResult(x=' + repr(self.x) + ', value=' +\
+            repr(self.value) + ', feasible=' + repr(self.feasible) + ')'
+
+
+def optimize(netlist, variables, objective, analyses, constraints=(),
+             method='nelder-mead', x0=None, workers=0, max_evals=200,
+             checkpoint=None, timeout=None, **options):
+    """Find the netlist parameters that minimize an objective.
+
+    Parameters:
+        netlist
+            A NetlistTemplate or anything its constructor accepts.
+        variables
+            An ordered dictionary mapping the names of the parameters to
+            their (lower, upper) bounds.
+        objective
+            A function of the results of the analyses that returns the value
+            to be minimized. The results are a dictionary with the analysis
+            names as keys, e.g. 'ac', and dictionaries of the vector arrays
+            as values.
+        analyses
+            A list of tuples of the arguments of Netlist.add_analysis(),
+            e.g. [('ac', 'dec 10 1 1meg')].
+        constraints
+            A list of functions of the results. The constraints are met when
+            they all return values <= 0. Feasible points are always
+            preferred to infeasible ones.
+        method
+            'nelder-mead' for a local search from x0 or 'de' for a global
+            search with differential evolution.
+        x0
+            A dictionary of the starting values. Defaults to the middle of
+            the bounds.
+        workers
+            The number of worker processes that run the simulations. They
+            are run in this process if it is 0. With workers, objective and
+            constraints must be top level functions so that they can be
+            pickled.
+        max_evals
+            The maximum number of points to evaluate.
+        checkpoint
+            A JSON file that stores the evaluated points. Running again with
+            the same arguments resumes from it. For 'de', this requires the
+            seed option. Points that failed are simulated again.
+        timeout
+            The number of seconds after which a simulation in a worker is
+            considered to be hung. The point is then scored as failed.
+        ``**options``
+            Passed on to nelder_mead() or differential_evolution(), e.g.
+            seed or popsize.
+
+    Example:
+        >>> def gain(results):
+        ...     return -np.abs(results['ac']['v(out)'][0])
+        >>> result = optimize('CS-Amp.cir', {'rd': (1e3, 1e5)}, gain,
+        ...                   [('ac', 'dec 10 1 1meg')], method='de',
+        ...                   workers=4, seed=1, checkpoint='amp.json')
+        >>> result.x
+        {'rd': 98765.4}
+    """
+    if method not in ('nelder-mead', 'de'):
+        raise ValueError('Invalid method: ' + method)
+    pool = WorkerPool(workers, timeout=timeout) if workers else None
+    try:
+        evaluator = Evaluator(netlist, variables, objective, analyses,
+                              constraints, pool, checkpoint)
+        lower, upper = evaluator.bounds[:, 0], evaluator.bounds[:, 1]
+        u0 = None
+        if x0 is not None:
+            x0 = np.array([x0[name] for name in evaluator.names], dtype=float)
+            u0 = (x0 - lower) / (upper - lower)
+
+        if method == 'nelder-mead':
+            if u0 is None:
+                u0 = np.full(len(lower), 0.5)
+            u, score = nelder_mead(evaluator, u0, max_evals, **options)
+        else:
+            u, score = differential_evolution(evaluator, len(lower),
+                                              max_evals, u0=u0, **options)
+    finally:
+        if pool is not None:
+            pool.close()
+
+    x = dict(zip(evaluator.names, evaluator.to_params(u).tolist()))
+    return OptimizeResult(x, score, evaluator.nevals, evaluator.nsims)
@@ -0,0 +1,36 @@
+"""
+Parallel Analyses
+=================
+
+Some analyses consist of many points that can be run apart on several
+ngspice processes of a WorkerPool, each of which loads the same netlist.
+
+The points of an AC analysis are independent once the circuit is linearized
+at its operating point. parallel_ac() splits the frequency range into one
+sub-range per worker and concatenates the results into one PlotData whose
+frequency vector is in ascending order.
+
+parallel_dc() splits a DC sweep over the values of its source, or of its
+second, outer source if the sweep is nested. The inner sweeps run whole and
+in order on one worker, and each slice first runs the value before it, so
+every point starts from the same solution as in a single sweep. The vectors
+of a nested sweep come back as 2-D arrays, outer by inner.
+
+run_ac(), run_dc(), Netlist.run_ac() and Netlist.run_dc() use these
+functions when they are given workers.
+
+Example
+-------
+
+    >>> ng.load_netlist(lines)
+    >>> plot = ng.run_ac('dec 100 1 10g', workers=4)
+    >>> plot['frequency'], plot['v(out)']
+    >>> plot = ng.run_dc('vds 0 1.8 10m vgs 0 1.8 0.1', workers=4)
+    >>> plot['i(vds)'].shape
+    (19, 181)
+    >>> with WorkerPool(4) as pool:
+    ...     plot = parallel_ac(lines, ['dec', '100', '1', '10g'], pool)
+"""
+from .ac import merge_ac, parallel_ac, split_ac
+from .dc import merge_dc, parallel_dc, split_dc
+from .runner import map_ranges, run_range
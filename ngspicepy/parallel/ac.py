@@ -0,0 +1,128 @@
+"""AC analyses split over frequency ranges."""
+import math
+
+import numpy as np
+
+from ngspicepy.ngspicepy import to_num
+from ngspicepy.worker.transport import PlotData
+
+from .runner import format_num, map_ranges, pool_size
+
+# The relative distance below which two frequencies are the same point.
+same_frequency = 1e-9
+
+
+def split_ac(parsed_args, nparts):
+    """Split the arguments of an AC analysis into nparts sub-ranges.
+
+    The sub-ranges lie on the frequency grid of the whole analysis and have
+    about the same number of points. Neighbouring sub-ranges share their
+    boundary point, which merge_ac() keeps once. Fewer sub-ranges are
+    returned if there are fewer points than nparts.
+
+    Parameters:
+        parsed_args
+            The arguments returned by __parse__('ac', ...), i.e. variation,
+            npoints, fstart and fstop.
+        nparts
+            The number of sub-ranges.
+
+    Example:
+        >>> split_ac(['dec', '10', '1', '1k'], 3)
+        [['dec', '10', '1', '10'], ['dec', '10', '10', '100'],
+         ['dec', '10', '100', '1k']]
+    """
+    variation, npoints, fstart, fstop = parsed_args
+    npoints = int(to_num(npoints))
+    start = to_num(fstart)
+    stop = to_num(fstop)
+
+    if variation == 'lin':
+        nsteps = npoints - 1
+
+        def frequency(k):
+            return start + k * (stop - start) / nsteps
+    else:
+        base = 10.0 if variation == 'dec' else 2.0
+        if start <= 0 or stop <= start:
+            return [list(parsed_args)]
+        nsteps = int(math.floor(npoints * math.log(stop / start, base) +
+                                same_frequency))
+
+        def frequency(k):
+            return start * base ** (k / npoints)
+
+    if nparts < 2 or nsteps < 2:
+        return [list(parsed_args)]
+
+    bounds = sorted(set(int(round(k)) for k in
+                        np.linspace(0, nsteps, min(nparts, nsteps) + 1)))
+    parts = []
+    for k_start, k_stop in zip(bounds[:-1], bounds[1:]):
+        part_start = format_num(frequency(k_start)) if k_start else fstart
+        part_stop = fstop if k_stop == nsteps else\
+            format_num(frequency(k_stop))
+        if variation == 'lin':
+            part_npoints = str(k_stop - k_start + 1)
+        else:
+            part_npoints = str(npoints)
+        parts.append([variation, part_npoints, part_start, part_stop])
+    return parts
+
+
+def merge_ac(parts):
+    """Concatenate the PlotData of the sub-ranges of an AC analysis.
+
+    The parts are ordered by frequency and the points of a part that aren't
+    above the last frequency of the parts before it, i.e. shared boundary
+    points, are dropped. Returns a PlotData named after the first part.
+    """
+    parts = sorted(parts, key=lambda part: part['frequency'][0].real)
+    keep = []
+    last = None
+    for part in parts:
+        frequency = np.real(part['frequency'])
+        if last is None:
+            mask = np.ones(len(frequency), dtype=bool)
+        else:
+            mask = frequency > last + abs(last) * same_frequency
+        keep.append(mask)
+        if mask.any():
+            last = frequency[mask][-1]
+
+    vectors = dict((vector_name,
+                    np.concatenate([part[vector_name][mask]
+                                    for part, mask in zip(parts, keep)]))
+                   for vector_name in parts[0])
+    return PlotData(parts[0].name, dict(parts[0].v_types), vectors)
+
+
+def parallel_ac(netlist_list, parsed_args, workers, timeout=None):
+    """Run an AC analysis split over the frequency range on a WorkerPool.
+
+    Each Worker loads the netlist, computes its operating point and sweeps
+    one sub-range of frequencies, see split_ac(). The points of an AC
+    analysis are independent once the circuit is linearized, so the results
+    are the same as those of a single analysis. Returns them as a PlotData
+    with the frequency vector in ascending order.
+
+    Parameters:
+        netlist_list
+            The lines of the netlist.
+        parsed_args
+            The arguments returned by __parse__('ac', ...).
+        workers
+            The number of Workers, or a WorkerPool to run the ranges on.
+            The range is split into one part per Worker.
+        timeout
+            The number of seconds after which a Worker is considered to be
+            hung. Only used if a new pool is started.
+
+    Example:
+        >>> plot = parallel_ac(lines, ['dec', '100', '1', '10g'], 4)
+        >>> plot['frequency'], plot['v(out)']
+    """
+    parts = map_ranges(netlist_list, 'ac',
+                       split_ac(parsed_args, pool_size(workers)), workers,
+                       timeout)
+    return merge_ac(parts)
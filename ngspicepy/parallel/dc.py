@@ -0,0 +1,147 @@
+"""DC sweeps split over the values of their outer source."""
+import math
+
+import numpy as np
+
+from ngspicepy.ngspicepy import to_num
+from ngspicepy.worker.transport import PlotData
+
+from .runner import format_num, map_ranges, pool_size
+
+
+def sweep_count(start, stop, step):
+    """Return the number of values of a sweep from start to stop by step."""
+    return int(math.floor((stop - start) / step + 1e-9)) + 1
+
+
+def split_dc(parsed_args, nparts, overlap=1):
+    """Split the arguments of a DC sweep into nparts slices.
+
+    A nested sweep is split over the values of its second, outer source, so
+    each inner sweep runs whole and in order on one Worker. A single sweep
+    is split over the values of its source. The slices have about the same
+    number of values and fewer are returned if there are fewer values than
+    nparts.
+
+    ngspice starts each point of a sweep from the solution of the point
+    before it. To give the first point of a slice the same start, a slice
+    begins overlap values early and merge_dc() drops the results of those
+    values.
+
+    Returns a list of (arguments, lead, nvalues) tuples, where lead is the
+    number of values run before the slice and nvalues the number of values
+    of the split source that the arguments run, including them.
+
+    Parameters:
+        parsed_args
+            The arguments returned by __parse__('dc', ...).
+        nparts
+            The number of slices.
+        overlap
+            The number of values run before each slice.
+
+    Example:
+        >>> split_dc(['v1', '0', '1', '0.1', 'v2', '0', '3', '1'], 2)
+        [(['v1', '0', '1', '0.1', 'v2', '0', '1.5', '1'], 0, 2),
+         (['v1', '0', '1', '0.1', 'v2', '1', '3', '1'], 1, 3)]
+    """
+    parsed_args = list(parsed_args)
+    offset = 4 if len(parsed_args) == 8 else 0
+    start, stop, step = (to_num(value) for value in
+                         parsed_args[offset + 1:offset + 4])
+    nvalues = sweep_count(start, stop, step)
+    if nparts < 2 or nvalues < 2:
+        return [(parsed_args, 0, nvalues)]
+
+    bounds = sorted(set(int(round(k)) for k in
+                        np.linspace(0, nvalues, min(nparts, nvalues) + 1)))
+    parts = []
+    for k_start, k_stop in zip(bounds[:-1], bounds[1:]):
+        lead = min(overlap, k_start)
+        args = list(parsed_args)
+        if k_start > lead:
+            args[offset + 1] = format_num(start + (k_start - lead) * step)
+        if k_stop < nvalues:
+            # Half a step past the last value, so that rounding can't drop
+            # it.
+            args[offset + 2] = format_num(start + (k_stop - 0.5) * step)
+        parts.append((args, lead, k_stop - k_start + lead))
+    return parts
+
+
+def merge_dc(plots, slices, nested):
+    """Assemble the PlotData of the slices of a DC sweep.
+
+    The results of the values that a slice ran before its own, see
+    split_dc(), are dropped. The vectors of a nested sweep are reshaped to 2-D
+    arrays with one row per value of the outer source and one column per
+    value of the inner one. Returns a PlotData named after the first slice.
+
+    Parameters:
+        plots
+            The PlotData of each slice, in order.
+        slices
+            The (arguments, lead, nvalues) tuples returned by split_dc().
+        nested
+            Whether the sweep has a second source.
+    """
+    ninner = 1
+    if nested:
+        lengths = set()
+        for plot, (args, lead, nvalues) in zip(plots, slices):
+            length = len(next(iter(plot.values())))
+            if length % nvalues:
+                raise RuntimeError('The sweep of ' + plot.name + ' has ' +
+                                   str(length) + ' points, which is not a '
+                                   'multiple of ' + str(nvalues))
+            lengths.add(length // nvalues)
+        if len(lengths) != 1:
+            raise RuntimeError('The slices have inner sweeps of different '
+                               'lengths')
+        ninner = lengths.pop()
+
+    vectors = {}
+    for vector_name in plots[0]:
+        data = np.concatenate([plot[vector_name][lead * ninner:] for
+                               plot, (args, lead, nvalues) in
+                               zip(plots, slices)])
+        vectors[vector_name] = data.reshape(-1, ninner) if nested else data
+    return PlotData(plots[0].name, dict(plots[0].v_types), vectors)
+
+
+def parallel_dc(netlist_list, parsed_args, workers, overlap=1, timeout=None):
+    """Run a DC sweep split over the values of its outer source.
+
+    Each Worker loads the netlist and runs one slice of the sweep, see
+    split_dc(). Returns the results as a PlotData. The vectors of a nested
+    sweep are 2-D arrays whose rows are the values of the second source
+    and whose columns are the values of the first one.
+
+    Parameters:
+        netlist_list
+            The lines of the netlist.
+        parsed_args
+            The arguments returned by __parse__('dc', ...).
+        workers
+            The number of Workers, or a WorkerPool to run the slices on.
+            The sweep is split into one slice per Worker.
+        overlap
+            The number of values of the split source that each slice runs
+            before its own, so that its first point starts from the same
+            solution as in a single sweep. A circuit with hysteresis may
+            need more and one that doesn't depend on the previous point
+            none.
+        timeout
+            The number of seconds after which a Worker is considered to be
+            hung. Only used if a new pool is started.
+
+    Example:
+        >>> plot = parallel_dc(lines, ['vds', '0', '1.8', '10m',
+        ...                            'vgs', '0', '1.8', '0.1'], 4)
+        >>> plot['i(vds)'].shape
+        (19, 181)
+    """
+    slices = split_dc(parsed_args, pool_size(workers), overlap)
+    plots = map_ranges(netlist_list, 'dc', [args for args, lead, nvalues in
+                                            slices], workers, timeout)
+    return merge_dc(plots, slices, len(parsed_args) == 8)
@@ -0,0 +1,74 @@
+"""Running the parts of a split analysis on a WorkerPool."""
+import numpy as np
+
+import ngspicepy as ng
+
+from ngspicepy.ngspicepy import loaded_buffer, ngspice_lock
+from ngspicepy.plot import Plot
+from ngspicepy.worker.pool import WorkerPool
+from ngspicepy.worker.transport import PlotData
+
+
+def format_num(value):
+    """Return a float as a number that ngspice reads without rounding."""
+    return '%.17g' % value
+
+
+def run_range(netlist_list, sim_type, parsed_args):
+    """Run an analysis on a netlist and return a copy of its plot.
+
+    This is what the Workers run. The netlist is only loaded if it isn't
+    the circuit that was loaded last, so a pool that runs several parts of
+    the same netlist loads it once per Worker. The plot is destroyed
+    afterwards.
+    """
+    with ngspice_lock:
+        buffer = loaded_buffer()
+        if buffer is None or buffer.to_list() != netlist_list:
+            ng.load_netlist(netlist_list)
+        plots_before = ng.get_plot_names()
+        ng.send_command(sim_type + ' ' + ' '.join(parsed_args))
+        plot_name = ng.current_plot()
+        if plot_name in plots_before:
+            raise RuntimeError('Simulation failed: ' +
+                               ' '.join(ng.get_errors()))
+        plot = Plot(plot_name)
+        v_types = {}
+        vectors = {}
+        for vector_name in plot:
+            vector = plot[vector_name]
+            v_types[vector_name] = vector.v_type
+            vectors[vector_name] = np.array(vector.data)
+        ng.clear_plots([plot_name])
+    return PlotData(plot_name, v_types, vectors)
+
+
+def map_ranges(netlist_list, sim_type, args_list, workers, timeout=None):
+    """Run the parts of an analysis with run_range() and return their plots.
+
+    Parameters:
+        netlist_list
+            The lines of the netlist.
+        sim_type
+            The type of the analysis, e.g. 'ac'.
+        args_list
+            A list with the parsed arguments of each part.
+        workers
+            The number of Workers, or a WorkerPool to run the parts on.
+        timeout
+            The number of seconds after which a Worker is considered to be
+            hung. Only used if a new pool is started.
+    """
+    pool = workers if isinstance(workers, WorkerPool) else\
+        WorkerPool(workers, timeout=timeout)
+    try:
+        return pool.map(run_range, [(netlist_list, sim_type, args)
+                                    for args in args_list])
+    finally:
+        if pool is not workers:
+            pool.close()
+
+
+def pool_size(workers):
+    """Return the number of Workers of workers, a number or a WorkerPool."""
+    return len(workers) if isinstance(workers, WorkerPool) else int(workers)
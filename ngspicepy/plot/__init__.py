@@ -0,0 +1,27 @@
+"""
+Plots and Vectors
+=================
+
+The Plot and Vector classes give an object interface to the plots and vectors
+in ngspice. Only the names of the vectors are fetched when a Plot is created.
+The metadata of a vector is fetched when it is first looked up and its data
+when it is first used.
+
+Example
+-------
+
+    >>> ng.run_tran('1u 10m')
+    >>> plot = Plot()
+    >>> v_out = plot['v(out)']
+    >>> len(v_out), v_out.dtype
+    >>> t = plot.scale.data
+    >>> v = v_out.data
+
+A PlotManager destroys old plots when the plots in ngspice exceed a memory
+budget:
+
+    >>> manager = PlotManager(max_bytes=500e6)
+    >>> manager.install()
+"""
+from .manager import PlotManager
+from .plot import Plot, Vector
@@ -0,0 +1,217 @@
+"""The plot manager class."""
+import weakref
+from collections import OrderedDict
+from ctypes import create_string_buffer
+
+import ngspicepy as ng
+
+from ngspicepy.ngspicepy import command_hooks, data_hooks, libngspice,\
+    ngspice_lock, v_flags
+
+from .plot import Plot
+
+
+def plot_size(plot_name):
+    """Return the number of bytes used by the data of the vectors in a plot.
+
+    Real points take 8 bytes and complex points 16 bytes.
+    """
+    size = 0
+    with ngspice_lock:
+        for vector_name in ng.get_vector_names(plot_name):
+            info = libngspice.ngGet_Vec_Info(create_string_buffer(
+                (plot_name + '.' + vector_name).encode()))
+            if not info:
+                continue
+            if info.contents.v_flags & v_flags.VF_COMPLEX != 0:
+                size += 16 * info.contents.v_length
+            else:
+                size += 8 * info.contents.v_length
+    return size
+
+
+class PlotManager(object):
+    """Destroys old plots to keep ngspice within a memory budget.
+
+    Every analysis leaves a new plot in ngspice, whose memory is only freed
+    when the plot is destroyed. A PlotManager keeps track of the plots and
+    destroys them, least recently used or oldest first, when their total size
+    or number exceeds the budget.
+
+    The 'const' plot, the current plot and pinned plots are never destroyed.
+    Neither are plots with outstanding Plots or arrays, since those point
+    into the plot's memory. Such plots are destroyed by a later collect()
+    once the objects are garbage collected.
+
+    Warning: only the objects created while the manager is installed are
+    tracked, i.e. those returned by ngspicepy.get_data(), Plot, Vector.data,
+    Netlist.run() and Netlist.get_vectors(), and those handed out by
+    get_plot() and get_data(). Plots that existed when install() was called
+    are never destroyed, since arrays of them may be outstanding. Arrays
+    obtained from a plot created while the manager was not installed point
+    into freed memory once the plot is destroyed, so copy them or pin the
+    plot.
+
+    Example:
+        >>> manager = PlotManager(max_bytes=500e6, max_plots=20)
+        >>> manager.install()
+        >>> for step in steps:
+        ...     ng.run_dc('v1', 0, 1, step)
+        ...     v = manager.get_data('v(out)').copy()
+        >>> manager.uninstall()
+    """
+
+    def __init__(self, max_bytes=None, max_plots=None, policy='lru'):
+        """Class constructor.
+
+        Parameters:
+            max_bytes
+                The maximum total size of the data in the managed plots.
+            max_plots
+                The maximum number of managed plots.
+            policy
+                'lru' to destroy the least recently used plots first or
+                'oldest' to destroy the oldest plots first.
+        """
+        if policy not in ('lru', 'oldest'):
+            raise ValueError('Invalid policy: ' + policy)
+        self.max_bytes = max_bytes
+        self.max_plots = max_plots
+        self.policy = policy
+        # Sizes of the managed plots, ordered from the first to be destroyed
+        # to the last.
+        self.sizes = OrderedDict()
+        self.pinned = set()
+        self.refs = {}
+        # The plots that existed when the manager was installed.
+        self.protected = set()
+        self._collecting = False
+
+    @property
+    def total_bytes(self):
+        """Return the total size of the data in the managed plots."""
+        return sum(self.sizes.values())
+
+    def install(self):
+        """Collect the plots after every command sent to ngspice.
+
+        The objects that point into the plots are tracked from then on, and
+        the plots that already exist are never destroyed.
+        """
+        with ngspice_lock:
+            if self.__hook__ not in command_hooks:
+                self.protected.update(ng.get_plot_names())
+                data_hooks.append(self.__track__)
+                command_hooks.append(self.__hook__)
+
+    def uninstall(self):
+        """Stop collecting the plots after every command."""
+        with ngspice_lock:
+            if self.__hook__ in command_hooks:
+                command_hooks.remove(self.__hook__)
+                data_hooks.remove(self.__track__)
+
+    def __hook__(self, command):
+        self.collect()
+
+    def __track__(self, plot_name, obj):
+        """Protect a plot while an object that points into it is alive."""
+        self.refs.setdefault(plot_name, []).append(weakref.ref(obj))
+
+    def pin(self, plot_name):
+        """Prevent a plot from being destroyed."""
+        self.pinned.add(plot_name)
+
+    def unpin(self, plot_name):
+        """Allow a pinned plot to be destroyed again."""
+        self.pinned.discard(plot_name)
+
+    def touch(self, plot_name):
+        """Mark a plot as used."""
+        if self.policy == 'lru' and plot_name in self.sizes:
+            self.sizes.move_to_end(plot_name)
+
+    def get_plot(self, plot_name=None):
+        """Return a Plot and protect it from being destroyed while in use."""
+        plot = Plot(plot_name)
+        self.touch(plot.name)
+        if self.__track__ not in data_hooks:
+            self.__track__(plot.name, plot)
+        return plot
+
+    def get_data(self, vector_arg, plot_arg=None, **kwargs):
+        """Return get_data() and protect its plot while the array is in use.
+
+        Views of the array, e.g. slices, aren't tracked. Copy the data if it
+        is needed after the array is discarded.
+        """
+        with ngspice_lock:
+            if '.' in vector_arg:
+                plot_name = vector_arg.split('.')[0]
+            elif plot_arg is not None:
+                plot_name = plot_arg
+            else:
+                plot_name = ng.current_plot()
+            data = ng.get_data(vector_arg, plot_arg, **kwargs)
+        self.touch(plot_name)
+        if self.__track__ not in data_hooks:
+            arrays = data if type(data) == tuple else (data,)
+            for array in arrays:
+                self.__track__(plot_name, array)
+        return data
+
+    def in_use(self, plot_name):
+        """Return True if objects handed out for the plot are still alive."""
+        refs = [ref for ref in self.refs.get(plot_name, [])
+                if ref() is not None]
+        if refs:
+            self.refs[plot_name] = refs
+        else:
+            self.refs.pop(plot_name, None)
+        return bool(refs)
+
+    def collect(self):
+        """Track new plots and destroy plots until the budget is met.
+
+        Returns the names of the destroyed plots.
+        """
+        if self._collecting:
+            return []
+        self._collecting = True
+        try:
+            with ngspice_lock:
+                return self.__collect__()
+        finally:
+            self._collecting = False
+
+    def __collect__(self):
+        plot_names = ng.get_plot_names()
+        for plot_name in list(self.sizes):
+            if plot_name not in plot_names:
+                del self.sizes[plot_name]
+                self.refs.pop(plot_name, None)
+        self.protected.intersection_update(plot_names)
+        # ngspice lists the newest plot first.
+        for plot_name in reversed(plot_names):
+            if plot_name != 'const' and plot_name not in self.sizes:
+                self.sizes[plot_name] = plot_size(plot_name)
+
+        current = ng.current_plot()
+        total_bytes = self.total_bytes
+        nplots = len(self.sizes)
+        destroyed = []
+        for plot_name, size in list(self.sizes.items()):
+            if (self.max_bytes is None or total_bytes <= self.max_bytes) and\
+                    (self.max_plots is None or nplots <= self.max_plots):
+                break
+            if plot_name == current or plot_name in self.pinned or\
+                    plot_name in self.protected or self.in_use(plot_name):
+                continue
+            destroyed.append(plot_name)
+            del self.sizes[plot_name]
+            total_bytes -= size
+            nplots -= 1
+
+        if destroyed:
+            ng.clear_plots(destroyed)
+        return destroyed
@@ -0,0 +1,178 @@
+"""The plot and vector classes."""
+from collections.abc import Mapping
+from ctypes import create_string_buffer
+
+import numpy as np
+
+from ngspicepy.ngspicepy import __track_data__, current_plot,\
+    get_scale_name, get_vector_names, info_to_array, libngspice,\
+    ngspice_lock, v_flags
+
+
+class Vector(object):
+    """A vector in a plot in ngspice.
+
+    The metadata of the vector is read from ngspice when the vector is
+    created. Its data is only converted to a numpy array when it is first
+    used. The array points to ngspice's memory, which is freed when the plot
+    is destroyed.
+
+    Attributes:
+        name
+            The name of the vector.
+        plot_name
+            The name of the plot that contains the vector.
+        info
+            The pointer to the vector_info returned by ngGet_Vec_Info.
+        v_type
+            The type of the vector, one of the values in v_types.
+        v_flags
+            The flags of the vector, see v_flags.
+        length
+            The number of points in the vector.
+    """
+
+    __slots__ = ('name', 'plot_name', 'info', 'v_type', 'v_flags', 'length',
+                 '_plot', '_data')
+
+    def __init__(self, name, plot_name, plot=None):
+        """Class constructor.
+
+        Parameters:
+            name
+                The name of the vector.
+            plot_name
+                The name of the plot that contains the vector.
+            plot
+                The Plot that the vector belongs to. It is used to find the
+                scale of the vector.
+        """
+        self.name = name
+        self.plot_name = plot_name
+        self.info = libngspice.ngGet_Vec_Info(
+            create_string_buffer((plot_name + '.' + name).encode()))
+        if not self.info:
+            raise ValueError("Incorrect vector name")
+        self.v_type = self.info.contents.v_type
+        self.v_flags = self.info.contents.v_flags
+        self.length = self.info.contents.v_length
+        self._plot = plot
+        self._data = None
+
+    @property
+    def is_real(self):
+        """Return True if the vector is real."""
+        return self.v_flags & v_flags.VF_REAL != 0
+
+    @property
+    def is_complex(self):
+        """Return True if the vector is complex."""
+        return self.v_flags & v_flags.VF_COMPLEX != 0
+
+    @property
+    def dtype(self):
+        """Return the numpy dtype of the vector's data."""
+        if self.is_complex:
+            return np.dtype('complex128')
+        return np.dtype('float64')
+
+    @property
+    def data(self):
+        """Return the data of the vector as a numpy array."""
+        if self._data is None:
+            self._data = info_to_array(self.info)
+            __track_data__(self.plot_name, self._data)
+        return self._data
+
+    @property
+    def scale(self):
+        """Return the scale Vector of the plot that contains the vector."""
+        if self._plot is None:
+            self._plot = Plot(self.plot_name)
+        return self._plot.scale
+
+    def __len__(self):
+        return self.length
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None:
+            return self.data
+        return self.data.astype(dtype)
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __repr__(self):
+        return "Vector('" + self.plot_name + "." + self.name + "')"
+
+
+class Plot(Mapping):
+    """A plot in ngspice, i.e. a group of vectors created by an analysis.
+
+    A Plot is a read-only mapping from vector names to Vector objects. The
+    names are fetched once when the plot is created and each Vector is only
+    created when it is first looked up. Lookups ignore case, like ngspice.
+
+    Example:
+        >>> plot = Plot('tran1')
+        >>> len(plot['v(out)'])
+        >>> plot['v(out)'].data
+        >>> plot.scale.name
+        'time'
+    """
+
+    __slots__ = ('name', '_names', '_vectors', '_scale_name', '__weakref__')
+
+    def __init__(self, name=None):
+        """Class constructor.
+
+        Parameters:
+            name
+                The name of the plot. The current plot is used if it is
+                unspecified.
+        """
+        with ngspice_lock:
+            if name is None:
+                name = current_plot()
+            self.name = name
+            names = get_vector_names(name)
+            __track_data__(name, self)
+        self._names = dict((vector_name.lower(), vector_name)
+                           for vector_name in names)
+        self._vectors = {}
+        self._scale_name = None
+
+    def __getitem__(self, vector_name):
+        key = vector_name.lower()
+        vector = self._vectors.get(key)
+        if vector is None:
+            if key not in self._names:
+                raise KeyError(vector_name)
+            with ngspice_lock:
+                vector = Vector(self._names[key], self.name, self)
+            self._vectors[key] = vector
+        return vector
+
+    def __contains__(self, vector_name):
+        return vector_name.lower() in self._names
+
+    def __iter__(self):
+        return iter(self._names.values())
+
+    def __len__(self):
+        return len(self._names)
+
+    @property
+    def scale(self):
+        """Return the scale Vector of the plot, e.g. time."""
+        if self._scale_name is None:
+            self._scale_name = get_scale_name(self.name)
+        return self[self._scale_name]
+
+    def to_dict(self):
+        """Return a dictionary of the data of all the vectors in the plot."""
+        return dict((vector_name, self[vector_name].data)
+                    for vector_name in self)
+
+    def __repr__(self):
+        return "Plot('" + self.name + "')"
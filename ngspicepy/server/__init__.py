@@ -0,0 +1,28 @@
+"""
+Simulation Server
+=================
+
+A Server keeps a pool of warm ngspice workers and serves them to Clients
+over a Unix socket or TCP, so that scripts don't pay for starting ngspice.
+Include files, e.g. model libraries, can be preloaded. A Client has the
+functions of the ngspicepy module and a Netlist method that returns a
+RemoteNetlist with the methods of Netlist. Clients on the same machine
+receive arrays through shared memory.
+
+It is available as the ngspicepy-server command and as
+python -m ngspicepy.server. Clients can only call ngspicepy's functions and
+the methods of Netlists, and a TCP address requires an authkey since the
+messages are pickled. A Worker is restarted after each session.
+
+Example
+-------
+
+    $ ngspicepy-server /tmp/ngspice.sock -j 4 -i models.lib
+
+    >>> with Client('/tmp/ngspice.sock') as ng:
+    ...     ng.load_netlist('CS-Amp.cir')
+    ...     ng.run_tran('1u', '10m')
+    ...     v_out = ng.get_data('v(out)')
+"""
+from .client import Client, RemoteNetlist
+from .server import main, Server
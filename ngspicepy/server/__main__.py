@@ -0,0 +1,7 @@
+"""Run a simulation server, see ngspicepy.server."""
+import sys
+
+from ngspicepy.server import main
+
+if __name__ == '__main__':
+    sys.exit(main())
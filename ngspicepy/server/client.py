@@ -0,0 +1,130 @@
+"""The client of the simulation server."""
+import functools
+from multiprocessing.connection import Client as connect
+
+from ngspicepy.netlist import Netlist as LocalNetlist
+from ngspicepy.netlist.netlist import read_netlist
+from ngspicepy.worker.transport import unpack
+from ngspicepy.worker.worker import is_api_function
+
+
+class RemoteNetlist(object):
+    """A Netlist that lives in a Server's worker.
+
+    It has the same methods as Netlist, which are run by the worker.
+
+    Attributes:
+        netlist
+            The lines of the netlist when it was created.
+    """
+
+    def __init__(self, client, netlist):
+        """Class constructor.
+
+        Parameters:
+            client
+                The Client of the Server.
+            netlist
+                Anything the Netlist constructor accepts. It is checked here
+                and sent as a list of lines.
+        """
+        self.client = client
+        self.netlist = LocalNetlist(netlist).netlist
+        self.net_id = client.call('create_netlist', self.netlist)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if callable(getattr(LocalNetlist, name, None)):
+            return functools.partial(self.client.call, 'netlist_method',
+                                     self.net_id, name)
+        return self.client.call('netlist_method', self.net_id, name)
+
+    def __str__(self):
+        return '\n'.join(self.netlist)
+
+
+class Client(object):
+    """Connects to a Server and offers the functions of the ngspicepy module.
+
+    The calls are run by the Worker that the Server gives to the Client for
+    the duration of the connection.
+
+    Example:
+        >>> with Client('/tmp/ngspice.sock') as ng:
+        ...     ng.load_netlist('CS-Amp.cir')
+        ...     ng.run_tran('1u', '10m')
+        ...     v_out = ng.get_data('v(out)')
+        ...     amp = ng.Netlist('CS-Amp.cir')
+        ...     amp.setup_sim('ac', 'dec 10 1 1g')
+        ...     amp.run()
+    """
+
+    def __init__(self, address, authkey=None, shared=None):
+        """Class constructor. Connects to the Server.
+
+        Parameters:
+            address
+                The path of the Server's Unix socket or its (host, port).
+            authkey
+                The Server's key.
+            shared
+                Whether arrays are received through shared memory, which
+                only works on the Server's machine. By default they are for
+                Unix sockets and localhost.
+        """
+        if shared is None:
+            shared = type(address) == str or\
+                address[0] in ('localhost', '127.0.0.1', '::1')
+        self.conn = connect(address, authkey=authkey)
+        self.conn.send({'shared': shared})
+        self.conn.recv()
+
+    def call(self, target, *args, **kwargs):
+        """Call a function in the Server's worker and return its result.
+
+        Parameters:
+            target
+                The name of one of ngspicepy's functions, or of
+                'create_netlist' or 'netlist_method'. The Server refuses
+                other targets.
+            ``*args``, ``**kwargs``
+                The arguments of the function.
+        """
+        self.conn.send((target, args, kwargs))
+        status, result = self.conn.recv()
+        if status == 'error':
+            raise result
+        return unpack(result)
+
+    def load_netlist(self, netlist):
+        """Load a netlist, see ngspicepy.load_netlist().
+
+        Netlist files are read here, so paths are relative to this process.
+        """
+        if type(netlist) == str:
+            netlist = read_netlist(netlist)
+        return self.call('load_netlist', netlist)
+
+    def Netlist(self, netlist):
+        """Return a RemoteNetlist, which has the methods of Netlist."""
+        return RemoteNetlist(self, netlist)
+
+    def __getattr__(self, name):
+        if is_api_function(name):
+            return functools.partial(self.call, name)
+        raise AttributeError(name)
+
+    def close(self):
+        """Disconnect from the Server."""
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
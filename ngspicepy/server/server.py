@@ -0,0 +1,260 @@
+"""The simulation server."""
+import argparse
+import os
+import threading
+import traceback
+from multiprocessing.connection import Listener
+
+from ngspicepy.netlist import Netlist
+from ngspicepy.worker.pool import WorkerPool
+from ngspicepy.worker.transport import unpack
+from ngspicepy.worker.worker import is_api_function
+
+# The Netlists created by clients, in the worker process.
+netlists = {}
+
+
+def create_netlist(netlist_list):
+    """Create a Netlist in the worker and return its id."""
+    net = Netlist(netlist_list)
+    netlists[id(net)] = net
+    return id(net)
+
+
+def netlist_method(net_id, name, *args, **kwargs):
+    """Call a method of a Netlist in the worker, or return an attribute."""
+    if name.startswith('_'):
+        raise AttributeError(name)
+    value = getattr(netlists[net_id], name)
+    if callable(value):
+        return value(*args, **kwargs)
+    return value
+
+
+# The functions besides ngspicepy's that Clients may call, by name.
+session_functions = {'create_netlist': create_netlist,
+                     'netlist_method': netlist_method}
+
+
+def resolve_target(target):
+    """Return what a worker should call for the target sent by a Client.
+
+    Only the names of ngspicepy's functions and of session_functions are
+    accepted, since any other function would let Clients run arbitrary code.
+    """
+    if type(target) == str:
+        if target in session_functions:
+            return session_functions[target]
+        if is_api_function(target):
+            return target
+    raise ValueError('Unknown ngspicepy function: ' + str(target))
+
+
+def read_includes(paths):
+    """Read include files into a dictionary of their lines.
+
+    Each file is stored under its path as given and under its base name.
+    """
+    includes = {}
+    for path in paths:
+        with open(path) as f:
+            lines = [line.strip() for line in f if line.strip()]
+        includes[path] = lines
+        includes[os.path.basename(path)] = lines
+    return includes
+
+
+def expand_includes(netlist_list, includes):
+    """Replace the .include lines of preloaded files by the files' lines."""
+    expanded = []
+    for line in netlist_list:
+        if line[:8].lower() == '.include':
+            path = line[8:].strip().strip('"\'')
+            lines = includes.get(path, includes.get(os.path.basename(path)))
+            if lines is not None:
+                expanded.extend(lines)
+                continue
+        expanded.append(line)
+    return expanded
+
+
+def parse_address(text):
+    """Return the address for 'host:port' or the path of a Unix socket."""
+    host, sep, port = text.rpartition(':')
+    if sep and port.isdigit() and os.sep not in text:
+        return (host or 'localhost', int(port))
+    return text
+
+
+class Server(object):
+    """Serves ngspicepy to Clients from a pool of warm Workers.
+
+    Starting ngspice, i.e. loading the shared library and initializing it,
+    is paid by the Server instead of by each script. Each Client gets a
+    Worker to itself for the duration of its connection, so the state of
+    ngspice, e.g. the loaded circuit and the plots, persists between its
+    calls. When the Client disconnects, its Worker is restarted before it
+    is given to the next Client, so no circuit, option or plot of one
+    session is seen by another. Clients wait for a Worker when all of them
+    are in use.
+
+    Clients may only call the functions of the ngspicepy module and the
+    methods of Netlists, but the messages are pickled, so a TCP address
+    requires an authkey.
+
+    Results are passed on as they come from the Worker, so Clients on the
+    same machine get the arrays from shared memory without a copy. Results
+    for other Clients are pickled.
+
+    Example:
+        >>> server = Server('/tmp/ngspice.sock', nworkers=4,
+        ...                 includes=['models.lib'])
+        >>> server.serve_forever()
+    """
+
+    def __init__(self, address, nworkers=1, includes=(), authkey=None,
+                 timeout=None, warmup=None):
+        """Class constructor. Starts the Workers and listens on the address.
+
+        Parameters:
+            address
+                The path of a Unix socket or a (host, port) tuple.
+            nworkers
+                The number of Workers, i.e. of simultaneous Clients.
+            includes
+                A list of files, e.g. model libraries, that are read once.
+                .include lines in the netlists loaded by Clients that name
+                one of them are replaced by its lines.
+            authkey
+                A bytes key that Clients have to know. It is required with
+                TCP.
+            timeout, warmup
+                Passed on to the Workers.
+        """
+        if type(address) != str and authkey is None:
+            raise ValueError('A TCP address requires an authkey')
+        self.includes = read_includes(includes)
+        self.pool = WorkerPool(nworkers, warmup, timeout)
+        self.listener = Listener(address, authkey=authkey)
+        self.address = self.listener.address
+        self.closed = False
+
+    def serve_forever(self):
+        """Accept Clients until close() is called."""
+        while not self.closed:
+            try:
+                conn = self.listener.accept()
+            except Exception:
+                # e.g. a Client with the wrong key
+                if self.closed:
+                    break
+                continue
+            threading.Thread(target=self.__session__, args=(conn,),
+                             daemon=True).start()
+
+    def start(self):
+        """Accept Clients in a background thread."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __session__(self, conn):
+        """Run the calls of a Client on a Worker until it disconnects."""
+        try:
+            shared = conn.recv()['shared']
+        except Exception:
+            conn.close()
+            return
+
+        worker = self.pool.acquire()
+        try:
+            conn.send(('ready', None))
+            while True:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    break
+                if message is None:
+                    break
+                self.__reply__(conn, worker, shared, *message)
+        except (EOFError, OSError):
+            pass
+        finally:
+            try:
+                worker.restart()
+            except Exception:
+                # The Worker is started again by its next call.
+                pass
+            self.pool.release(worker)
+            conn.close()
+
+    def __reply__(self, conn, worker, shared, target, args, kwargs):
+        try:
+            function = resolve_target(target)
+            if target in ('load_netlist', 'create_netlist') and args and\
+                    type(args[0]) == list:
+                args = (expand_includes(args[0], self.includes),) + args[1:]
+            result = worker.call_packed(function, *args, **kwargs)
+            if not shared:
+                result = unpack(result)
+        except Exception as e:
+            try:
+                conn.send(('error', e))
+            except (EOFError, OSError):
+                raise
+            except Exception:
+                # The exception can't be pickled.
+                conn.send(('error', RuntimeError(traceback.format_exc())))
+            return
+
+        try:
+            conn.send(('ok', result))
+        except Exception:
+            # Free the shared memory that the Client won't attach.
+            unpack(result)
+            raise
+
+    def close(self):
+        """Stop accepting Clients and stop the Workers."""
+        self.closed = True
+        self.listener.close()
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    """Run a Server from the command line."""
+    parser = argparse.ArgumentParser(
+        prog='ngspicepy-server',
+        description='Serve ngspicepy from a pool of warm workers.')
+    parser.add_argument('address',
+                        help='host:port or the path of a Unix socket')
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help='the number of workers (default: 1)')
+    parser.add_argument('-i', '--include', action='append', default=[],
+                        help='a file to preload for .include lines')
+    parser.add_argument('-k', '--authkey', default=None,
+                        help='the key that clients have to know, required '
+                        'with host:port')
+    parser.add_argument('-t', '--timeout', type=float, default=None,
+                        help='the timeout of a call in seconds')
+    args = parser.parse_args(argv)
+
+    authkey = args.authkey.encode() if args.authkey is not None else None
+    address = parse_address(args.address)
+    if type(address) != str and authkey is None:
+        parser.error('--authkey is required with host:port')
+    server = Server(address, args.workers, args.include, authkey,
+                    args.timeout)
+    print('Serving on ' + str(server.address))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
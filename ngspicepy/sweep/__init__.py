@@ -0,0 +1,35 @@
+"""
+Adaptive Sweeps
+===============
+
+adaptive_sweep() sweeps a DC source or a netlist parameter over a range,
+starting with a coarse uniform grid and adding points only where the
+measured output bends, until linear interpolation between the points is
+within a tolerance of the output's range or a budget of simulations is
+spent. Flat regions end up with few points and sharp transitions with
+many.
+
+The new points of each refinement level are simulated in one batch. Source
+sweeps run them as one chain of dc analyses on a single loaded circuit and
+parameter sweeps as one simulation per point. Either can be spread over a
+pool of worker processes.
+
+Operating points of nearby points are close, so WarmStart stores the node
+voltages of the points that were simulated and seeds each new point with
+those of the nearest one as .nodeset lines. run_points() simulates a list of
+parameter points, e.g. Monte Carlo samples, that way, and adaptive_sweep()
+does with warm_start=True.
+
+Example
+-------
+
+    >>> result = adaptive_sweep('clipper.cir', 'v1', -5, 5, 'v(out)',
+    ...                         tol=1e-3, max_points=100)
+    >>> result.x, result.y
+    >>> samples = [{'vth': v} for v in np.random.normal(0.4, 0.02, 100)]
+    >>> results = run_points('CS-Amp.cir', samples, [('op',)], workers=4)
+"""
+from .adaptive import adaptive_sweep, dc_points, param_point, refine,\
+    SweepResult
+from .warmstart import condition_lines, node_voltages, run_points, warm_point,\
+    WarmStart
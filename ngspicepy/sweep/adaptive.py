@@ -0,0 +1,353 @@
+"""The adaptive sweep."""
+import numpy as np
+
+import ngspicepy as ng
+
+from ngspicepy.netlist import Netlist, NetlistTemplate
+from ngspicepy.ngspicepy import ngspice_lock
+from ngspicepy.optimize.evaluator import simulate
+from ngspicepy.worker.pool import WorkerPool
+
+from .warmstart import node_voltages, WarmStart
+
+
+def measure_value(measure, results):
+    """Return the measured output of one point as a 1-D float array.
+
+    Parameters:
+        measure
+            The name of a vector, whose first value is taken from the first
+            plot that has it, or a function that takes the results and
+            returns a number or an array.
+        results
+            A dictionary mapping analysis names to dictionaries of vectors.
+    """
+    if callable(measure):
+        value = measure(results)
+    else:
+        for vectors in results.values():
+            names = dict((name.lower(), name) for name in vectors)
+            if measure.lower() in names:
+                value = vectors[names[measure.lower()]][0]
+                break
+        else:
+            raise KeyError('Vector not found: ' + measure)
+    return np.atleast_1d(np.asarray(value, dtype=float)).ravel()
+
+
+def dc_points(netlist_list, source, xs, measure):
+    """Measure the output at each value of a source in one run.
+
+    The netlist is loaded once and a one point dc analysis is run for each
+    value. Returns a list of the measured values, with None for the points
+    that failed.
+
+    Parameters:
+        netlist_list
+            The lines of a netlist that was already checked.
+        source
+            The name of an independent voltage or current source.
+        xs
+            The values of the source.
+        measure
+            See measure_value(). Functions get {'dc': vectors}.
+    """
+    with ngspice_lock:
+        net = Netlist._from_checked(netlist_list)
+        for i, x in enumerate(xs):
+            net.add_analysis('dc', source, repr(float(x)), repr(float(x)), 1,
+                             name='dc' + str(i))
+        plots_before = ng.get_plot_names()
+        plots = net.run()
+
+        values = []
+        seen = set()
+        for plot in plots.values():
+            # A dc analysis that failed left the previous plot current.
+            if plot.name in plots_before or plot.name in seen:
+                values.append(None)
+                continue
+            seen.add(plot.name)
+            vectors = dict((name, np.array(plot[name])) for name in plot)
+            try:
+                values.append(measure_value(measure, {'dc': vectors}))
+            except Exception:
+                values.append(None)
+        new_plots = [plot_name for plot_name in ng.get_plot_names()
+                     if plot_name not in plots_before]
+        if new_plots:
+            ng.clear_plots(new_plots)
+    return values
+
+
+def param_point(netlist_list, analyses, measure, added_op=False):
+    """Simulate a netlist and return its measured output and node voltages.
+
+    The node voltages are those of the 'op' analysis, if any, see
+    node_voltages().
+
+    Parameters:
+        netlist_list
+            The lines of a netlist that was already checked.
+        analyses
+            The analyses to run, see ngspicepy.optimize.simulate().
+        measure
+            See measure_value().
+        added_op
+            Whether the 'op' analysis was only added for its node voltages.
+            Its results are then hidden from measure.
+    """
+    results = simulate(netlist_list, analyses)
+    voltages = node_voltages(results.get('op', {}))
+    if added_op:
+        del results['op']
+    return measure_value(measure, results), voltages
+
+
+def interval_errors(x, y):
+    """Return the refinement error of each interval between the points.
+
+    The error of a point is the distance of its output from the line
+    through its neighbours, relative to the range of the output. An
+    interval gets the larger error of its two ends. The errors are those of
+    the points that didn't fail, i.e. whose outputs aren't NaN. The
+    intervals around a failed point share the error of the interval between
+    its neighbours that didn't fail.
+    """
+    ok = np.all(np.isfinite(y), axis=1)
+    errors = np.zeros(len(x) - 1)
+    x_ok, y_ok = x[ok], y[ok]
+    if len(x_ok) < 2:
+        return errors
+    scale = np.ptp(y_ok, axis=0)
+    scale[scale == 0] = 1.0
+
+    t = ((x_ok[1:-1] - x_ok[:-2]) / (x_ok[2:] - x_ok[:-2]))[:, None]
+    line = y_ok[:-2] + t * (y_ok[2:] - y_ok[:-2])
+    point_errors = np.zeros(len(x_ok))
+    point_errors[1:-1] = np.max(np.abs(y_ok[1:-1] - line) / scale, axis=1)
+    ok_errors = np.maximum(point_errors[:-1], point_errors[1:])
+
+    k = np.searchsorted(x_ok, x[:-1], side='right') - 1
+    inside = (k >= 0) & (k < len(x_ok) - 1)
+    errors[inside] = ok_errors[k[inside]]
+    return errors
+
+
+def refine(evaluate, start, stop, npoints=9, tol=1e-3, max_points=200,
+           min_step=None):
+    """Sample a function of one variable adaptively.
+
+    The function is evaluated on a uniform grid first. Then the intervals
+    whose interval_errors() are above tol are halved, all at once, until
+    none are left, the intervals get narrower than min_step or max_points
+    points were evaluated. The intervals with the largest errors are halved
+    first when the budget runs out.
+
+    Parameters:
+        evaluate
+            A function that takes an array of points and returns a 2-D
+            array with a row of outputs for each of them. Rows of NaN mark
+            points that failed.
+        start, stop
+            The range of the variable.
+        npoints
+            The number of points of the initial grid.
+        tol
+            The error relative to the range of the outputs.
+        max_points
+            The maximum number of points to evaluate.
+        min_step
+            The narrowest interval that is halved. Defaults to 1e-6 of the
+            range.
+
+    Returns the sorted points, their outputs, the number of refinement
+    levels and whether tol was met by every interval.
+    """
+    if npoints < 3:
+        raise ValueError('At least 3 initial points are needed')
+    if min_step is None:
+        min_step = abs(stop - start) * 1e-6
+    x = np.linspace(start, stop, min(npoints, max_points))
+    y = np.asarray(evaluate(x), dtype=float)
+    levels = 0
+
+    while True:
+        errors = interval_errors(x, y)
+        widths = np.abs(np.diff(x))
+        candidates = np.flatnonzero((errors > tol) & (widths / 2 >= min_step))
+        budget = max_points - len(x)
+        if not len(candidates) or budget <= 0:
+            break
+        candidates = candidates[np.argsort(-errors[candidates],
+                                           kind='stable')[:budget]]
+        new_x = (x[candidates] + x[candidates + 1]) / 2
+        new_y = np.asarray(evaluate(new_x), dtype=float)
+        x = np.concatenate([x, new_x])
+        y = np.concatenate([y, new_y])
+        order = np.argsort(x, kind='stable')
+        x, y = x[order], y[order]
+        levels += 1
+
+    # Intervals narrower than min_step aren't candidates, but their errors
+    # may still be above tol, e.g. across a discontinuity.
+    return x, y, levels, not (errors > tol).any()
+
+
+class SweepResult(object):
+    """The result of adaptive_sweep().
+
+    Attributes:
+        x
+            The sorted values of the swept variable that simulated.
+        y
+            The measured outputs at x, a 1-D array if the measure returns a
+            number and a 2-D array with a row per point otherwise.
+        failed
+            The values of the variable at which the simulation failed.
+        nsims
+            The number of points that were simulated.
+        levels
+            The number of refinement levels.
+        converged
+            True if the tolerance was met within the budget.
+    """
+
+    def __init__(self, x, y, nsims, levels, converged):
+        ok = np.all(np.isfinite(y), axis=1)
+        self.x = x[ok]
+        self.y = y[ok][:, 0] if y.shape[1] == 1 else y[ok]
+        self.failed = x[~ok]
+        self.nsims = nsims
+        self.levels = levels
+        self.converged = converged
+
+    def __repr__(self):
+        return 'SweepResult(npoints=' + repr(len(self.x)) + ', levels=' +\
+            repr(self.levels) + ', converged=' + repr(self.converged) + ')'
+
+
+def adaptive_sweep(netlist, variable, start, stop, measure, analyses=None,
+                   npoints=9, tol=1e-3, max_points=200, min_step=None,
+                   workers=0, timeout=None, warm_start=False):
+    """Sweep a source or a parameter with points added where they're needed.
+
+    See refine() for how the points are chosen and SweepResult for what is
+    returned.
+
+    Parameters:
+        netlist
+            A NetlistTemplate or anything its constructor accepts.
+        variable
+            The name of a parameter of the netlist, i.e. of a .param or a
+            brace field, or else of an independent voltage or current
+            source, which is swept with dc analyses.
+        start, stop
+            The range of the variable.
+        measure
+            The name of a vector or a function of the results of a point,
+            i.e. a dictionary mapping analysis names to dictionaries of
+            vector arrays, that returns a number or an array. The first
+            value of a named vector is taken. The results of a source sweep
+            have a single 'dc' analysis with one value per vector. With
+            workers, the function must be a top level function.
+        analyses
+            The analyses run at each point of a parameter sweep, see
+            ngspicepy.optimize.simulate(). Defaults to [('op',)].
+        npoints, tol, max_points, min_step
+            See refine().
+        workers
+            The number of worker processes that simulate the points of a
+            level. They're simulated in this process if it is 0.
+        timeout
+            The number of seconds after which a simulation in a worker is
+            considered to be hung. Its points are then failed.
+        warm_start
+            Warm start the operating point of each point of a parameter
+            sweep from that of the nearest point of the earlier levels, see
+            WarmStart. An operating point analysis is added if there is
+            none, whose results measure doesn't see.
+
+    Example:
+        >>> result = adaptive_sweep('CS-Amp.cir', 'rd', 1e3, 1e5, gain,
+        ...                         analyses=[('ac', 'lin 1 1k 1k')],
+        ...                         workers=4)
+    """
+    if not isinstance(netlist, NetlistTemplate):
+        netlist = NetlistTemplate(netlist)
+    if variable in netlist.params or variable in netlist.defaults:
+        analyses = [tuple(analysis) for analysis in (analyses or [('op',)])]
+        warm = None
+        added_op = False
+        if warm_start:
+            warm = WarmStart()
+            if not any(analysis[0] == 'op' for analysis in analyses):
+                analyses.insert(0, ('op',))
+                added_op = True
+
+        def tasks(xs):
+            batch = []
+            for x in xs:
+                netlist_list = netlist.overrides(**{variable: repr(float(x))})
+                if warm is not None:
+                    netlist_list = warm.apply(netlist_list, {variable: x})
+                batch.append((param_point,
+                              (netlist_list, analyses, measure, added_op), x))
+            return batch
+    else:
+        if not any(line.split()[0].lower() == variable.lower() and
+                   variable[0].lower() in 'vi' for line in netlist.lines):
+            raise ValueError('Not a parameter or an independent source: ' +
+                             variable)
+
+        def tasks(xs):
+            chunks = np.array_split(xs, max(1, min(workers, len(xs))))
+            return [(dc_points, (netlist.lines, variable, chunk, measure),
+                     chunk) for chunk in chunks if len(chunk)]
+
+    pool = WorkerPool(workers, timeout=timeout) if workers else None
+    # The number of points simulated and of outputs per point.
+    state = {'nsims': 0, 'width': None}
+
+    def evaluate(xs):
+        batch = tasks(xs)
+        if pool is not None:
+            results = pool.map(batch[0][0], [task[1] for task in batch],
+                               return_exceptions=True)
+        else:
+            results = []
+            for target, args, x in batch:
+                try:
+                    results.append(target(*args))
+                except Exception as e:
+                    results.append(e)
+
+        values = []
+        for (target, args, x), result in zip(batch, results):
+            if target is dc_points:
+                if isinstance(result, Exception):
+                    result = [None] * len(x)
+                values.extend(result)
+            elif isinstance(result, Exception):
+                values.append(None)
+            else:
+                values.append(result[0])
+                if warm is not None:
+                    warm.add({variable: x}, result[1])
+        state['nsims'] += len(xs)
+
+        if state['width'] is None:
+            widths = [len(value) for value in values if value is not None]
+            state['width'] = widths[0] if widths else 1
+        width = state['width']
+        return np.array([np.full(width, np.nan)
+                         if value is None or len(value) != width else value
+                         for value in values])
+
+    try:
+        x, y, levels, converged = refine(evaluate, start, stop, npoints, tol,
+                                         max_points, min_step)
+    finally:
+        if pool is not None:
+            pool.close()
+    return SweepResult(x, y, state['nsims'], levels, converged)
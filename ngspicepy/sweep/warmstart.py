@@ -0,0 +1,221 @@
+"""The operating point warm start."""
+import re
+
+import numpy as np
+
+import ngspicepy as ng
+
+from ngspicepy.netlist import NetlistTemplate
+from ngspicepy.optimize.evaluator import simulate
+from ngspicepy.worker.pool import WorkerPool
+
+# The vector of a node voltage, e.g. V(2) or v(x1.out)
+node_re = re.compile(r'^v\((.+)\)$', re.IGNORECASE)
+
+# The number of nodes on each .nodeset or .ic line.
+nodes_per_line = 8
+
+
+def node_voltages(vectors):
+    """Return a dictionary of the node voltages among vectors.
+
+    The last value of each node voltage vector is taken, so a tran or dc
+    plot gives the voltages at its end.
+
+    Parameters:
+        vectors
+            A dictionary mapping vector names to arrays, e.g. the results of
+            an analysis or get_all_data().
+    """
+    voltages = {}
+    for name, values in vectors.items():
+        match = node_re.match(name)
+        if match and len(values):
+            voltages[match.group(1)] = float(np.real(values[-1]))
+    return voltages
+
+
+def condition_lines(kind, voltages):
+    """Return the .nodeset or .ic lines that set node voltages.
+
+    Parameters:
+        kind
+            'nodeset' or 'ic'.
+        voltages
+            A dictionary mapping node names to voltages.
+    """
+    items = ['v(' + node + ')=' + repr(value)
+             for node, value in sorted(voltages.items())]
+    return ['.' + kind + ' ' + ' '.join(items[i:i + nodes_per_line])
+            for i in range(0, len(items), nodes_per_line)]
+
+
+class WarmStart(object):
+    """Seeds the operating point of a point with that of the nearest one.
+
+    The node voltages of completed points are stored with their parameter
+    values. The netlist of a new point then gets .nodeset lines with the
+    voltages of the stored point that is nearest to it, so that Newton
+    iteration starts close to the solution. The distance is measured with
+    each parameter scaled by its range among the stored points.
+
+    Example
+    -------
+
+        >>> warm = WarmStart()
+        >>> for r in [1e3, 1.1e3, 1.2e3]:
+        ...     ng.load_netlist(warm.apply(amp.overrides(r=r), {'r': r}))
+        ...     ng.run_op()
+        ...     warm.capture({'r': r})
+    """
+
+    def __init__(self, kind='nodeset'):
+        """Class constructor.
+
+        Parameters:
+            kind
+                'nodeset' to suggest the voltages to the operating point or
+                'ic' to hold them during it, which transient analyses with
+                uic use as their initial conditions.
+        """
+        if kind not in ('nodeset', 'ic'):
+            raise ValueError('Invalid kind: ' + kind)
+        self.kind = kind
+        self.names = None
+        self.points = []
+        self.voltages = []
+
+    def __len__(self):
+        return len(self.points)
+
+    def __point__(self, params):
+        """Return the parameter values of params as an array."""
+        if self.names is None:
+            self.names = sorted(params)
+        if sorted(params) != self.names:
+            raise KeyError('The parameters must be ' + ' '.join(self.names))
+        return np.array([float(params[name]) for name in self.names])
+
+    def add(self, params, voltages):
+        """Store the node voltages of the point params.
+
+        Parameters:
+            params
+                A dictionary of the parameter values of the point.
+            voltages
+                A dictionary mapping node names to voltages, see
+                node_voltages().
+        """
+        if voltages:
+            self.points.append(self.__point__(params))
+            self.voltages.append(dict(voltages))
+
+    def capture(self, params, plot_name=None):
+        """Store the node voltages of a plot, by default the current one."""
+        self.add(params, node_voltages(ng.get_all_data(plot_name)))
+
+    def nearest(self, params):
+        """Return the node voltages of the nearest stored point, or None."""
+        if not self.points:
+            return None
+        point = self.__point__(params)
+        points = np.array(self.points)
+        scale = np.ptp(points, axis=0)
+        scale[scale == 0] = 1.0
+        distances = np.sum(((points - point) / scale) ** 2, axis=1)
+        return self.voltages[int(np.argmin(distances))]
+
+    def lines(self, params):
+        """Return the .nodeset or .ic lines for the point params."""
+        voltages = self.nearest(params)
+        if voltages is None:
+            return []
+        return condition_lines(self.kind, voltages)
+
+    def apply(self, netlist_list, params):
+        """Return the lines of a netlist with the lines() after its title."""
+        return netlist_list[:1] + self.lines(params) + netlist_list[1:]
+
+
+def warm_point(netlist_list, analyses):
+    """Simulate a netlist and return its results and node voltages.
+
+    The node voltages are those of the 'op' analysis, see node_voltages().
+    """
+    results = simulate(netlist_list, analyses)
+    return results, node_voltages(results.get('op', {}))
+
+
+def run_points(netlist, points, analyses=None, kind='nodeset', workers=0,
+               timeout=None):
+    """Simulate a netlist at each of a list of parameter points, warm started.
+
+    Each point is warm started from the operating point of the nearest point
+    that was already simulated, see WarmStart. An operating point analysis
+    is added if there is none. With workers, the points are simulated in
+    waves of one point per worker, which are warm started from the earlier
+    waves. Points given in the order of a sweep, or sorted, make the nearest
+    point a close one.
+
+    Returns a list with the results of each point, i.e. a dictionary mapping
+    analysis names to dictionaries of vector arrays, or the exception that
+    its simulation raised.
+
+    Parameters:
+        netlist
+            A NetlistTemplate or anything its constructor accepts.
+        points
+            A list of dictionaries of .param values, e.g. the samples of a
+            Monte Carlo analysis. They must all set the same parameters.
+        analyses
+            The analyses to run, see ngspicepy.optimize.simulate(). Defaults
+            to [('op',)].
+        kind
+            See WarmStart.
+        workers
+            The number of worker processes. The points are simulated in this
+            process if it is 0.
+        timeout
+            The number of seconds after which a simulation in a worker is
+            considered to be hung.
+
+    Example:
+        >>> samples = [{'vth': v} for v in np.random.normal(0.4, 0.02, 100)]
+        >>> results = run_points('CS-Amp.cir', samples,
+        ...                      [('op',), ('ac', 'dec 10 1 1g')])
+    """
+    if not isinstance(netlist, NetlistTemplate):
+        netlist = NetlistTemplate(netlist)
+    analyses = [tuple(analysis) for analysis in (analyses or [('op',)])]
+    if not any(analysis[0] == 'op' for analysis in analyses):
+        analyses.insert(0, ('op',))
+    warm = WarmStart(kind)
+
+    pool = WorkerPool(workers, timeout=timeout) if workers else None
+    wave = len(pool) if pool is not None else 1
+    results = []
+    try:
+        for start in range(0, len(points), wave):
+            batch = points[start:start + wave]
+            args_list = [(warm.apply(netlist.overrides(**params), params),
+                          analyses) for params in batch]
+            if pool is not None:
+                outputs = pool.map(warm_point, args_list,
+                                   return_exceptions=True)
+            else:
+                outputs = []
+                for args in args_list:
+                    try:
+                        outputs.append(warm_point(*args))
+                    except Exception as e:
+                        outputs.append(e)
+            for params, output in zip(batch, outputs):
+                if isinstance(output, Exception):
+                    results.append(output)
+                    continue
+                results.append(output[0])
+                warm.add(params, output[1])
+    finally:
+        if pool is not None:
+            pool.close()
+    return results
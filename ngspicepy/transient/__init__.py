@@ -0,0 +1,28 @@
+"""
+Transient Checkpoints
+=====================
+
+checkpointed_tran() runs a long transient analysis as a chain of shorter
+segments and saves each one to a checkpoint directory as it finishes, along
+with the state at its end, i.e. the node voltages, the inductor currents
+and the time. If the process dies, running it again, or resume_tran(),
+continues from the last finished segment instead of from the start, and the
+segments are stitched into one set of vectors.
+
+ngspice can't restart an analysis at a given time; its tstart only hides
+the output before it. A segment is therefore a new transient analysis that
+starts at time zero from the saved state with .ic and uic, with the
+independent sources' SIN, PULSE, EXP and PWL waveforms shifted by the
+segment's start time. Its time vector is shifted back when it's stitched.
+State that isn't a node voltage or an inductor current, e.g. the internal
+nodes of devices, is recomputed from the node voltages at the restart.
+
+Example
+-------
+
+    >>> vectors = checkpointed_tran('pll.cir', '1n', '10m', 'pll.ckpt',
+    ...                             segment='100u')
+    >>> t, v_out = vectors['time'], vectors['V(out)']
+"""
+from .checkpoint import checkpointed_tran, load_tran, restart_netlist,\
+    resume_tran, run_segment, shift_sources
@@ -0,0 +1,269 @@
+"""The checkpointed transient analysis."""
+import json
+import os
+import re
+
+import numpy as np
+
+import ngspicepy as ng
+
+from ngspicepy.netlist import Netlist
+from ngspicepy.ngspicepy import ngspice_lock, to_num
+from ngspicepy.sweep.warmstart import condition_lines, node_voltages
+
+# A time dependent function of an independent source, e.g. sin(0 1 1k),
+# with the options of pwl.
+function_re = re.compile(r'\b(sin|pulse|exp|pwl|sffm|am|trnoise|trrandom)'
+                         r'\s*\(([^)]*)\)((?:\s+(?:r|td)\s*=\s*\S+)*)',
+                         re.IGNORECASE)
+
+# The inductor currents are restored with ic=, which ngspice uses with uic.
+ic_re = re.compile(r'\s+ic\s*=\s*\S+', re.IGNORECASE)
+
+state_file = 'state.json'
+
+
+def shift_function(name, args, t0, tstep, tstop):
+    """Return the arguments of a source function that starts t0 later.
+
+    The optional arguments whose defaults depend on the analysis are filled
+    in with those of the whole analysis.
+    """
+    values = [to_num(arg) for arg in args]
+    if name == 'sin':
+        # vo va freq td theta phase
+        values += [0.0, 0.0, 1 / tstop, 0.0, 0.0, 0.0][len(values):]
+        values[3] -= t0
+    elif name == 'pulse':
+        # v1 v2 td tr tf pw per
+        values += [0.0, 0.0, 0.0, tstep, tstep, tstop, tstop][len(values):]
+        values[2] -= t0
+    elif name == 'exp':
+        # v1 v2 td1 tau1 td2 tau2
+        values += [0.0, 0.0, 0.0, tstep][len(values):]
+        values += [values[2] + tstep, tstep][len(values) - 4:]
+        values[2] -= t0
+        values[4] -= t0
+    elif name == 'pwl':
+        times, levels = values[0::2], values[1::2]
+        if len(times) != len(levels):
+            raise ValueError('Invalid pwl waveform: ' + ' '.join(args))
+        values = [0.0, float(np.interp(t0, times, levels))]
+        for time, level in zip(times, levels):
+            if time > t0:
+                values += [time - t0, level]
+    else:
+        raise ValueError('The ' + name + ' waveform can\'t be shifted')
+    return values
+
+
+def shift_sources(netlist_list, t0, tstep, tstop):
+    """Return the lines of a netlist with its sources' waveforms shifted.
+
+    The time dependent waveforms of the independent sources start t0
+    earlier, so that an analysis starting at time zero sees them as they are
+    at t0. A ValueError is raised for waveforms that can't be shifted, e.g.
+    SFFM or PWL with the r= or td= options.
+
+    Parameters:
+        netlist_list
+            The lines of the netlist.
+        t0
+            The time that becomes time zero.
+        tstep, tstop
+            The step and stop time of the whole analysis, which are the
+            defaults of some of the waveforms' arguments.
+    """
+    lines = []
+    for line in netlist_list:
+        if line[0].lower() in 'vi':
+            def shift(match):
+                name = match.group(1).lower()
+                if match.group(3):
+                    raise ValueError('Options of waveforms can\'t be ' +
+                                     'shifted: ' + line)
+                values = shift_function(name, match.group(2).replace(
+                    ',', ' ').split(), t0, tstep, tstop)
+                return name + '(' + ' '.join(repr(value)
+                                             for value in values) + ')'
+            line = function_re.sub(shift, line)
+        lines.append(line)
+    return lines
+
+
+def restart_netlist(netlist_list, t0, voltages, currents, tstep, tstop):
+    """Return the lines of a netlist that continues a transient from t0.
+
+    Parameters:
+        netlist_list
+            The lines of the netlist.
+        t0
+            The time at which the state was taken.
+        voltages
+            A dictionary mapping node names to their voltages, which are set
+            with .ic lines.
+        currents
+            A dictionary mapping inductor names to their currents, which are
+            set with their ic= parameter.
+        tstep, tstop
+            See shift_sources().
+    """
+    lines = shift_sources(netlist_list, t0, tstep, tstop)
+    for idx, line in enumerate(lines):
+        name = line.split()[0].lower()
+        if name in currents:
+            lines[idx] = ic_re.sub('', line) + ' ic=' + repr(currents[name])
+    return lines[:1] + condition_lines('ic', voltages) + lines[1:]
+
+
+def run_segment(netlist_list, tstep, duration, tmax=None, uic=False):
+    """Run a transient analysis and return copies of its vectors.
+
+    A RuntimeError is raised if the analysis fails or stops before
+    duration.
+    """
+    command = ['tran', repr(tstep), repr(duration)]
+    if tmax is not None:
+        command += ['0', repr(tmax)]
+    if uic:
+        command.append('uic')
+
+    with ngspice_lock:
+        plots_before = ng.get_plot_names()
+        ng.load_netlist(netlist_list)
+        ng.send_command(' '.join(command))
+        plot_name = ng.current_plot()
+        if plot_name in plots_before:
+            raise RuntimeError('Simulation failed: ' +
+                               ' '.join(ng.get_errors()))
+        vectors = dict((name, np.array(values)) for name, values in
+                       ng.get_all_data(plot_name).items())
+        ng.clear_plots([plot_name])
+
+    if vectors['time'][-1] < duration * (1 - 1e-9):
+        raise RuntimeError('The simulation stopped at ' +
+                           repr(float(vectors['time'][-1])) + 's')
+    return vectors
+
+
+def read_state(checkpoint):
+    """Return the state of a checkpoint directory, or None."""
+    path = os.path.join(checkpoint, state_file)
+    if not os.path.isfile(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_state(checkpoint, state):
+    """Write the state of a checkpoint directory."""
+    path = os.path.join(checkpoint, state_file)
+    # The state is written last and atomically, so it only lists segments
+    # that were written completely.
+    with open(path + '.tmp', 'w') as f:
+        json.dump(state, f)
+    os.replace(path + '.tmp', path)
+
+
+def load_tran(checkpoint):
+    """Return the stitched vectors of the segments saved in a checkpoint.
+
+    Returns a dictionary mapping vector names to arrays.
+    """
+    state = read_state(checkpoint)
+    if state is None:
+        raise ValueError('Not a checkpoint: ' + checkpoint)
+    segments = []
+    for k in range(state['nsegments']):
+        with np.load(os.path.join(checkpoint, 'segment' + str(k) +
+                                  '.npz')) as data:
+            segments.append(dict(data))
+    if not segments:
+        return {}
+    return dict((name, np.concatenate([segment[name]
+                                       for segment in segments]))
+                for name in segments[0])
+
+
+def checkpointed_tran(netlist, tstep, tstop, checkpoint, segment=None,
+                      tmax=None):
+    """Run a transient analysis in segments that are saved as they finish.
+
+    If the checkpoint directory holds segments of the same analysis, it
+    continues after the last one. See ngspicepy.transient for how the
+    segments are run.
+
+    Returns a dictionary mapping vector names to the arrays of the whole
+    analysis.
+
+    Parameters:
+        netlist
+            Anything the Netlist constructor accepts.
+        tstep, tstop, tmax
+            The arguments of the transient analysis, as numbers or ngspice
+            numbers.
+        checkpoint
+            The directory in which the segments are saved.
+        segment
+            The simulated time of a segment. Defaults to a tenth of tstop.
+    """
+    netlist_list = Netlist(netlist).netlist
+    tstep, tstop = to_num(str(tstep)), to_num(str(tstop))
+    tmax = None if tmax is None else to_num(str(tmax))
+    segment = tstop / 10 if segment is None else to_num(str(segment))
+    if tstep <= 0 or tstop <= 0 or segment <= 0:
+        raise ValueError('Wrong values')
+    if segment < tstop:
+        # Check that the waveforms can be shifted before running anything.
+        shift_sources(netlist_list, segment, tstep, tstop)
+
+    state = read_state(checkpoint)
+    analysis = {'netlist': netlist_list, 'tstep': tstep, 'tstop': tstop,
+                'tmax': tmax}
+    if state is None:
+        os.makedirs(checkpoint, exist_ok=True)
+        state = dict(analysis, segment=segment, nsegments=0, time=0.0,
+                     voltages={}, currents={})
+    elif any(state[key] != value for key, value in analysis.items()):
+        raise ValueError('The checkpoint is of another analysis: ' +
+                         checkpoint)
+    state['segment'] = segment
+
+    t0 = state['time']
+    while t0 < tstop * (1 - 1e-12):
+        t1 = min(t0 + segment, tstop)
+        if state['nsegments'] == 0:
+            vectors = run_segment(netlist_list, tstep, t1, tmax)
+        else:
+            lines = restart_netlist(netlist_list, t0, state['voltages'],
+                                    state['currents'], tstep, tstop)
+            vectors = run_segment(lines, tstep, t1 - t0, tmax, uic=True)
+            # The first point is the last one of the previous segment.
+            vectors = dict((name, values[1:])
+                           for name, values in vectors.items())
+            vectors['time'] = vectors['time'] + t0
+
+        np.savez(os.path.join(checkpoint, 'segment' +
+                              str(state['nsegments']) + '.npz'), **vectors)
+        state['voltages'] = node_voltages(vectors)
+        state['currents'] = dict(
+            (name[:-len('#branch')], float(values[-1]))
+            for name, values in vectors.items()
+            if name.lower().startswith('l') and name.endswith('#branch'))
+        state['time'] = t0 = t1
+        state['nsegments'] += 1
+        write_state(checkpoint, state)
+
+    return load_tran(checkpoint)
+
+
+def resume_tran(checkpoint):
+    """Finish the analysis of a checkpoint and return its vectors.
+
+    See checkpointed_tran().
+    """
+    state = read_state(checkpoint)
+    if state is None:
+        raise ValueError('Not a checkpoint: ' + checkpoint)
+    return checkpointed_tran(state['netlist'], state['tstep'], state['tstop'],
+                             checkpoint, state['segment'], state['tmax'])
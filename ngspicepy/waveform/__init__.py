@@ -0,0 +1,24 @@
+"""
+Waveform Processing
+===================
+
+Functions that process the vectors returned by get_data(), such as extracting
+a window of a vector, decimating it for plotting and resampling the vectors of
+many simulations onto a common scale, and the spectra and distortion metrics,
+e.g. THD, SFDR, SNDR and ENOB, of periodic vectors.
+
+Example
+-------
+
+    >>> t = ng.get_data('time')
+    >>> v_out = ng.get_data('v(out)')
+    >>> start, stop = window(t, 1e-3, 2e-3)
+    >>> t_d, v_d = minmax(t[start:stop], v_out[start:stop], 1000)
+    >>> t, v_outs = resample(['tran1', 'tran2'], ['v(out)'], npoints=1000)
+    >>> spectrum = spectral_analysis(['tran1', 'tran2'], ['v(out)'], 1e3,
+    ...                              nperiods=4, npoints=4096)
+"""
+from .decimate import lttb, minmax, window
+from .resample import resample
+from .spectral import periodic_grid, spectral_analysis, spectral_plan,\
+    Spectrum
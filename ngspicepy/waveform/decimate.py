@@ -0,0 +1,128 @@
+"""Windowing and decimation of vectors."""
+import numpy as np
+
+
+def window(scale, start, stop):
+    """Return the indices that bound a window of a monotonic scale vector.
+
+    The indices are found by a binary search, so neither the scale nor the
+    vectors that are sliced with them are copied.
+
+    Parameters:
+        scale
+            The scale vector, e.g. time. It can either be increasing or
+            decreasing, as with a DC sweep with a negative step.
+        start, stop
+            The bounds of the window, in the units of the scale. None leaves
+            that side of the window open.
+
+    Example:
+        >>> i, j = window(t, 1e-3, 2e-3)
+        >>> v_out[i:j]
+    """
+    if np.iscomplexobj(scale):
+        scale = scale.real
+    n = len(scale)
+    descending = n > 1 and scale[0] > scale[-1]
+    if descending:
+        scale = scale[::-1]
+
+    lo = 0 if start is None else np.searchsorted(scale, start, side='left')
+    hi = n if stop is None else np.searchsorted(scale, stop, side='right')
+    if descending:
+        lo, hi = n - hi, n - lo
+    return int(lo), int(hi)
+
+
+def minmax(scale, data, npoints):
+    """Decimate a vector to its minimum and maximum in each bucket.
+
+    The vector is divided into at most npoints // 2 buckets of equal length
+    and the minimum and maximum of each bucket are kept in the order in which
+    they occur, so that the envelope of the vector is preserved. A bucket
+    whose minimum and maximum are the same point contributes it twice.
+
+    Parameters:
+        scale
+            The scale vector.
+        data
+            The real vector to be decimated.
+        npoints
+            The maximum number of points to return.
+
+    Returns the decimated scale and data vectors.
+    """
+    n = len(data)
+    nbuckets = npoints // 2
+    if nbuckets < 1:
+        raise ValueError('npoints must be at least 2')
+    if n <= npoints:
+        return scale.copy(), data.copy()
+
+    # Reshaping the part that fills whole buckets doesn't copy it. The rest is
+    # handled as one last, shorter bucket.
+    size = -(-n // nbuckets)
+    full = size * (n // size)
+    buckets = data[:full].reshape(-1, size)
+    offsets = np.arange(0, full, size)
+    idx_min = buckets.argmin(axis=1) + offsets
+    idx_max = buckets.argmax(axis=1) + offsets
+    if full < n:
+        idx_min = np.append(idx_min, full + data[full:].argmin())
+        idx_max = np.append(idx_max, full + data[full:].argmax())
+
+    idx = np.empty(2 * len(idx_min), dtype=np.intp)
+    idx[0::2] = np.minimum(idx_min, idx_max)
+    idx[1::2] = np.maximum(idx_min, idx_max)
+    return scale[idx], data[idx]
+
+
+def lttb(scale, data, npoints):
+    """Decimate a vector using the largest triangle three buckets algorithm.
+
+    The first and last points are kept and the rest of the vector is divided
+    into npoints - 2 buckets. From each bucket, the point that forms the
+    largest triangle with the point kept from the previous bucket and the
+    average of the next bucket is kept. This preserves the visual shape of
+    the vector better than picking every n-th point.
+
+    Parameters:
+        scale
+            The scale vector.
+        data
+            The real vector to be decimated.
+        npoints
+            The number of points to return.
+
+    Returns the decimated scale and data vectors.
+    """
+    n = len(data)
+    if npoints < 3:
+        raise ValueError('npoints must be at least 3')
+    if n <= npoints:
+        return scale.copy(), data.copy()
+
+    edges = np.linspace(1, n - 1, npoints - 1).astype(np.intp)
+    idx = np.empty(npoints, dtype=np.intp)
+    idx[0] = 0
+    idx[-1] = n - 1
+
+    a = 0
+    for i in range(npoints - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_lo, next_hi = edges[i + 1], edges[i + 2]
+            avg_x = scale[next_lo:next_hi].mean()
+            avg_y = data[next_lo:next_hi].mean()
+        else:
+            avg_x = scale[n - 1]
+            avg_y = data[n - 1]
+
+        # Twice the area of the triangles formed by the previous point, each
+        # point in the bucket and the average of the next bucket.
+        area = np.abs((scale[a] - avg_x) * (data[lo:hi] - data[a]) -
+                      (scale[a] - scale[lo:hi]) * (avg_y - data[a]))
+        a = lo + area.argmax()
+        idx[i + 1] = a
+
+    return scale[idx], data[idx]
@@ -0,0 +1,89 @@
+"""Resampling of vectors from many simulations onto a common scale."""
+import ngspicepy as ng
+
+import numpy as np
+
+
+def resample(plots, vector_names, grid=None, npoints=None, scale='time',
+             out=None):
+    """Interpolate the vectors of many plots onto a common scale.
+
+    Transient analyses use adaptive time steps, so the time vectors of two
+    runs differ. This function linearly interpolates the given vectors of
+    every run onto one grid so that they can be compared or stacked. The
+    position of each grid point within a run's scale is found once and
+    reused for all of the run's vectors.
+
+    Parameters:
+        plots
+            A list where each item is either the name of a plot in ngspice or
+            a dictionary of vectors, such as the one returned by
+            get_all_data().
+        vector_names
+            A list of the names of the vectors to be resampled.
+        grid
+            The scale values to interpolate at. If unspecified, npoints
+            uniformly spaced values spanning the range that all the plots
+            share are used.
+        npoints
+            The number of points in the uniform grid.
+        scale
+            The name of the scale vector in the dictionaries given in plots.
+            The scale of plots in ngspice is found using get_scale_name().
+        out
+            An array of shape (len(plots), len(vector_names), len(grid)) into
+            which the result is written, e.g. a numpy.memmap. An array is
+            allocated if it is unspecified.
+
+    Returns the grid and the array of the resampled vectors.
+
+    Example:
+        >>> t, data = resample(['tran1', 'tran2', 'tran3'], ['v(out)'],
+        ...                    npoints=1000)
+        >>> data.shape
+        (3, 1, 1000)
+    """
+    runs = []
+    for plot in plots:
+        if type(plot) == str:
+            scale_data = ng.get_data(ng.get_scale_name(plot), plot)
+            vectors = [ng.get_data(name, plot) for name in vector_names]
+        else:
+            scale_data = plot[scale]
+            vectors = [plot[name] for name in vector_names]
+        runs.append((scale_data.real, vectors))
+
+    if grid is None:
+        if npoints is None:
+            raise ValueError('Either grid or npoints must be specified')
+        start = max(scale_data[0] for scale_data, vectors in runs)
+        stop = min(scale_data[-1] for scale_data, vectors in runs)
+        grid = np.linspace(start, stop, npoints)
+    grid = np.asarray(grid, dtype=np.float64)
+
+    shape = (len(runs), len(vector_names), len(grid))
+    if out is None:
+        is_complex = any(np.iscomplexobj(vector)
+                         for scale_data, vectors in runs
+                         for vector in vectors)
+        out = np.empty(shape, dtype=np.complex128 if is_complex
+                       else np.float64)
+    elif out.shape != shape:
+        raise ValueError('out must have the shape ' + str(shape))
+
+    for run, (scale_data, vectors) in enumerate(runs):
+        # Index of the scale point to the right of each grid point and the
+        # weight of that point. Grid points outside the scale are clamped to
+        # its end points.
+        right = np.searchsorted(scale_data, grid, side='right')
+        np.clip(right, 1, len(scale_data) - 1, out=right)
+        left = right - 1
+        width = scale_data[right] - scale_data[left]
+        width[width == 0] = 1
+        weight = np.clip((grid - scale_data[left]) / width, 0, 1)
+
+        for i, vector in enumerate(vectors):
+            y_left = vector[left]
+            out[run, i] = y_left + weight * (vector[right] - y_left)
+
+    return grid, out
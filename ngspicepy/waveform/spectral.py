@@ -0,0 +1,215 @@
+"""Spectral analysis of periodic vectors."""
+import functools
+
+import numpy as np
+
+import ngspicepy as ng
+
+from .resample import resample
+
+# The window functions and the number of bins on each side of a tone that
+# their main lobes spread it to when the sampling is coherent.
+windows = {'rectangular': (np.ones, 0),
+           'hanning': (np.hanning, 1),
+           'hamming': (np.hamming, 1),
+           'blackman': (np.blackman, 3)}
+
+
+class SpectralPlan(object):
+    """The window and the bins used to analyze vectors of one length.
+
+    Plans are cached by spectral_plan(), so repeated analyses of vectors of
+    the same length only compute their FFT and sums. numpy caches the
+    factors of its FFTs of each length as well.
+
+    Attributes:
+        window
+            The window, which the vectors are multiplied with.
+        weights
+            The weights of the bins in the power of a real signal, i.e. 2
+            for the bins that stand for a positive and a negative frequency.
+        norm
+            The power of a unit amplitude sine summed over its bins.
+        tones
+            The bins of the main lobes of the harmonics, one row per
+            harmonic with the fundamental first, with -1 where the lobe is
+            cut off or has no bin of its own.
+        dc
+            The bins of the main lobe of DC.
+    """
+
+    def __init__(self, npoints, nperiods, nharmonics, window):
+        if window not in windows:
+            raise ValueError('Invalid window: ' + window)
+        if nperiods < 1 or 2 * nperiods >= npoints:
+            raise ValueError('The fundamental must be below the Nyquist ' +
+                             'frequency')
+        function, half_width = windows[window]
+        # The main lobes of DC and of the harmonics overlap otherwise.
+        if nperiods < 2 * half_width + 1:
+            raise ValueError('The ' + window + ' window needs at least ' +
+                             str(2 * half_width + 1) + ' periods')
+        self.window = function(npoints + 1)[:npoints] if window !=\
+            'rectangular' else function(npoints)
+        self.window.flags.writeable = False
+
+        nbins = npoints // 2 + 1
+        self.weights = np.full(nbins, 2.0)
+        self.weights[0] = 1
+        if npoints % 2 == 0:
+            self.weights[-1] = 1
+        self.norm = npoints * np.sum(self.window ** 2) / 2
+
+        offsets = np.arange(-half_width, half_width + 1)
+        self.dc = offsets[half_width:]
+        # Harmonics above the Nyquist frequency alias back below it.
+        centers = np.arange(1, nharmonics + 1) * nperiods % npoints
+        centers = np.minimum(centers, npoints - centers)
+        tones = centers[:, None] + offsets
+        # Bins outside the spectrum, in the lobe of DC or of an earlier
+        # harmonic aren't counted again.
+        taken = set(self.dc)
+        for row in tones:
+            for i, bin in enumerate(row):
+                if bin < 0 or bin >= nbins or bin in taken:
+                    row[i] = -1
+                else:
+                    taken.add(bin)
+        self.tones = tones
+
+
+@functools.lru_cache(maxsize=32)
+def spectral_plan(npoints, nperiods, nharmonics, window):
+    """Return the cached SpectralPlan for the arguments."""
+    return SpectralPlan(npoints, nperiods, nharmonics, window)
+
+
+class Spectrum(object):
+    """The spectra and the distortion metrics of a batch of vectors.
+
+    The attributes are arrays whose leading dimensions are those of the
+    vectors, e.g. (runs, vectors), except frequencies.
+
+    Attributes:
+        frequencies
+            The frequencies of the bins.
+        power
+            The power of each bin, i.e. the squared RMS value.
+        dc
+            The DC value.
+        harmonics
+            The amplitudes of the harmonics, with the fundamental first.
+        thd
+            The total harmonic distortion as a ratio of amplitudes.
+        sfdr
+            The spurious free dynamic range in dB, i.e. the ratio of the
+            fundamental to the largest other bin, excluding DC.
+        sndr
+            The signal to noise and distortion ratio in dB, i.e. the ratio
+            of the fundamental to everything else except DC.
+        enob
+            The effective number of bits, (sndr - 1.76) / 6.02.
+    """
+
+    def __init__(self, data, fundamental, nperiods, nharmonics=9,
+                 window='rectangular'):
+        """Class constructor. Analyzes the vectors.
+
+        Parameters:
+            data
+                An array of vectors sampled uniformly over nperiods whole
+                periods of the fundamental, along its last axis.
+            fundamental
+                The frequency of the fundamental.
+            nperiods
+                The number of periods in the vectors.
+            nharmonics
+                The number of harmonics, including the fundamental, that
+                count as distortion.
+            window
+                'rectangular', 'hanning', 'hamming' or 'blackman'. Coherent
+                sampling, i.e. whole periods, needs no window. The others
+                reduce the leakage of tones that aren't harmonics, but
+                spread each tone over a main lobe, so the vectors must
+                cover at least 3 periods for 'hanning' and 'hamming' and 7
+                for 'blackman'. ValueError is raised otherwise.
+        """
+        data = np.asarray(data, dtype=float)
+        npoints = data.shape[-1]
+        plan = spectral_plan(npoints, nperiods, nharmonics, window)
+
+        spectrum = np.fft.rfft(data * plan.window)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2) * plan.weights /\
+            plan.norm / 2
+        self.frequencies = np.arange(len(plan.weights)) * fundamental /\
+            nperiods
+        self.power = power
+
+        tone_power = np.where(plan.tones >= 0,
+                              np.take(power, plan.tones, axis=-1), 0).sum(-1)
+        dc_power = np.take(power, plan.dc, axis=-1).sum(-1)
+        self.dc = spectrum[..., 0].real / np.sum(plan.window)
+        self.harmonics = np.sqrt(2 * tone_power)
+        signal = tone_power[..., 0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.thd = np.sqrt(tone_power[..., 1:].sum(-1) / signal)
+            others = power.sum(-1) - dc_power - signal
+            self.sndr = 10 * np.log10(signal / others)
+
+            spurs = power.copy()
+            spurs[..., plan.dc] = 0
+            fundamental_bins = plan.tones[0][plan.tones[0] >= 0]
+            peak = np.take(power, fundamental_bins, axis=-1).max(-1)
+            spurs[..., fundamental_bins] = 0
+            self.sfdr = 10 * np.log10(peak / spurs.max(-1))
+        self.enob = (self.sndr - 1.76) / 6.02
+
+
+def periodic_grid(fundamental, nperiods, npoints, tstop):
+    """Return npoints uniform times over the nperiods periods before tstop.
+
+    The last point is one step before tstop, so that the samples cover
+    whole periods without repeating the first one.
+    """
+    duration = nperiods / fundamental
+    return tstop - duration + np.arange(npoints) * (duration / npoints)
+
+
+def spectral_analysis(plots, vector_names, fundamental, nperiods=1,
+                      npoints=1024, nharmonics=9, window='rectangular'):
+    """Analyze the last periods of the vectors of many transient analyses.
+
+    The vectors are resampled onto a uniform grid over the last nperiods
+    periods of the fundamental that all the plots cover, see resample(),
+    and analyzed in one batch.
+
+    Returns a Spectrum whose attributes have the dimensions (plots,
+    vectors).
+
+    Parameters:
+        plots
+            A list of plot names or dictionaries of vectors, see resample().
+        vector_names
+            A list of the names of the vectors.
+        fundamental
+            The frequency of the fundamental.
+        nperiods
+            The number of periods to analyze. The circuit should be in a
+            steady state during them.
+        npoints
+            The number of samples. It should be well above twice the
+            frequency of the highest harmonic of interest.
+        nharmonics, window
+            See Spectrum. A window needs more periods than the default.
+
+    Example:
+        >>> spectrum = spectral_analysis(['tran1', 'tran2'], ['v(out)'], 1e3,
+        ...                              nperiods=4, npoints=4096)
+        >>> spectrum.thd[:, 0], spectrum.enob[:, 0]
+    """
+    tstop = min(ng.get_data(ng.get_scale_name(plot), plot)[-1].real
+                if type(plot) == str else plot['time'][-1].real
+                for plot in plots)
+    grid = periodic_grid(fundamental, nperiods, npoints, tstop)
+    grid, data = resample(plots, vector_names, grid)
+    return Spectrum(data.real, fundamental, nperiods, nharmonics, window)
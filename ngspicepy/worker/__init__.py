@@ -0,0 +1,34 @@
+"""
+Supervised Workers
+==================
+
+A Worker runs ngspicepy in a child process so that a crash or a hang in
+ngspice doesn't take the Python process down with it. The worker offers the
+same functions as the ngspicepy module and is restarted and warmed up again
+whenever it fails.
+
+Example
+-------
+
+    >>> with Worker(timeout=60) as worker:
+    ...     worker.load_netlist('CS-Amp.cir')
+    ...     worker.run_tran('1u 10m')
+    ...     v_out = worker.get_data('v(out)')
+
+A WorkerPool runs calls on several Workers in parallel:
+
+    >>> with WorkerPool(4, timeout=60) as pool:
+    ...     plots = pool.map(sweep, [(0.1,), (0.01,), (0.001,)])
+
+Results are sent to the parent by pack() and unpack(). The large arrays of a
+result, e.g. the vectors of a Plot, are copied once into a single shared
+memory segment and only a small descriptor is pickled. The parent gets numpy
+arrays that point into the segment, which is freed once they're all garbage
+collected. The functions can also be used around other multiprocessing code:
+
+    >>> packed = pack(ng.get_all_data('tran1'))   # in the child
+    >>> data = unpack(packed)                     # in the parent
+"""
+from .pool import WorkerPool
+from .transport import pack, PlotData, unpack
+from .worker import Worker
@@ -0,0 +1,105 @@
+"""The worker pool class."""
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from .worker import Worker
+
+
+class WorkerPool(object):
+    """Runs calls on several Workers in parallel.
+
+    Each call is given to an idle Worker. The Workers are supervised as
+    usual, so a call that crashes or hangs ngspice only fails that call, with
+    a RuntimeError or TimeoutError.
+
+    Example:
+        >>> with WorkerPool(4, timeout=60) as pool:
+        ...     results = pool.map(evaluate, [(1e3,), (2e3,), (5e3,)])
+    """
+
+    def __init__(self, nworkers, warmup=None, timeout=None):
+        """Class constructor. Starts the Workers.
+
+        Parameters:
+            nworkers
+                The number of Workers, i.e. of ngspice processes.
+            warmup, timeout
+                Passed on to each Worker.
+        """
+        if nworkers < 1:
+            raise ValueError('nworkers must be at least 1')
+        self.workers = [Worker(warmup, timeout) for i in range(nworkers)]
+        self.idle = queue.Queue()
+        for worker in self.workers:
+            self.idle.put(worker)
+        # Each thread waits on the pipe of one Worker.
+        self.executor = ThreadPoolExecutor(max_workers=nworkers)
+
+    def __len__(self):
+        return len(self.workers)
+
+    def __call__(self, target, args, kwargs):
+        worker = self.acquire()
+        try:
+            return worker.call(target, *args, **kwargs)
+        finally:
+            self.release(worker)
+
+    def acquire(self, timeout=None):
+        """Take an idle Worker for exclusive use, waiting for one if needed.
+
+        Raises queue.Empty if none becomes idle within the timeout.
+        """
+        return self.idle.get(timeout=timeout)
+
+    def release(self, worker):
+        """Return a Worker taken by acquire()."""
+        self.idle.put(worker)
+
+    def submit(self, target, *args, **kwargs):
+        """Schedule a call on the next idle Worker and return a Future.
+
+        Parameters:
+            target
+                The name of one of ngspicepy's functions or a top level
+                function, see Worker.call().
+            ``*args``, ``**kwargs``
+                The arguments of the function.
+        """
+        return self.executor.submit(self, target, args, kwargs)
+
+    def map(self, target, args_list, return_exceptions=False):
+        """Call target once for each tuple of arguments in args_list.
+
+        Returns the results in the order of args_list. If return_exceptions
+        is True, the exceptions raised by failed calls are returned in place
+        of their results instead of being raised.
+        """
+        futures = [self.submit(target, *args) for args in args_list]
+        results = []
+        for future in futures:
+            exception = future.exception()
+            if exception is None:
+                results.append(future.result())
+            elif return_exceptions:
+                results.append(exception)
+            else:
+                raise exception
+        return results
+
+    @property
+    def restarts(self):
+        """Return the total number of times the Workers were restarted."""
+        return sum(worker.restarts for worker in self.workers)
+
+    def close(self):
+        """Wait for the scheduled calls and stop the Workers."""
+        self.executor.shutdown()
+        for worker in self.workers:
+            worker.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
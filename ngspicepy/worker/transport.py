@@ -0,0 +1,217 @@
+"""Transport of results from a worker process to its parent."""
+import binascii
+import os
+import threading
+import weakref
+
+import numpy as np
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # pragma: no cover
+    # Python < 3.8. Arrays are pickled through the pipe instead.
+    shared_memory = None
+
+# Arrays smaller than this are cheaper to pickle than to share.
+min_shared_bytes = 1 << 16
+
+# The offsets of the arrays in a segment are multiples of this.
+alignment = 64
+
+
+class SharedArray(object):
+    """Describes an array stored in a shared memory segment."""
+
+    __slots__ = ('offset', 'dtype', 'shape', 'v_type')
+
+    def __init__(self, offset, dtype, shape, v_type=None):
+        self.offset = offset
+        self.dtype = dtype
+        self.shape = shape
+        self.v_type = v_type
+
+    def __getstate__(self):
+        return (self.offset, self.dtype, self.shape, self.v_type)
+
+    def __setstate__(self, state):
+        self.offset, self.dtype, self.shape, self.v_type = state
+
+
+class PlotData(dict):
+    """The vectors of a Plot as a dictionary of arrays.
+
+    Attributes:
+        name
+            The name of the plot.
+        v_types
+            A dictionary of the v_type of each vector.
+    """
+
+    def __init__(self, name, v_types, vectors=()):
+        dict.__init__(self, vectors)
+        self.name = name
+        self.v_types = v_types
+
+
+class Packed(object):
+    """A result whose large arrays were copied into one shared segment.
+
+    Only this small descriptor is pickled: the name and size of the segment
+    and the result with SharedArrays in place of the arrays.
+    """
+
+    def __init__(self, name, size, payload):
+        self.name = name
+        self.size = size
+        self.payload = payload
+
+
+class Segment(object):
+    """A shared memory segment attached by the parent.
+
+    The arrays returned by view() point into the segment without copying.
+    The segment is unlinked as soon as it is attached, so it can't leak, and
+    it is closed once the last array is garbage collected. Slices and other
+    views of the arrays keep them alive.
+    """
+
+    def __init__(self, name):
+        self.shm = shared_memory.SharedMemory(name=name)
+        self.shm.unlink()
+        self.refs = 0
+        self.lock = threading.Lock()
+
+    def view(self, descriptor):
+        """Return the array described by a SharedArray."""
+        array = np.ndarray(descriptor.shape, descriptor.dtype,
+                           buffer=self.shm.buf, offset=descriptor.offset)
+        with self.lock:
+            self.refs += 1
+        weakref.finalize(array, self.release)
+        return array
+
+    def release(self):
+        """Drop a reference, closing the segment when there are none left."""
+        with self.lock:
+            self.refs -= 1
+            if self.refs == 0:
+                self.shm.close()
+
+
+def collect(result, arrays):
+    """Convert a result into a picklable payload.
+
+    Plots and Vectors are converted to PlotData and arrays, since they point
+    into the worker's memory. Large arrays are appended to arrays, as (array,
+    SharedArray) pairs, and replaced by their SharedArray.
+    """
+    from ngspicepy.plot import Plot, Vector
+
+    if isinstance(result, Plot):
+        v_types = {}
+        vectors = {}
+        for vector_name in result:
+            vector = result[vector_name]
+            v_types[vector_name] = vector.v_type
+            vectors[vector_name] = collect(vector.data, arrays)
+            if isinstance(vectors[vector_name], SharedArray):
+                vectors[vector_name].v_type = vector.v_type
+        return PlotData(result.name, v_types, vectors)
+    elif isinstance(result, Vector):
+        result = result.data
+
+    if isinstance(result, np.ndarray):
+        if shared_memory is not None and result.nbytes >= min_shared_bytes:
+            descriptor = SharedArray(None, result.dtype.str, result.shape)
+            arrays.append((result, descriptor))
+            return descriptor
+        return np.array(result)
+    elif isinstance(result, PlotData):
+        return PlotData(result.name, result.v_types,
+                        ((key, collect(value, arrays))
+                         for key, value in result.items()))
+    elif type(result) in (list, tuple):
+        return type(result)(collect(item, arrays) for item in result)
+    elif isinstance(result, dict):
+        return type(result)((key, collect(value, arrays))
+                            for key, value in result.items())
+    return result
+
+
+def segment_name():
+    """Return a new random name for the segment of a result."""
+    return 'ngspicepy_' + binascii.hexlify(os.urandom(8)).decode()
+
+
+def discard(name):
+    """Unlink the segment of a result that will never be unpacked.
+
+    Nothing is done if there is no segment with that name, e.g. because the
+    call failed before it was created or the result was unpacked.
+    """
+    if shared_memory is None:
+        return
+    try:
+        segment = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    segment.unlink()
+    segment.close()
+
+
+def pack(result, name=None):
+    """Convert a result into something that can be sent to the parent.
+
+    All the large arrays of the result, e.g. the vectors of a Plot, are
+    copied straight from ngspice's memory into a single shared memory
+    segment. Only a Packed descriptor of it is then sent.
+
+    The segment is unlinked by the parent's unpack(). A Worker names the
+    segment of each call with segment_name(), so that it can discard() it
+    if it gives up on the call before the result arrives.
+    """
+    arrays = []
+    payload = collect(result, arrays)
+    if not arrays:
+        return payload
+
+    size = 0
+    for array, descriptor in arrays:
+        descriptor.offset = size
+        size += -(-array.nbytes // alignment) * alignment
+    segment = shared_memory.SharedMemory(name, create=True, size=size)
+    for array, descriptor in arrays:
+        np.ndarray(array.shape, array.dtype, buffer=segment.buf,
+                   offset=descriptor.offset)[...] = array
+    name = segment.name
+    segment.close()
+    # The parent unlinks the segment, so this process mustn't.
+    resource_tracker.unregister(segment._name, 'shared_memory')
+    return Packed(name, size, payload)
+
+
+def attach(payload, segment):
+    """Replace the SharedArrays in a payload by views into a segment."""
+    if isinstance(payload, SharedArray):
+        return segment.view(payload)
+    elif isinstance(payload, PlotData):
+        return PlotData(payload.name, payload.v_types,
+                        ((key, attach(value, segment))
+                         for key, value in payload.items()))
+    elif type(payload) in (list, tuple):
+        return type(payload)(attach(item, segment) for item in payload)
+    elif isinstance(payload, dict):
+        return type(payload)((key, attach(value, segment))
+                             for key, value in payload.items())
+    return payload
+
+
+def unpack(result):
+    """Undo pack() in the parent process, without copying the arrays."""
+    if not isinstance(result, Packed):
+        return result
+    segment = Segment(result.name)
+    payload = attach(result.payload, segment)
+    if segment.refs == 0:
+        segment.shm.close()
+    return payload
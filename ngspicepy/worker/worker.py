@@ -0,0 +1,228 @@
+"""The supervised worker class."""
+import functools
+import multiprocessing
+import threading
+import traceback
+
+from .transport import discard, pack, segment_name, unpack
+
+
+def resolve(target):
+    """Return the function that a worker should call for target.
+
+    target is either the name of one of ngspicepy's functions or a function
+    that can be pickled, i.e. one defined at the top level of a module.
+    """
+    import ngspicepy as ng
+
+    if callable(target):
+        return target
+    if not is_api_function(target):
+        raise ValueError('Unknown ngspicepy function: ' + str(target))
+    return getattr(ng, target)
+
+
+def is_api_function(name):
+    """Return True if name is one of the functions exported by ngspicepy."""
+    import ngspicepy as ng
+
+    if name not in ng.__all__:
+        return False
+    function = getattr(ng, name)
+    return callable(function) and not isinstance(function, type)
+
+
+def worker_main(conn, warmup):
+    """Run the calls sent by a Worker until the pipe is closed."""
+    import ngspicepy  # noqa: F401. Loads the shared library.
+
+    try:
+        for target, args, kwargs in warmup:
+            resolve(target)(*args, **kwargs)
+    except Exception as e:
+        conn.send(('error', RuntimeError('Warm-up failed: ' + repr(e))))
+        conn.close()
+        return
+    conn.send(('ready', None))
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+
+        target, args, kwargs, name = message
+        try:
+            result = pack(resolve(target)(*args, **kwargs), name)
+        except Exception as e:
+            try:
+                conn.send(('error', e))
+            except Exception:
+                # The exception can't be pickled.
+                conn.send(('error', RuntimeError(traceback.format_exc())))
+        else:
+            conn.send(('ok', result))
+    conn.close()
+
+
+class Worker(object):
+    """Runs ngspice in a child process that is restarted when it fails.
+
+    An invalid netlist or command can crash ngspice or make it hang, taking
+    the Python process with it. A Worker runs ngspicepy in a child process
+    and offers the same functions as the ngspicepy module. When the child
+    crashes or a call takes longer than the timeout, the child is killed and
+    a new one is started and warmed up by repeating the warm-up calls. The
+    failed call raises a RuntimeError or a TimeoutError.
+
+    Large arrays are returned through shared memory instead of being pickled
+    through the pipe, and the returned arrays point into it without a copy.
+    Plots and Vectors are returned as PlotData dictionaries and arrays since
+    they point into the child's memory.
+
+    Example
+    -------
+
+        >>> worker = Worker(warmup=[('set_options', (), {'temp': 27})],
+        ...                 timeout=60)
+        >>> worker.load_netlist('CS-Amp.cir')
+        >>> worker.run_tran('1u 10m')
+        >>> v_out = worker.get_data('v(out)')
+        >>> worker.close()
+    """
+
+    def __init__(self, warmup=None, timeout=None):
+        """Class constructor. Starts the child process.
+
+        Parameters:
+            warmup
+                A list of (function, args, kwargs) tuples that are called in
+                the child process whenever it is started. function is the
+                name of one of ngspicepy's functions or a top level function.
+            timeout
+                The number of seconds after which a call is considered to be
+                hung. None waits forever.
+        """
+        self.warmup = list(warmup) if warmup is not None else []
+        self.timeout = timeout
+        self.restarts = 0
+        self.process = None
+        self.conn = None
+        self.lock = threading.Lock()
+        self.start()
+
+    def start(self):
+        """Start the child process and wait until it is warmed up."""
+        context = multiprocessing.get_context('spawn')
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=worker_main,
+                                       args=(child_conn, self.warmup),
+                                       daemon=True)
+        self.process.start()
+        child_conn.close()
+
+        if self.conn.poll(self.timeout):
+            try:
+                status, result = self.conn.recv()
+            except (EOFError, OSError):
+                status, result = 'error', RuntimeError(
+                    'ngspice worker crashed while starting')
+        else:
+            status, result = 'error', TimeoutError(
+                'ngspice worker timed out while starting')
+        if status == 'error':
+            self.stop(kill=True)
+            raise result
+
+    def restart(self):
+        """Kill the child process and start a new one."""
+        self.stop(kill=True)
+        self.restarts += 1
+        self.start()
+
+    def stop(self, kill=False):
+        """Stop the child process."""
+        if self.process is None:
+            return
+        if not kill and self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(self.timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+        self.process = None
+
+    def close(self):
+        """Stop the child process once it is done with the current call."""
+        with self.lock:
+            self.stop()
+
+    def call(self, target, *args, **kwargs):
+        """Call a function in the child process and return its result.
+
+        Parameters:
+            target
+                The name of one of ngspicepy's functions, e.g. 'run_dc', or a
+                top level function, which is pickled by reference.
+            ``*args``, ``**kwargs``
+                The arguments of the function.
+        """
+        return unpack(self.call_packed(target, *args, **kwargs))
+
+    def call_packed(self, target, *args, **kwargs):
+        """Like call(), but return the result as sent by pack().
+
+        The result can be passed on to another process, which calls
+        unpack() on it to get the arrays from shared memory.
+        """
+        with self.lock:
+            if self.process is None:
+                self.start()
+            segment = segment_name()
+            try:
+                self.conn.send((target, args, kwargs, segment))
+            except (BrokenPipeError, OSError):
+                self.restart()
+                raise RuntimeError('ngspice worker died before the call')
+            return self.__receive__(target, segment)
+
+    def __receive__(self, target, segment):
+        """Wait for the reply to a call, restarting the child if it fails.
+
+        The child may have created the segment of the result before it
+        failed, in which case it is discarded.
+        """
+        name = str(getattr(target, '__name__', target))
+        if not self.conn.poll(self.timeout):
+            self.restart()
+            discard(segment)
+            raise TimeoutError('ngspice worker timed out in ' + name)
+        try:
+            status, result = self.conn.recv()
+        except (EOFError, OSError):
+            self.process.join()
+            exitcode = self.process.exitcode
+            self.restart()
+            discard(segment)
+            raise RuntimeError('ngspice worker crashed with exit code ' +
+                               str(exitcode) + ' in ' + name)
+        if status == 'error':
+            raise result
+        return result
+
+    def __getattr__(self, name):
+        if is_api_function(name):
+            return functools.partial(self.call, name)
+        raise AttributeError(name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -16,4 +16,11 @@ setup(
         license="GPL3",
         install_requires=requires,
         packages=find_packages(),
+        entry_points={
+            'console_scripts': [
+                'ngspicepy-batch = ngspicepy.batch:main',
+                'ngspicepy-server = ngspicepy.server:main',
+                'ngspicepy-cluster = ngspicepy.cluster:main',
+                ],
+            },
         )
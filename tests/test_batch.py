@@ -0,0 +1,81 @@
+import json
+import os
+import sys
+
+import numpy as np
+
+import pytest
+
+module_path = os.path.dirname(os.path.curdir + os.path.sep)
+sys.path.insert(0, os.path.abspath(module_path))
+
+import ngspicepy as ng
+
+from ngspicepy.batch import main, prepare_job, read_jobs
+
+netlists_path = 'tests/netlists/'
+
+
+class TestReadJobs:
+    def test_read_jobs(self):
+        jobs = read_jobs(['{"netlist": "a.net"}', '',
+                          '{"id": "b", "netlist": "b.net"}'])
+        assert [job['id'] for job in jobs] == ['job1', 'b']
+
+        with pytest.raises(ValueError):
+            read_jobs(['{"netlist": "a.net"'])
+        with pytest.raises(ValueError):
+            read_jobs(['["a.net"]'])
+        with pytest.raises(ValueError):
+            read_jobs(['{"id": "a"}', '{"id": "a"}'])
+        with pytest.raises(ValueError):
+            read_jobs(['{"id": ".."}'])
+
+
+class TestPrepareJob:
+    def test_prepare_job(self):
+        netlist_list, analyses = prepare_job({
+            'id': 'a', 'netlist': netlists_path + 'param_check.net',
+            'analyses': ['op', 'dc v1 0 1 0.1', ['ac', 'dec 10 1 10']],
+            'params': {'r2': 2}})
+        assert netlist_list[1] == '.param r2=2'
+        assert analyses == [('op',), ('dc', 'v1 0 1 0.1'),
+                            ('ac', 'dec 10 1 10')]
+
+        netlist_list, analyses = prepare_job({
+            'id': 'a', 'netlist': netlists_path + 'dc_ac_check.net'})
+        assert analyses == [('op',)]
+
+        with pytest.raises(KeyError):
+            prepare_job({'id': 'a'})
+
+
+class TestMain:
+    def test_main(self, tmpdir, capsys):
+        ng.reset()
+        jobs_file = tmpdir.join('jobs.jsonl')
+        output = str(tmpdir.join('results'))
+        jobs = [{'id': 'tran', 'netlist': netlists_path + 'tran_check.net',
+                 'analyses': ['tran 1u 10m'], 'save': ['V(2)']},
+                {'id': 'dc', 'netlist': netlists_path + 'dc_ac_check.net',
+                 'analyses': ['dc v1 0 1 0.1', 'op']},
+                {'id': 'bad', 'netlist': 'missing.net'}]
+        jobs_file.write('\n'.join(json.dumps(job) for job in jobs))
+
+        assert main([str(jobs_file), '-o', output, '-j', '0']) == 1
+        out = capsys.readouterr().out
+        assert '3 jobs: 2 ok, 1 failed, 0 skipped' in out
+
+        tran = np.load(os.path.join(output, 'tran', 'tran.npz'))
+        assert sorted(tran.files) == ['V(2)', 'time']
+        dc = np.load(os.path.join(output, 'dc', 'dc.npz'))
+        assert len(dc['v-sweep']) == 11
+        assert os.path.isfile(os.path.join(output, 'dc', 'op.npz'))
+        with open(os.path.join(output, 'bad', 'status.json')) as f:
+            assert json.load(f)['status'] == 'failed'
+
+        # Finished jobs are skipped when the batch is run again.
+        assert main([str(jobs_file), '-o', output, '-j', '1']) == 1
+        out = capsys.readouterr().out
+        assert '3 jobs: 0 ok, 1 failed, 2 skipped' in out
+        ng.reset()
@@ -0,0 +1,97 @@
+import os
+import sys
+
+import numpy as np
+
+import pytest
+
+module_path = os.path.dirname(os.path.curdir + os.path.sep)
+sys.path.insert(0, os.path.abspath(module_path))
+
+import ngspicepy as ng
+
+from ngspicepy import CircuitBuilder, NetlistBuffer
+from ngspicepy.netlist.builder import digits
+
+netlists_path = 'tests/netlists/'
+
+
+class TestBuilder:
+    def test_digits(self):
+        table = digits([0, 7, 10, 1234567890])
+        assert [bytes(row[row != 0xff]) for row in table] ==\
+            [b'0', b'7', b'10', b'1234567890']
+
+    def test_lines(self):
+        builder = CircuitBuilder('Divider')
+        assert builder.node('0') == builder.node('GND') == 0
+        vdd = builder.node('vdd')
+        nodes = builder.new_nodes(3)
+        assert builder.node('out') == 5
+        assert builder.node('12') == 12 and builder.nnodes == 13
+        builder.add('V', vdd, 0, 1.8)
+        assert list(builder.add('r', [vdd, nodes[0]], nodes[:2], 1e3)) ==\
+            [1, 2]
+        builder.add('C', nodes, '0', [1e-12, 2e-12, 1.5])
+        builder.add_lines(['D1 out 0 dmod', '.model dmod d'])
+        assert builder.to_list() == ['Divider', 'D1 out 0 dmod',
+                                     '.model dmod d', 'V0 vdd 0 1.8',
+                                     'R1 vdd 2 1000.0', 'R2 2 3 1000.0',
+                                     'C3 2 0 1e-12', 'C4 3 0 2e-12',
+                                     'C5 4 0 1.5', '.end']
+        assert len(builder) == 6
+        assert builder.name(4) == 'C4'
+        assert builder.node_name(vdd) == 'vdd'
+        assert builder.node_name(3) == '3'
+        assert CircuitBuilder('Empty').to_list() == ['Empty', '.end']
+
+    def test_errors(self):
+        builder = CircuitBuilder()
+        with pytest.raises(ValueError):
+            builder.add('Q', 0, 0, 1)
+        with pytest.raises(ValueError):
+            builder.add('R', 0, 5, 1)
+        with pytest.raises(ValueError):
+            builder.add('R', 0, builder.new_nodes(2), np.inf)
+        with pytest.raises(ValueError):
+            builder.add_lines(['&1 1 0 1'])
+        with pytest.raises(ValueError):
+            builder.add_lines(['r3 1 0 1'])
+        # A numeric name can't be a named node.
+        builder = CircuitBuilder()
+        assert builder.node('vdd') == 1
+        with pytest.raises(ValueError):
+            builder.node('1')
+
+    def test_end(self):
+        builder = CircuitBuilder('Diode')
+        builder.add_lines(['Dx 1 0 dmod', '.model dmod d', '.END'])
+        builder.add('V', builder.node('1'), 0, 0.7)
+        assert builder.to_list() == ['Diode', 'Dx 1 0 dmod', '.model dmod d',
+                                     'V0 1 0 0.7', '.end']
+
+    def test_buffer(self):
+        builder = CircuitBuilder('Grid')
+        ids = builder.new_nodes(100).reshape(10, 10)
+        builder.add('R', ids[:, :-1], ids[:, 1:], 1.0)
+        builder.add('R', ids[:-1], ids[1:], 1.0)
+        lines = builder.to_list()
+        assert len(lines) == 2 + 180
+        assert NetlistBuffer(lines).data.raw == builder.buffer().data.raw
+        with pytest.raises(ValueError):
+            NetlistBuffer.from_bytes(b'title\0.end')
+
+        net = builder.to_netlist()
+        assert net.netlist == lines
+        assert net.get_buffer().data.raw == builder.buffer().data.raw
+
+    def test_run(self):
+        builder = CircuitBuilder('Ladder')
+        nodes = builder.new_nodes(11)
+        builder.add('V', nodes[0], 0, 1.0)
+        builder.add('R', nodes[:-1], nodes[1:], 1.0)
+        builder.add('R', nodes[-1], 0, 10.0)
+        ng.load_netlist(builder.buffer())
+        ng.run_op()
+        assert ng.get_data('V(6)')[0] == pytest.approx(0.5)
+        ng.reset()
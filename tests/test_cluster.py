@@ -0,0 +1,117 @@
+import io
+import json
+import os
+import sys
+import threading
+from multiprocessing.connection import Client
+
+import numpy as np
+
+import pytest
+
+module_path = os.path.dirname(os.path.curdir + os.path.sep)
+sys.path.insert(0, os.path.abspath(module_path))
+
+from ngspicepy.cluster import Coordinator, main, monte_carlo_jobs,\
+    start_nodes, sweep_jobs
+
+netlists_path = 'tests/netlists/'
+authkey = b'test'
+
+
+def fake_node(address, silent=False, close=False):
+    """Take jobs from a Coordinator and return made up results.
+
+    A silent node takes a job and stops talking, a closing one takes a job
+    and disconnects.
+    """
+    conn = Client(address, authkey=authkey)
+    while True:
+        conn.send(('ready',))
+        reply = conn.recv()
+        if reply[0] == 'done':
+            break
+        if reply[0] == 'wait':
+            continue
+        if close:
+            break
+        if silent:
+            threading.Event().wait(60)
+        job_id = reply[1]
+        conn.send(('result', job_id, 0.1,
+                   {'op': {'V(1)': np.array([float(job_id[-1])])}}))
+    conn.close()
+
+
+class TestJobs:
+    def test_sweep_jobs(self):
+        jobs = sweep_jobs('amp.cir', ['op'], {'r1': [1, 2], 'r2': [3, 4]},
+                          save=['V(1)'])
+        assert [job['id'] for job in jobs] == ['sweep0', 'sweep1', 'sweep2',
+                                               'sweep3']
+        assert jobs[1]['params'] == {'r1': 1, 'r2': 4}
+        assert jobs[1]['save'] == ['V(1)']
+
+    def test_monte_carlo_jobs(self):
+        jobs = monte_carlo_jobs('amp.cir', ['op'], 1000,
+                                {'r1': (1.0, 0.1)}, seed=1)
+        values = [job['params']['r1'] for job in jobs]
+        assert np.mean(values) == pytest.approx(1.0, abs=0.02)
+        assert np.std(values) == pytest.approx(0.1, abs=0.02)
+        assert monte_carlo_jobs('amp.cir', ['op'], 3, {'r1': (1.0, 0.1)},
+                                seed=1) == jobs[:3]
+
+
+class TestCoordinator:
+    def make(self, tmpdir, njobs, **kwargs):
+        jobs = sweep_jobs(netlists_path + 'param_check.net', ['op'],
+                          {'r2': list(range(njobs))})
+        return Coordinator(('localhost', 0), jobs, str(tmpdir), authkey,
+                           stream=io.StringIO(), **kwargs)
+
+    def test_reassign(self, tmpdir):
+        coordinator = self.make(tmpdir, 6, heartbeat_timeout=1)
+        address = coordinator.address
+        nodes = [threading.Thread(target=fake_node, args=(address,),
+                                  kwargs=kwargs, daemon=True)
+                 for kwargs in ({'close': True}, {'silent': True}, {})]
+        for node in nodes:
+            node.start()
+        assert coordinator.run(timeout=30) == {'ok': 6, 'failed': 0,
+                                               'skipped': 0}
+
+        for i in range(6):
+            data = np.load(str(tmpdir.join('sweep' + str(i), 'op.npz')))
+            assert data['V(1)'][0] == i
+            with open(str(tmpdir.join('sweep' + str(i), 'status.json'))) as f:
+                assert json.load(f)['status'] == 'ok'
+
+        # Finished jobs are skipped.
+        coordinator = self.make(tmpdir, 6)
+        assert coordinator.run(timeout=1)['skipped'] == 6
+
+    def test_authkey(self, tmpdir):
+        with pytest.raises(ValueError):
+            Coordinator(('localhost', 0), [], str(tmpdir))
+        with pytest.raises(SystemExit):
+            main(['coordinator', 'jobs.jsonl'])
+
+    def test_max_attempts(self, tmpdir):
+        coordinator = self.make(tmpdir, 1, max_attempts=2)
+        address = coordinator.address
+        nodes = [threading.Thread(target=fake_node, args=(address,),
+                                  kwargs={'close': True}, daemon=True)
+                 for i in range(2)]
+        for node in nodes:
+            node.start()
+        assert coordinator.run(timeout=30)['failed'] == 1
+
+    def test_nodes(self, tmpdir):
+        coordinator = self.make(tmpdir, 4)
+        processes = start_nodes(coordinator.address, 2, authkey)
+        assert coordinator.run(timeout=60)['ok'] == 4
+        for process in processes:
+            process.join(10)
+        data = np.load(str(tmpdir.join('sweep3', 'op.npz')))
+        # r1 = 1 and r2 = 3
+        assert data['V(2)'][0] == pytest.approx(0.75)
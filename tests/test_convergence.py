@@ -0,0 +1,73 @@
+import json
+import os
+import sys
+
+import pytest
+
+module_path = os.path.dirname(os.path.curdir + os.path.sep)
+sys.path.insert(0, os.path.abspath(module_path))
+
+import ngspicepy as ng
+
+from ngspicepy.convergence import RetryEngine, default_ladder, is_converged
+
+netlists_path = 'tests/netlists/'
+
+
+class TestIsConverged:
+    def test_is_converged(self):
+        assert is_converged(['Reference value : 1.0e-03'])
+        assert not is_converged(['doAnalyses: TRAN:  Timestep too small'])
+        assert not is_converged(['Warning: gmin stepping failed'])
+
+
+class TestRetryEngine:
+    def test_options(self):
+        engine = RetryEngine()
+        assert engine.options(0) == {}
+        options = engine.options(len(default_ladder) - 1)
+        assert options['gminsteps'] == 100
+        assert options['method'] == 'gear'
+
+    def test_run(self, tmpdir):
+        ng.reset()
+        cache_file = str(tmpdir.join('rungs.json'))
+        engine = RetryEngine(cache_file=cache_file)
+        plot = engine.run(netlists_path + 'diode_check.net', 'tran',
+                          '10u 2m')
+        assert isinstance(plot, ng.Plot)
+        assert plot.name == 'tran1'
+        assert engine.last_rung == 0
+        with open(cache_file) as f:
+            assert list(json.load(f).values()) == [0]
+        ng.reset()
+
+    def test_ladder(self):
+        ng.reset()
+        # The first rung can't converge within a single iteration, the
+        # second one can.
+        ladder = [{'itl1': 1, 'itl2': 1, 'gminsteps': 0, 'srcsteps': 0},
+                  {'itl1': 100, 'itl2': 50}]
+        engine = RetryEngine(ladder=ladder)
+        plot = engine.run(netlists_path + 'diode_check.net', 'dc',
+                          'v1 0 5 0.1')
+        assert engine.last_rung == 1
+        assert len(plot['v-sweep']) == 51
+        assert list(engine.rungs.values()) == [1]
+
+        engine.run(netlists_path + 'diode_check.net', 'dc', 'v1 0 5 0.1')
+        assert engine.last_rung == 1
+
+        # A rung cached for a longer ladder starts at the last rung.
+        engine.ladder = ladder[1:]
+        engine.run(netlists_path + 'diode_check.net', 'dc', 'v1 0 5 0.1')
+        assert engine.last_rung == 0
+        ng.reset()
+
+    def test_failure(self):
+        ng.reset()
+        engine = RetryEngine(ladder=[{'itl1': 1, 'itl2': 1, 'gminsteps': 0,
+                                      'srcsteps': 0}])
+        with pytest.raises(RuntimeError):
+            engine.run(netlists_path + 'diode_check.net', 'op')
+        ng.reset()
@@ -0,0 +1,88 @@
+import os
+import sys
+from ctypes import byref, c_double
+
+import numpy as np
+
+import pytest
+
+module_path = os.path.dirname(os.path.curdir + os.path.sep)
+sys.path.insert(0, os.path.abspath(module_path))
+
+import ngspicepy as ng
+
+from ngspicepy.cosim import clear_sources, raise_errors, set_source, Table
+from ngspicepy.cosim.sources import GetVSRCData
+
+netlists_path = 'tests/netlists/'
+
+
+def source_value(name, time):
+    value = c_double()
+    GetVSRCData(byref(value), time, name, 0, None)
+    return value.value
+
+
+class TestTable:
+    def test_interpolate(self):
+        table = Table([0, 1, 2], [0, 2, 0])
+        assert [table(t) for t in [-1, 0, 0.5, 1, 1.5, 2, 3]] ==\
+            [0, 0, 1, 2, 1, 0, 0]
+        # Going back in time
+        assert table(0.25) == 0.5
+
+    def test_from_function(self):
+        table = Table.from_function(np.sin, 1, 1e-3)
+        assert len(table) == 1001
+        assert table(0.5005) == pytest.approx(np.sin(0.5005), abs=1e-6)
+        assert Table.from_function(lambda t: 1.0, 1, 0.5).values ==\
+            [1.0, 1.0, 1.0]
+
+    def test_extend(self):
+        table = Table([0, 1], [0, 1])
+        table.extend([2, 3], [0, 3])
+        assert table(2.5) == 1.5
+        with pytest.raises(ValueError):
+            table.extend([1], [0])
+        with pytest.raises(ValueError):
+            Table([0, 1], [0])
+
+
+class TestSources:
+    def test_callback(self):
+        set_source('V1', Table([0, 1], [0, 1]))
+        set_source('V2', lambda t: 2 * t)
+        set_source('V3', 1.5)
+        set_source('V4', ([0, 1], [1, 0]))
+        assert source_value(b'v1', 0.5) == 0.5
+        assert source_value(b'v2', 0.5) == 1
+        assert source_value(b'v3', 0.5) == 1.5
+        assert source_value(b'v4', 0.25) == 0.75
+        raise_errors()
+
+        assert source_value(b'v5', 0.5) == 0
+        with pytest.raises(KeyError):
+            raise_errors()
+        raise_errors()
+        clear_sources()
+
+    def test_empty(self):
+        class Samples(Table):
+            pass
+
+        for waveform in [Table([], []), Samples([], []), ([], [])]:
+            with pytest.raises(ValueError):
+                set_source('V1', waveform)
+        clear_sources()
+
+    def test_tran(self):
+        ng.load_netlist(netlists_path + 'external_check.net')
+        set_source('v1', Table([0, 1e-3], [0, 2]))
+        set_source('i1', lambda t: 1.0)
+        ng.run_tran('10u', '1m')
+        t = ng.get_data('time')
+        assert ng.get_data('V(2)') == pytest.approx(t * 1e3, abs=1e-6)
+        assert ng.get_data('V(3)') == pytest.approx(2)
+        raise_errors()
+        clear_sources()
+        ng.reset()
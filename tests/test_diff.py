@@ -0,0 +1,83 @@
+import os
+import sys
+
+module_path = os.path.dirname(os.path.curdir + os.path.sep)
+sys.path.insert(0, os.path.abspath(module_path))
+
+from ngspicepy import netlist as nt
+
+import ngspicepy as ng
+
+netlists_path = 'tests/netlists/'
+
+base = ['* divider',
+        '.param gain=2',
+        '.model d1 d(is=1e-14 n=1)',
+        '.model nm nmos level=1 vto=0.7',
+        'V1 in 0 dc 1 ac 1',
+        'R1 in out 1k',
+        'D1 out 0 d1',
+        'M1 out in 0 0 nm w=1u',
+        '+ l = 1u',
+        '.subckt buf a y',
+        'R1 a y 1k',
+        '.ends',
+        '.end']
+
+
+def changed(idx, line):
+    lines = list(base)
+    lines[idx] = line
+    return lines
+
+
+class TestDiff:
+    def test_no_change(self):
+        diff = nt.NetlistDiff(base, changed(0, '* another title'))
+        assert diff.changes == []
+        assert diff.commands == []
+        assert not diff.needs_reload
+
+    def test_value(self):
+        diff = nt.NetlistDiff(base, changed(5, 'R1 in out 2k'))
+        assert diff.changes == [('value', 5, 'R1 in out 1k', 'R1 in out 2k')]
+        assert diff.commands == ['alter r1 = 2k']
+
+        diff = nt.NetlistDiff(base, changed(4, 'V1 in 0 dc 3 ac 2'))
+        assert diff.alter_commands == ['alter v1 dc = 3', 'alter v1 acmag = 2']
+
+        diff = nt.NetlistDiff(base, changed(8, '+ l=2u'))
+        assert diff.alter_commands == ['alter m1 l = 2u']
+
+        diff = nt.NetlistDiff(base, changed(3, '.model nm nmos level=1 '
+                                               'vto=0.5'))
+        assert diff.alter_commands == ['altermod nm vto = 0.5']
+
+        diff = nt.NetlistDiff(base, changed(2, '.model d1 d(is=1e-12 n=1)'))
+        assert diff.alter_commands == ['altermod d1 is = 1e-12']
+
+    def test_param(self):
+        diff = nt.NetlistDiff(base, changed(1, '.param gain=3'))
+        assert diff.changes[0][0] == 'param'
+        assert diff.commands == ['alterparam gain = 3', 'reset']
+
+        lines = changed(1, '.param gain=3')
+        lines[5] = 'R1 in out 2k'
+        diff = nt.NetlistDiff(base, lines)
+        assert diff.commands == ['alterparam gain = 3', 'reset',
+                                 'alter r1 = 2k']
+
+    def test_topology(self):
+        for idx, line in [(5, 'R1 in out2 1k'),
+                          (5, 'R2 in out 1k'),
+                          (5, 'R1 in out {2*gain}'),
+                          (6, 'D1 out 0 d2'),
+                          (3, '.model nm nmos level=2 vto=0.7'),
+                          (1, '.param gain=2 offset=1'),
+                          (10, 'R1 a y 2k')]:
+            diff = nt.NetlistDiff(base, changed(idx, line))
+            assert diff.needs_reload
+            assert diff.changes[0][0] == 'topology'
+
+        diff = nt.NetlistDiff(base, base[:-1] + ['C1 out 0 1p', '.end'])
+        assert diff.needs_reload
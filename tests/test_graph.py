@@ -0,0 +1,109 @@
+import os
+import sys
+
+import pytest
+
+module_path = os.path.dirname(os.path.curdir + os.path.sep)
+sys.path.insert(0, os.path.abspath(module_path))
+
+from ngspicepy import netlist as nt
+
+import ngspicepy as ng
+
+netlists_path = 'tests/netlists/'
+
+amp_netlist = ['* amplifier',
+               '.model nmos1 nmos level=1',
+               '.model npn1 npn',
+               'V1 vdd 0 dc 1',
+               'R1 vdd out 10k',
+               'M1 out in 0 0 nmos1 w=1u',
+               '+ l=1u',
+               'Q1 vdd out e1 npn1',
+               'C1 e1 GND 1p ; load',
+               'X1 in out buf',
+               '.subckt buf a y',
+               'R1 a mid 1k',
+               'R2 mid y 1k',
+               '.ends',
+               '.control',
+               'R9 not an element',
+               '.endc',
+               '.end']
+
+
+class TestBuild:
+    def test_nodes(self):
+        graph = nt.NetlistGraph(amp_netlist)
+        assert graph.node_names[0] == '0'
+        assert graph.node_id('gnd') == 0
+        assert graph.nodes_of('m1') == ['out', 'in', '0', '0']
+        assert graph.nodes_of('Q1') == ['vdd', 'out', 'e1']
+        assert graph.nodes_of('c1') == ['e1', '0']
+        assert graph.nodes_of('x1') == ['in', 'out']
+        assert graph.nodes_of('buf.r1') == ['buf.a', 'buf.mid']
+        with pytest.raises(KeyError):
+            graph.nodes_of('r9')
+
+    def test_elements_at(self):
+        graph = nt.NetlistGraph(amp_netlist)
+        assert graph.elements_at('OUT') == ['r1', 'm1', 'q1', 'x1']
+        assert graph.elements_at('buf.mid') == ['buf.r1', 'buf.r2']
+        assert graph.elem_lines[graph.elem_index['c1']] == 8
+        with pytest.raises(KeyError):
+            graph.elements_at('nothing')
+
+    def test_summaries(self):
+        graph = nt.NetlistGraph(amp_netlist)
+        assert graph.floating_nodes() == []
+        assert graph.type_counts() == {'V': 1, 'R': 3, 'M': 1, 'Q': 1,
+                                       'C': 1, 'X': 1}
+        assert graph.subckt_instances() == {'buf': 1}
+        assert graph.degrees()[graph.node_id('out')] == 4
+
+        graph = nt.NetlistGraph(amp_netlist[:4] + ['R2 vdd dangling 1'] +
+                                amp_netlist[-1:])
+        assert graph.floating_nodes() == ['dangling']
+
+
+class TestUpdate:
+    def test_replace_line(self):
+        net = nt.Netlist(netlists_path + 'dc_ac_check.net')
+        graph = net.get_graph()
+        assert net.get_graph() is graph
+
+        idx = graph.elem_lines[graph.elem_index['r1']]
+        name, node1, node2 = net.netlist[idx].split()[:3]
+        net.replace_line(idx, ' '.join([name, node1, 'newnode', '1k']))
+        assert net.get_graph() is graph
+        assert graph.nodes_of('r1') == [node1.lower(), 'newnode']
+        assert graph.elements_at('newnode') == ['r1']
+        assert 'r1' not in graph.elements_at(node2)
+
+    def test_rebuild(self):
+        graph = nt.NetlistGraph(amp_netlist)
+        netlist_list = list(amp_netlist)
+        netlist_list[5] = 'M1 out in 0 nmos1 w=1u'
+        graph.update_line(netlist_list, 5)
+        assert graph.nodes_of('m1') == ['out', 'in', '0', 'nmos1']
+        netlist_list[4] = 'D1 vdd out dmod'
+        graph.update_line(netlist_list, 4)
+        assert 'r1' not in graph.elem_index
+        assert graph.nodes_of('d1') == ['vdd', 'out']
+
+    def test_unused_nodes(self):
+        netlist_list = ['t', 'V1 a 0 1', 'R1 a b 1k', 'R2 b 0 1k']
+        graph = nt.NetlistGraph(netlist_list)
+        netlist_list[2] = 'R1 a c 1k'
+        graph.update_line(netlist_list, 2)
+        netlist_list[3] = 'R2 c 0 1k'
+        graph.update_line(netlist_list, 3)
+        rebuilt = nt.NetlistGraph(netlist_list)
+        assert graph.floating_nodes() == rebuilt.floating_nodes() == []
+        assert graph.node_names == rebuilt.node_names == ['0', 'a', 'c']
+        assert graph.node_ids == rebuilt.node_ids
+        assert list(graph.elem_nodes) == list(rebuilt.elem_nodes)
+        assert list(graph.degrees()) == list(rebuilt.degrees())
+        assert graph.elements_at('c') == rebuilt.elements_at('c')
+        with pytest.raises(KeyError):
+            graph.node_id('b')
@@ -50,6 +50,25 @@ class TestInit:
             nt.Netlist(netlists_path + 'dc_ac_1dot.net')
 
 
+class TestBuffer:
+    def test_buffer(self):
+        net = nt.Netlist(netlists_path + 'dc_ac_check.net')
+        buf = net.get_buffer()
+        assert buf.to_list() == net.netlist
+        assert net.get_buffer() is buf
+
+        net.netlist = net.netlist[:-1] + ['.end']
+        assert net.get_buffer() is not buf
+
+        buf = net.get_buffer()
+        net.netlist[1] = 'R1 1 2 2'
+        net.invalidate()
+        assert net.get_buffer().to_list()[1] == 'R1 1 2 2'
+
+        net = nt.Netlist(buf)
+        assert net.get_buffer() is buf
+
+
 class TestSetupSim:
     def test_setup_sim(self):
         ng.reset()
@@ -133,7 +152,8 @@ class TestGetVectors:
         net.run()
         val = net.get_vectors('dc1')
         assert len(val) == 5
-        assert isinstance(val, dict)
+        assert isinstance(val, ng.Plot)
+        assert isinstance(val.to_dict(), dict)
         ng.reset()
 
 
@@ -142,3 +162,72 @@ class TestStr:
         net = nt.Netlist(netlists_path + 'dc_ac_check.net')
         val = str(net)
         assert isinstance(val, str)
+
+
+class TestAddAnalysis:
+    def test_add_analysis(self):
+        net = nt.Netlist(netlists_path + 'dc_ac_check.net')
+        net.add_analysis('dc', 'v1 0 1 .3')
+        net.add_analysis('op')
+        net.add_analysis('dc', 'v1 0 1 .5')
+        net.add_analysis('ac', 'dec 10 1 10', name='bode')
+        assert [a[0] for a in net.analyses] == ['dc', 'op', 'dc2', 'bode']
+
+        with pytest.raises(ValueError):
+            net.add_analysis('op', name='dc')
+
+        net.clear_analyses()
+        assert net.analyses == []
+
+
+class TestRunAnalyses:
+    def test_run_analyses(self):
+        ng.reset()
+        net = nt.Netlist(netlists_path + 'dc_ac_check.net')
+        net.add_analysis('dc', 'v1 0 1 .3')
+        net.add_analysis('op')
+        net.add_analysis('ac', 'dec 10 1 10')
+        results = net.run()
+        assert list(results.keys()) == ['dc', 'op', 'ac']
+        assert len(results['dc']['v-sweep']) == 4
+        assert len(results['op']['V(1)']) == 1
+        assert results['ac']['frequency'].dtype == 'complex128'
+        assert net.get_plots() == ['ac1', 'dc1', 'op1', 'const']
+        ng.reset()
+
+    def test_failure(self):
+        ng.reset()
+        net = nt.Netlist(netlists_path + 'dc_ac_check.net')
+        net.add_analysis('op')
+        net.add_analysis('dc', 'vfoo 0 1 .1')
+        with pytest.raises(RuntimeError):
+            net.run()
+        ng.reset()
+
+
+class TestUpdate:
+    def test_update(self):
+        ng.reset()
+        lines = ['Divider', 'V1 1 0 dc 2', 'R1 1 2 1k', 'R2 2 0 1k', '.end']
+        net = nt.Netlist(lines)
+        net.setup_sim('op')
+        net.run()
+        assert net.is_loaded()
+        assert net.get_vector('V(2)')[0] == pytest.approx(1)
+
+        diff = net.update(lines[:3] + ['R2 2 0 3k', '.end'])
+        assert diff.commands == ['alter r2 = 3k']
+        assert net.is_loaded()
+        net.run()
+        assert net.get_vector('V(2)')[0] == pytest.approx(1.5)
+
+        diff = net.update(lines[:3] + ['R3 2 0 1k', '.end'])
+        assert diff.needs_reload
+        assert net.is_loaded()
+        net.run()
+        assert net.get_vector('V(2)')[0] == pytest.approx(1)
+
+        ng.load_netlist(lines)
+        assert not net.is_loaded()
+        assert net.update(lines) is None
+        ng.reset()
@@ -14,7 +14,8 @@ module_path = os.path.dirname(os.path.curdir + os.path.sep)
 sys.path.insert(0, os.path.abspath(module_path))
 import ngspicepy as ng
 
-from ngspicepy.ngspicepy import check_sim_param, to_num, vector_info, xstr
+from ngspicepy.ngspicepy import check_sim_param, NetlistBuffer, to_num,\
+    vector_info, xstr
 
 ret_val = vector_info()
 ret_val.v_name = cast(create_string_buffer(b"v-sweep"), c_char_p)
@@ -47,6 +48,18 @@ class TestSendCommand:
         assert isinstance(val, list)
         ng.reset()
 
+    def test_hook_error(self):
+        called = []
+
+        def broken(command):
+            raise ValueError(command)
+
+        hooks = [broken, called.append]
+        with mock.patch('ngspicepy.ngspicepy.command_hooks', hooks):
+            with pytest.raises(ValueError):
+                ng.send_command('echo')
+        assert called == ['echo']
+
 
 class TestGetData:
     def test_real(self):
@@ -105,6 +118,43 @@ class TestGetData:
         with pytest.raises(ValueError):
             ng.get_data('v-swoop', 'dc1')
 
+    def test_window(self):
+        ng.reset()
+        ng.load_netlist(netlists_path + 'tran_check.net')
+        ng.run_tran('1u 1m')
+        t = ng.get_data('time')
+        v = ng.get_data('V(2)')
+        t_w, v_w = ng.get_data('V(2)', t_window=(2e-4, 5e-4), with_scale=True)
+        assert t_w[0] >= 2e-4 and t_w[-1] <= 5e-4
+        assert len(t_w) == np.count_nonzero((t >= 2e-4) & (t <= 5e-4))
+        assert np.shares_memory(v_w, v)
+        assert len(ng.get_data('tran1.V(2)', t_window=(2e-4, 5e-4))) ==\
+            len(t_w)
+        ng.reset()
+
+    def test_decimate(self):
+        ng.reset()
+        ng.load_netlist(netlists_path + 'tran_check.net')
+        ng.run_tran('1u 10m')
+        v = ng.get_data('V(2)')
+        v_d = ng.get_data('V(2)', decimate=100)
+        assert len(v_d) <= 100
+        assert v_d.max() == v.max()
+        t_d, v_d = ng.get_data('V(2)', decimate=100, mode='lttb',
+                               with_scale=True)
+        assert len(t_d) == len(v_d) == 100
+
+        with pytest.raises(ValueError):
+            ng.get_data('V(2)', decimate=100, mode='foo')
+        ng.reset()
+
+        ng.load_netlist(netlists_path + 'dc_ac_check.net')
+        ng.run_ac('dec 10 1 1k')
+        with pytest.raises(TypeError):
+            ng.get_data('V(2)', decimate=10)
+        assert ng.get_scale_name() == 'frequency'
+        ng.reset()
+
     @mock.patch('ngspicepy.libngspice.ngGet_Vec_Info',
                 return_value=ret_val)
     def test_api_call(self, mock_get_info):
@@ -175,6 +225,30 @@ class TestLoadNetlist:
         out = ng.load_netlist(netlist)
         assert isinstance(out, list)
 
+    def test_bytes(self):
+        with open(netlists_path + 'dc_ac_check.net', 'rb') as f:
+            netlist = f.readlines()
+        out = ng.load_netlist(netlist)
+        assert isinstance(out, list)
+
+    def test_buffer(self):
+        with open(netlists_path + 'dc_ac_check.net') as f:
+            netlist = f.read().split('\n')
+        buf = NetlistBuffer(netlist)
+        assert len(buf) == len(netlist)
+        assert buf.to_list() == netlist
+        assert buf.lines[0] == netlist[0].encode()
+        assert buf.lines[len(netlist)] is None
+
+        ng.reset()
+        out = ng.load_netlist(buf)
+        assert isinstance(out, list)
+        ng.run_dc('v1 0 1 0.1')
+        ng.load_netlist(buf)
+        ng.run_dc('v1 0 1 0.1')
+        assert ng.get_plot_names() == ['dc2', 'dc1', 'const']
+        ng.reset()
+
     def test_invalid_filename(self):
         with pytest.raises(ValueError):
             ng.load_netlist('dummy.net')
@@ -417,3 +491,36 @@ class TestSetOptions:
         val = ng.set_options('')
         assert isinstance(val, list)
         val = ng.set_options(temp=None)
+
+
+class TestDispatcher:
+    def test_send_command(self):
+        with ng.Dispatcher() as dispatcher:
+            future = dispatcher.send_command('echo hello')
+            assert future.result() == ['hello']
+
+    def test_threads(self):
+        ng.reset()
+        dispatcher = ng.Dispatcher()
+
+        def run(step):
+            ng.load_netlist(netlists_path + 'dc_ac_check.net')
+            ng.run_dc('v1', 0, 1, step)
+            return ng.get_data('v-sweep').copy()
+
+        futures = [dispatcher.submit(run, 1 / n) for n in range(1, 11)]
+        for n, future in enumerate(futures, start=1):
+            assert len(future.result()) == n + 1
+
+        future = dispatcher.get_data('v-sweep', 'dc1')
+        assert len(future.result()) == 2
+        dispatcher.shutdown()
+        ng.reset()
+
+    def test_module_functions(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            outputs = list(pool.map(ng.send_command,
+                                    ['echo ' + str(n) for n in range(20)]))
+        assert outputs == [[str(n)] for n in range(20)]
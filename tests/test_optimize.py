@@ -0,0 +1,125 @@
+import json
+import os
+import sys
+
+import numpy as np
+
+import pytest
+
+module_path = os.path.dirname(os.path.curdir + os.path.sep)
+sys.path.insert(0, os.path.abspath(module_path))
+
+import ngspicepy as ng
+
+from ngspicepy.optimize import differential_evolution, Evaluator,\
+    nelder_mead, optimize
+
+netlists_path = 'tests/netlists/'
+
+target = np.array([0.3, 0.7])
+
+
+def quadratic(points):
+    return [(0.0, float(np.sum((u - target) ** 2))) for u in points]
+
+
+def constrained(points):
+    # The first variable must be at least 0.5.
+    return [(max(0.0, 0.5 - u[0]), float(np.sum((u - target) ** 2)))
+            for u in points]
+
+
+def broken(results):
+    raise ValueError('no score')
+
+
+def divider(results):
+    # Aim for a quarter of the supply at the output.
+    return (results['op']['V(2)'][0] - 0.25) ** 2
+
+
+class TestMethods:
+    def test_nelder_mead(self):
+        u, score = nelder_mead(quadratic, np.array([0.5, 0.5]), 200)
+        assert u == pytest.approx(target, abs=1e-3)
+        assert score[0] == 0
+
+        u, score = nelder_mead(constrained, np.array([0.9, 0.5]), 300)
+        assert u == pytest.approx([0.5, 0.7], abs=1e-3)
+        assert score[0] == 0
+
+    def test_differential_evolution(self):
+        u, score = differential_evolution(quadratic, 2, 2000, seed=1)
+        assert u == pytest.approx(target, abs=1e-3)
+
+        u, score = differential_evolution(constrained, 2, 2000, seed=1)
+        assert u == pytest.approx([0.5, 0.7], abs=1e-3)
+        assert score[0] == 0
+
+        # The same seed visits the same points.
+        u2, score2 = differential_evolution(constrained, 2, 2000, seed=1)
+        assert np.all(u == u2)
+
+
+class TestEvaluator:
+    def test_evaluator(self, tmpdir):
+        ng.reset()
+        checkpoint = str(tmpdir.join('divider.json'))
+        evaluator = Evaluator(netlists_path + 'param_check.net',
+                              {'r2': (0.1, 1.1)}, divider, [('op',)],
+                              checkpoint=checkpoint)
+        scores = evaluator([np.array([0.9]), np.array([0.9])])
+        assert scores[0] == scores[1]
+        # r2 = 1 halves the supply.
+        assert scores[0] == (0, pytest.approx(0.0625))
+        assert evaluator.nsims == 1
+        assert ng.get_plot_names() == ['const']
+
+        with open(checkpoint) as f:
+            assert json.load(f)['names'] == ['r2']
+        evaluator = Evaluator(netlists_path + 'param_check.net',
+                              {'r2': (0.1, 1.1)}, divider, [('op',)],
+                              checkpoint=checkpoint)
+        assert evaluator([np.array([0.9])]) == scores[:1]
+        assert evaluator.nsims == 0
+
+        # Failures aren't checkpointed, so a resumed search retries them.
+        checkpoint = str(tmpdir.join('broken.json'))
+        evaluator = Evaluator(netlists_path + 'param_check.net',
+                              {'r2': (0.1, 1.1)}, broken, [('op',)],
+                              checkpoint=checkpoint)
+        assert evaluator([np.array([0.5])]) == [(np.inf, np.inf)]
+        with open(checkpoint) as f:
+            assert json.load(f)['scores'] == []
+        evaluator = Evaluator(netlists_path + 'param_check.net',
+                              {'r2': (0.1, 1.1)}, broken, [('op',)],
+                              checkpoint=checkpoint)
+        evaluator([np.array([0.5])])
+        assert evaluator.nsims == 1
+
+        with pytest.raises(KeyError):
+            Evaluator(netlists_path + 'param_check.net', {'foo': (0, 1)},
+                      divider, [('op',)])
+        with pytest.raises(ValueError):
+            Evaluator(netlists_path + 'param_check.net', {'r2': (1, 0)},
+                      divider, [('op',)])
+
+
+class TestOptimize:
+    def test_optimize(self):
+        ng.reset()
+        result = optimize(netlists_path + 'param_check.net',
+                          {'r2': (0.1, 10)}, divider, [('op',)])
+        assert result.feasible
+        assert result.x['r2'] == pytest.approx(1 / 3, rel=1e-2)
+        assert result.nsims <= result.nevals
+
+    def test_workers(self):
+        result = optimize(netlists_path + 'param_check.net',
+                          {'r2': (0.1, 10)}, divider, [('op',)],
+                          method='de', workers=2, max_evals=100, seed=1)
+        assert result.x['r2'] == pytest.approx(1 / 3, rel=1e-1)
+
+        with pytest.raises(ValueError):
+            optimize(netlists_path + 'param_check.net', {'r2': (0.1, 10)},
+                     divider, [('op',)], method='bayes')
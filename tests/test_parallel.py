@@ -0,0 +1,114 @@
+import os
+import sys
+
+import numpy as np
+
+import pytest
+
+module_path = os.path.dirname(os.path.curdir + os.path.sep)
+sys.path.insert(0, os.path.abspath(module_path))
+
+import ngspicepy as ng
+
+from ngspicepy.netlist.netlist import read_netlist
+from ngspicepy.parallel import merge_ac, merge_dc, split_ac, split_dc
+from ngspicepy.worker import PlotData
+
+netlists_path = 'tests/netlists/'
+
+
+class TestSplitAC:
+    def test_dec(self):
+        assert split_ac(['dec', '10', '1', '1k'], 3) == \
+            [['dec', '10', '1', '10'], ['dec', '10', '10', '100'],
+             ['dec', '10', '100', '1k']]
+
+    def test_lin(self):
+        parts = split_ac(['lin', '11', '1k', '2k'], 3)
+        assert [part[1] for part in parts] == ['4', '5', '4']
+        assert parts[0][2] == '1k' and parts[-1][3] == '2k'
+        assert float(parts[1][2]) == pytest.approx(1300)
+
+    def test_few_points(self):
+        assert split_ac(['lin', '2', '1', '2'], 4) == [['lin', '2', '1', '2']]
+        assert len(split_ac(['dec', '1', '1', '1k'], 8)) == 3
+
+    def test_merge(self):
+        parts = [PlotData('ac2', {}, {'frequency': np.array([10., 100.]),
+                                      'v(2)': np.array([2j, 3j])}),
+                 PlotData('ac1', {}, {'frequency': np.array([1., 10.]),
+                                      'v(2)': np.array([1j, 2j])})]
+        plot = merge_ac(parts)
+        assert plot.name == 'ac1'
+        assert list(plot['frequency']) == [1., 10., 100.]
+        assert list(plot['v(2)']) == [1j, 2j, 3j]
+
+
+class TestParallelAC:
+    def test_run_ac(self):
+        ng.load_netlist(read_netlist(netlists_path + 'dc_ac_check.net'))
+        ng.run_ac('dec 10 1 1meg')
+        serial = ng.get_all_data()
+        plot = ng.run_ac('dec 10 1 1meg', workers=2)
+        assert np.allclose(plot['frequency'], serial['frequency'])
+        assert np.allclose(plot['v(2)'], serial['v(2)'])
+
+    def test_netlist(self):
+        net = ng.Netlist(netlists_path + 'dc_ac_check.net')
+        serial = net.run_ac('lin', 21, 1, 100)
+        plot = net.run_ac('lin', 21, 1, 100, workers=3)
+        assert np.allclose(plot['v(2)'], serial['v(2)'].data)
+
+    def test_failure(self):
+        net = ng.Netlist(netlists_path + 'dc_ac_check.net')
+        with pytest.raises(RuntimeError):
+            net.run_ac('dec', 10, 0, 100)
+
+    def test_file(self):
+        ng.load_netlist(netlists_path + 'dc_ac_check.net')
+        with pytest.raises(ValueError):
+            ng.run_ac('dec 10 1 1meg', workers=2)
+
+
+class TestSplitDC:
+    def test_nested(self):
+        assert split_dc(['v1', '0', '1', '0.1', 'v2', '0', '3', '1'], 2) == \
+            [(['v1', '0', '1', '0.1', 'v2', '0', '1.5', '1'], 0, 2),
+             (['v1', '0', '1', '0.1', 'v2', '1', '3', '1'], 1, 3)]
+
+    def test_single(self):
+        slices = split_dc(['v1', '1', '0', '-0.25'], 3, overlap=0)
+        assert [nvalues for args, lead, nvalues in slices] == [2, 1, 2]
+        assert slices[-1][0] == ['v1', '0.25', '0', '-0.25']
+
+    def test_merge(self):
+        slices = split_dc(['v1', '0', '1', '0.5', 'v2', '0', '2', '1'], 2)
+        plots = [PlotData('dc1', {}, {'v(2)': np.array([0., 5., 10.,
+                                                        1., 6., 11.])}),
+                 PlotData('dc2', {}, {'v(2)': np.array([1., 6., 11.,
+                                                        2., 7., 12.])})]
+        plot = merge_dc(plots, slices, True)
+        assert plot.name == 'dc1'
+        assert plot['v(2)'].tolist() == [[0., 5., 10.], [1., 6., 11.],
+                                         [2., 7., 12.]]
+
+
+class TestParallelDC:
+    def test_run_dc(self):
+        ng.load_netlist(read_netlist(netlists_path + 'dc_ac_check.net'))
+        ng.run_dc('v1 0 1 0.1 v2 0 1 0.25')
+        serial = ng.get_all_data()
+        plot = ng.run_dc('v1 0 1 0.1 v2 0 1 0.25', workers=2)
+        assert plot['v(1)'].shape == (5, 11)
+        assert np.allclose(plot['v(1)'].ravel(), serial['v(1)'])
+
+    def test_netlist(self):
+        net = ng.Netlist(netlists_path + 'dc_ac_check.net')
+        serial = net.run_dc('v1', 0, 1, 0.01)
+        plot = net.run_dc('v1', 0, 1, 0.01, workers=3)
+        assert np.allclose(plot['v(1)'], serial['v(1)'].data)
+
+    def test_failure(self):
+        net = ng.Netlist(netlists_path + 'dc_ac_check.net')
+        with pytest.raises(RuntimeError):
+            net.run_dc('vfoo', 0, 1, 0.1)
@@ -0,0 +1,149 @@
+import os
+import sys
+
+import numpy as np
+
+import pytest
+
+module_path = os.path.dirname(os.path.curdir + os.path.sep)
+sys.path.insert(0, os.path.abspath(module_path))
+
+import ngspicepy as ng
+
+from ngspicepy.ngspicepy import data_hooks, v_types
+
+netlists_path = 'tests/netlists/'
+
+
+class TestPlot:
+    def test_plot(self):
+        ng.reset()
+        ng.load_netlist(netlists_path + 'dc_ac_check.net')
+        ng.run_dc('v1 0 1 0.1')
+        plot = ng.Plot()
+        assert plot.name == 'dc1'
+        assert len(plot) == 5
+        assert list(plot) == ['v1#branch', 'v2#branch', 'V(2)', 'V(1)',
+                              'v-sweep']
+        assert 'v(1)' in plot
+        assert 'v(3)' not in plot
+        assert plot['v(1)'] is plot['V(1)']
+        assert plot.scale.name == 'v-sweep'
+
+        with pytest.raises(KeyError):
+            plot['v(3)']
+
+        data = plot.to_dict()
+        assert set(data) == set(plot)
+        assert np.all(data['V(1)'] == ng.get_data('V(1)', 'dc1'))
+        ng.reset()
+
+    def test_const(self):
+        plot = ng.Plot('const')
+        assert plot['e'].data[0] == pytest.approx(np.e)
+
+
+class TestVector:
+    def test_vector(self):
+        ng.reset()
+        ng.load_netlist(netlists_path + 'dc_ac_check.net')
+        ng.run_ac('dec 10 1 10')
+        vector = ng.Plot('ac1')['V(2)']
+        assert vector._data is None
+        assert len(vector) == 11
+        assert vector.is_complex and not vector.is_real
+        assert vector.dtype == 'complex128'
+        assert vector.v_type == v_types.SV_VOLTAGE
+        assert vector._data is None
+
+        assert np.all(np.asarray(vector) == ng.get_data('V(2)', 'ac1'))
+        assert vector[0] == vector.data[0]
+        assert vector.scale.name == 'frequency'
+        assert vector.scale.v_type == v_types.SV_FREQUENCY
+        ng.reset()
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            ng.Vector('foo', 'const')
+
+
+class TestPlotManager:
+    def test_max_plots(self):
+        ng.reset()
+        ng.load_netlist(netlists_path + 'dc_ac_check.net')
+        manager = ng.PlotManager(max_plots=2, policy='oldest')
+        manager.install()
+        for i in range(5):
+            ng.run_dc('v1 0 1 0.1')
+        manager.uninstall()
+        assert ng.get_plot_names() == ['dc5', 'dc4', 'const']
+        assert list(manager.sizes) == ['dc4', 'dc5']
+        assert manager.total_bytes == 2 * 5 * 11 * 8
+        ng.reset()
+
+    def test_max_bytes(self):
+        ng.reset()
+        ng.load_netlist(netlists_path + 'dc_ac_check.net')
+        manager = ng.PlotManager(max_bytes=2 * 5 * 11 * 8)
+        ng.run_ac('dec 10 1 10')
+        ng.run_dc('v1 0 1 0.1')
+        ng.run_dc('v1 0 1 0.1')
+        assert manager.collect() == ['ac1']
+        assert ng.get_plot_names() == ['dc2', 'dc1', 'const']
+        ng.reset()
+
+    def test_protected(self):
+        ng.reset()
+        ng.load_netlist(netlists_path + 'dc_ac_check.net')
+        manager = ng.PlotManager(max_plots=1)
+        ng.run_dc('v1 0 1 0.1')
+        ng.run_dc('v1 0 1 0.1')
+        ng.run_dc('v1 0 1 0.1')
+        ng.run_dc('v1 0 1 0.1')
+        manager.collect()
+        assert ng.get_plot_names() == ['dc4', 'const']
+
+        ng.run_dc('v1 0 1 0.1')
+        ng.run_dc('v1 0 1 0.1')
+        ng.run_dc('v1 0 1 0.1')
+        manager.pin('dc5')
+        data = manager.get_data('V(1)', 'dc6')
+        plot = manager.get_plot('dc4')
+        assert manager.collect() == []
+        assert ng.get_plot_names() == ['dc7', 'dc6', 'dc5', 'dc4', 'const']
+
+        del data
+        del plot
+        manager.unpin('dc5')
+        assert manager.collect() == ['dc4', 'dc5', 'dc6']
+        assert ng.get_plot_names() == ['dc7', 'const']
+        ng.reset()
+
+        with pytest.raises(ValueError):
+            ng.PlotManager(policy='random')
+
+    def test_outstanding(self):
+        ng.reset()
+        ng.load_netlist(netlists_path + 'dc_ac_check.net')
+        ng.run_dc('v1 0 1 0.1')
+        manager = ng.PlotManager(max_plots=1)
+        manager.install()
+        ng.run_dc('v1 0 1 0.1')
+        data = ng.get_data('V(1)')
+        ng.run_dc('v1 0 1 0.1')
+        plot = ng.Plot()
+        v = plot['V(1)'].data
+        del plot
+        ng.run_dc('v1 0 1 0.1')
+        ng.run_dc('v1 0 1 0.1')
+        # dc1 existed before install(), dc2 and dc3 are in use.
+        assert ng.get_plot_names() == ['dc5', 'dc3', 'dc2', 'dc1', 'const']
+        assert data[-1] == pytest.approx(1)
+        assert v[-1] == pytest.approx(1)
+
+        del data, v
+        ng.run_dc('v1 0 1 0.1')
+        manager.uninstall()
+        assert ng.get_plot_names() == ['dc6', 'dc1', 'const']
+        assert data_hooks == []
+        ng.reset()
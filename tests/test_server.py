@@ -0,0 +1,69 @@
+import os
+import sys
+
+import numpy as np
+
+import pytest
+
+module_path = os.path.dirname(os.path.curdir + os.path.sep)
+sys.path.insert(0, os.path.abspath(module_path))
+
+from ngspicepy.server import Client, Server
+from ngspicepy.server.server import expand_includes, parse_address,\
+    read_includes, resolve_target
+
+netlists_path = 'tests/netlists/'
+
+
+class TestHelpers:
+    def test_parse_address(self):
+        assert parse_address('localhost:9000') == ('localhost', 9000)
+        assert parse_address(':9000') == ('localhost', 9000)
+        assert parse_address('/tmp/ngspice.sock') == '/tmp/ngspice.sock'
+
+    def test_expand_includes(self, tmpdir):
+        models = tmpdir.join('models.lib')
+        models.write('* models\n.model d1 d\n\n')
+        includes = read_includes([str(models)])
+        lines = ['title', '.include "' + str(models) + '"',
+                 '.include models.lib', '.include other.lib', '.end']
+        assert expand_includes(lines, includes) ==\
+            ['title', '* models', '.model d1 d', '* models', '.model d1 d',
+             '.include other.lib', '.end']
+
+
+    def test_resolve_target(self):
+        assert resolve_target('run_tran') == 'run_tran'
+        assert callable(resolve_target('create_netlist'))
+        for target in (os.system, 'system', '__import__', 'Netlist'):
+            with pytest.raises(ValueError):
+                resolve_target(target)
+
+
+class TestServer:
+    def test_authkey(self):
+        with pytest.raises(ValueError):
+            Server(('localhost', 0))
+
+    def test_session(self, tmpdir):
+        address = str(tmpdir.join('ngspice.sock'))
+        with Server(address, nworkers=1).start():
+            with Client(address) as ng:
+                ng.load_netlist(netlists_path + 'tran_check.net')
+                ng.run_tran('1u 10m')
+                t = ng.get_data('time')
+                assert isinstance(t, np.ndarray)
+                assert t[-1] == pytest.approx(10e-3)
+
+                net = ng.Netlist(netlists_path + 'dc_ac_check.net')
+                net.setup_sim('dc', 'v1 0 1 0.1')
+                net.run()
+                assert len(net.get_vector('v-sweep')) == 11
+                assert net.get_vectors().name == 'dc1'
+                assert net.sim_type == 'dc'
+                with pytest.raises(ValueError):
+                    ng.get_data('foo')
+
+            # The plots of a session are cleared when it ends.
+            with Client(address, shared=False) as ng:
+                assert ng.get_plot_names() == ['const']
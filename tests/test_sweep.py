@@ -0,0 +1,167 @@
+import os
+import sys
+
+import numpy as np
+
+import pytest
+
+module_path = os.path.dirname(os.path.curdir + os.path.sep)
+sys.path.insert(0, os.path.abspath(module_path))
+
+import ngspicepy.sweep.adaptive as adaptive
+import ngspicepy.sweep.warmstart as warmstart
+
+from ngspicepy.sweep import adaptive_sweep, node_voltages, param_point,\
+    refine, run_points, warm_point, WarmStart
+
+netlists_path = 'tests/netlists/'
+
+
+def step(x):
+    return np.tanh(np.asarray(x) * 20)[:, None]
+
+
+def divider(results):
+    return results['op']['V(2)'][0]
+
+
+class TestRefine:
+    def test_linear(self):
+        x, y, levels, converged = refine(lambda x: 2 * x[:, None], 0, 1)
+        assert len(x) == 9
+        assert levels == 0
+        assert converged
+
+    def test_step(self):
+        x, y, levels, converged = refine(step, -1, 1, tol=1e-3,
+                                         max_points=500)
+        assert converged
+        assert np.all(np.diff(x) > 0)
+        assert y[:, 0] == pytest.approx(step(x)[:, 0])
+        # The points are dense around the step and sparse elsewhere.
+        assert np.sum(np.abs(x) < 0.2) > np.sum(np.abs(x) >= 0.2)
+        # Linear interpolation is accurate everywhere.
+        fine = np.linspace(-1, 1, 10001)
+        assert np.max(np.abs(np.interp(fine, x, y[:, 0]) -
+                             step(fine)[:, 0])) < 0.05
+
+    def test_budget(self):
+        x, y, levels, converged = refine(step, -1, 1, tol=1e-6,
+                                         max_points=30)
+        assert len(x) == 30
+        assert not converged
+
+    def test_discontinuity(self):
+        def evaluate(x):
+            return np.where(x < 0.1, 0.0, 1.0)[:, None]
+        x, y, levels, converged = refine(evaluate, -1, 1, tol=1e-3,
+                                         max_points=1000, min_step=1e-3)
+        # The interval across the step can't get narrower than min_step.
+        assert len(x) < 1000
+        assert np.min(np.diff(x)) >= 1e-3
+        assert not converged
+
+    def test_failed(self):
+        def evaluate(x):
+            y = step(x)
+            y[np.abs(x - 0.25) < 1e-9] = np.nan
+            return y
+        x, y, levels, converged = refine(evaluate, -1, 1, max_points=100)
+        assert np.sum(np.isnan(y)) == 1
+
+
+class TestAdaptiveSweep:
+    def test_source(self):
+        result = adaptive_sweep(netlists_path + 'diode_check.net', 'v1', -5,
+                                5, 'v(2)', tol=1e-3, max_points=60)
+        assert np.all(np.diff(result.x) > 0)
+        assert len(result.x) == result.nsims
+        # The diode clips the positive half, where the points gather.
+        assert result.y[-1] < 1
+        assert result.y[0] == pytest.approx(-5, abs=1e-3)
+        assert np.sum(result.x > 0) > np.sum(result.x < 0)
+
+    def test_param(self):
+        result = adaptive_sweep(netlists_path + 'param_check.net', 'r2', 0.1,
+                                10, divider, max_points=20, workers=2)
+        assert result.y == pytest.approx(result.x / (1 + result.x))
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            adaptive_sweep(netlists_path + 'diode_check.net', 'r1', 0, 1,
+                           'v(2)')
+
+
+class TestWarmStart:
+    def test_node_voltages(self):
+        vectors = {'V(1)': np.array([1.0, 2.0]), 'v(x1.out)': np.array([3.0]),
+                   'v1#branch': np.array([0.1]), 'v-sweep': np.array([0.0])}
+        assert node_voltages(vectors) == {'1': 2.0, 'x1.out': 3.0}
+
+    def test_nearest(self):
+        warm = WarmStart()
+        assert warm.nearest({'r': 1.0, 'c': 1.0}) is None
+        assert warm.lines({'r': 1.0, 'c': 1.0}) == []
+        warm.add({'r': 1.0, 'c': 1e-12}, {'1': 1.0})
+        warm.add({'r': 2.0, 'c': 2e-12}, {'1': 2.0})
+        warm.add({'r': 3.0, 'c': 1e-12}, {})
+        assert len(warm) == 2
+        # The parameters are compared relative to their ranges.
+        assert warm.nearest({'r': 1.2, 'c': 1.9e-12}) == {'1': 2.0}
+        assert warm.nearest({'r': 1.2, 'c': 1.1e-12}) == {'1': 1.0}
+        with pytest.raises(KeyError):
+            warm.nearest({'r': 1.0})
+
+    def test_apply(self):
+        warm = WarmStart('ic')
+        warm.add({'r': 1.0}, dict((str(i), float(i)) for i in range(10)))
+        lines = warm.apply(['title', 'R1 1 0 {r}', '.end'], {'r': 1.5})
+        assert lines[0] == 'title'
+        assert lines[1].startswith('.ic v(0)=0.0 v(1)=1.0')
+        assert lines[2] == '.ic v(8)=8.0 v(9)=9.0'
+        assert lines[3:] == ['R1 1 0 {r}', '.end']
+        with pytest.raises(ValueError):
+            WarmStart('op')
+
+    def test_run_points(self, monkeypatch):
+        netlists = []
+
+        def recording_point(netlist_list, analyses):
+            netlists.append(netlist_list)
+            return warm_point(netlist_list, analyses)
+
+        monkeypatch.setattr(warmstart, 'warm_point', recording_point)
+        points = [{'r2': r2} for r2 in [1, 2, 3, 4]]
+        results = run_points(netlists_path + 'param_check.net', points,
+                             [('dc', 'v1 0 1 1')])
+        assert [divider(result) for result in results] ==\
+            pytest.approx([0.5, 2 / 3, 0.75, 0.8])
+        # The first point has nothing to start from, the others start from
+        # the one before them.
+        assert not any(line.startswith('.nodeset') for line in netlists[0])
+        for netlist_list, r2 in zip(netlists[1:], [1, 2, 3]):
+            assert netlist_list[1].startswith('.nodeset v(')
+            value = netlist_list[1].split('v(2)=')[1].split()[0]
+            assert float(value) == pytest.approx(r2 / (1.0 + r2))
+
+    def test_added_op(self, monkeypatch):
+        def fake_simulate(netlist_list, analyses):
+            return {'op': {'V(2)': np.array([1.0])},
+                    'dc': {'V(2)': np.array([2.0])}}
+
+        monkeypatch.setattr(adaptive, 'simulate', fake_simulate)
+        assert param_point([], [], 'v(2)', added_op=True) == \
+            (pytest.approx([2.0]), {'2': 1.0})
+        assert param_point([], [], 'v(2)')[0] == pytest.approx([1.0])
+
+    def test_warm_sweep(self):
+        result = adaptive_sweep(netlists_path + 'param_check.net', 'r2', 0.1,
+                                10, divider, max_points=20, warm_start=True)
+        assert result.y == pytest.approx(result.x / (1 + result.x))
+
+    def test_warm_sweep_measure(self):
+        # v1 is 2 V in the dc analysis and 1 V in the added op.
+        result = adaptive_sweep(netlists_path + 'param_check.net', 'r2', 0.1,
+                                10, 'v(2)', analyses=[('dc', 'v1 2 2 1')],
+                                max_points=20, warm_start=True)
+        assert result.y == pytest.approx(2 * result.x / (1 + result.x))
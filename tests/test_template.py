@@ -0,0 +1,93 @@
+import os
+import sys
+
+import pytest
+
+module_path = os.path.dirname(os.path.curdir + os.path.sep)
+sys.path.insert(0, os.path.abspath(module_path))
+
+from ngspicepy import netlist as nt
+
+import ngspicepy as ng
+
+netlists_path = 'tests/netlists/'
+
+
+class TestInit:
+    def test__init__(self):
+        tmpl = nt.NetlistTemplate(netlists_path + 'param_check.net')
+        assert tmpl.params == ('r1', 'r2', 'vdd')
+        assert tmpl.defaults == {'r1': '1', 'vdd': '1'}
+
+        with pytest.raises(ValueError):
+            nt.NetlistTemplate(netlists_path + 'dc_ac_dot.net')
+
+
+class TestSubstitute:
+    def test_substitute(self):
+        tmpl = nt.NetlistTemplate(netlists_path + 'param_check.net')
+        lines = tmpl.substitute(r2='2k', vdd=3)
+        assert lines[1] == '.param r1=1 vdd=3'
+        assert lines[2] == 'R1 1 2 1'
+        assert lines[3] == 'R2 2 0 2k'
+        assert lines[5] == 'V1 1 0 dc 3 ac 1'
+
+        with pytest.raises(ValueError):
+            tmpl.substitute(r1=2)
+
+        with pytest.raises(KeyError):
+            tmpl.substitute(r2=1, r3=2)
+
+    def test_param_field(self):
+        # An override of a .param line that also has a field.
+        tmpl = nt.NetlistTemplate(['title', '.param r1=1 r2={rx}',
+                                   'R1 1 0 {r1}', 'R2 1 0 {r2}', '.end'])
+        lines = ['title', '.param r1=3 r2=5', 'R1 1 0 3', 'R2 1 0 5',
+                 '.end']
+        assert tmpl.substitute(rx=5, r1=3) == lines
+        assert tmpl.encode(rx=5, r1=3) == [line.encode() for line in lines]
+        # Defaults that refer to other defaults
+        tmpl = nt.NetlistTemplate(['title', '.param r1={r2} r2={rx}',
+                                   'R1 1 0 {r1}', '.end'])
+        assert tmpl.substitute(rx=2) == ['title', '.param r1=2 r2=2',
+                                         'R1 1 0 2', '.end']
+        tmpl = nt.NetlistTemplate(['title', '.param r1={r2} r2={r1}',
+                                   'R1 1 0 {r1}', '.end'])
+        with pytest.raises(ValueError):
+            tmpl.substitute()
+
+    def test_netlist(self):
+        tmpl = nt.NetlistTemplate(netlists_path + 'param_check.net')
+        net = tmpl.netlist(r2=1)
+        assert isinstance(net, nt.Netlist)
+        assert net.netlist == tmpl.substitute(r2=1)
+
+
+class TestEncode:
+    def test_encode(self):
+        tmpl = nt.NetlistTemplate(netlists_path + 'param_check.net')
+        lines = tmpl.encode(r2=1)
+        assert lines == [line.encode() for line in tmpl.substitute(r2=1)]
+
+    def test_load(self):
+        ng.reset()
+        tmpl = nt.NetlistTemplate(netlists_path + 'param_check.net')
+        ng.load_netlist(tmpl.encode(r2=1))
+        ng.run_op()
+        assert ng.get_data('V(2)')[0] == pytest.approx(0.5)
+        ng.reset()
+
+
+class TestOverrides:
+    def test_overrides(self):
+        tmpl = nt.NetlistTemplate(netlists_path + 'param_check.net')
+        lines = tmpl.overrides(r2=1, vdd=2)
+        assert lines[1] == '.param r2=1'
+        assert lines[2] == '.param r1=1 vdd=2'
+        assert lines[4] == 'R2 2 0 {r2}'
+
+        ng.reset()
+        ng.load_netlist(lines)
+        ng.run_op()
+        assert ng.get_data('V(2)')[0] == pytest.approx(1)
+        ng.reset()
@@ -0,0 +1,95 @@
+import json
+import os
+import sys
+
+import numpy as np
+
+import pytest
+
+module_path = os.path.dirname(os.path.curdir + os.path.sep)
+sys.path.insert(0, os.path.abspath(module_path))
+
+import ngspicepy.transient.checkpoint
+
+from ngspicepy.transient import checkpointed_tran, load_tran,\
+    restart_netlist, resume_tran, shift_sources
+
+netlists_path = 'tests/netlists/'
+
+
+class TestShift:
+    def test_sin(self):
+        lines = shift_sources(['title', 'V1 1 0 dc 1 SIN(1 1 10 0 0)',
+                               'R1 1 0 1'], 0.25, 1e-3, 1)
+        assert lines == ['title', 'V1 1 0 dc 1 sin(1.0 1.0 10.0 -0.25 0.0 ' +
+                         '0.0)', 'R1 1 0 1']
+
+    def test_pulse(self):
+        lines = shift_sources(['V1 1 0 pulse(0, 1, 1m)'], 2e-3, 1e-6, 1e-2)
+        assert lines == ['V1 1 0 pulse(0.0 1.0 -0.001 1e-06 1e-06 0.01 ' +
+                         '0.01)']
+
+    def test_exp(self):
+        lines = shift_sources(['I1 1 0 exp(0 1 1u 1u)'], 2e-6, 1e-6, 1e-3)
+        assert lines == ['I1 1 0 exp(0.0 1.0 -1e-06 1e-06 0.0 1e-06)']
+
+    def test_pwl(self):
+        lines = shift_sources(['V1 1 0 pwl(0 0 1 1 2 1)'], 0.5, 0.1, 2)
+        assert lines == ['V1 1 0 pwl(0.0 0.5 0.5 1.0 1.5 1.0)']
+
+    def test_unsupported(self):
+        with pytest.raises(ValueError):
+            shift_sources(['V1 1 0 sffm(0 1 1k 5 100)'], 1, 1, 10)
+        with pytest.raises(ValueError):
+            shift_sources(['V1 1 0 pwl(0 0 1 1) r=0'], 1, 1, 10)
+        with pytest.raises(ValueError):
+            shift_sources(['V1 1 0 sin(0 {amp} 1k)'], 1, 1, 10)
+
+    def test_restart(self):
+        lines = restart_netlist(['title', 'L1 1 2 1u ic=1', 'R1 2 0 1',
+                                 '.end'], 0.5, {'1': 0.5, '2': 0.25},
+                                {'l1': 0.1}, 0.1, 1)
+        assert lines == ['title', '.ic v(1)=0.5 v(2)=0.25',
+                         'L1 1 2 1u ic=0.1', 'R1 2 0 1', '.end']
+
+
+class TestCheckpoint:
+    def test_segments(self, tmpdir):
+        checkpoint = str(tmpdir.join('rc'))
+        whole = checkpointed_tran(netlists_path + 'tran_check.net', '1m',
+                                  '1', str(tmpdir.join('whole')), segment=1)
+        vectors = checkpointed_tran(netlists_path + 'tran_check.net', '1m',
+                                    '1', checkpoint, segment='250m')
+        with open(os.path.join(checkpoint, 'state.json')) as f:
+            assert json.load(f)['nsegments'] == 4
+        t = vectors['time']
+        assert t[0] == 0 and t[-1] == pytest.approx(1)
+        assert np.all(np.diff(t) > 0)
+        assert np.interp(t, whole['time'], whole['V(2)']) ==\
+            pytest.approx(vectors['V(2)'], abs=1e-2)
+
+    def test_resume(self, tmpdir, monkeypatch):
+        checkpoint = str(tmpdir.join('rc'))
+        run_segment = ngspicepy.transient.checkpoint.run_segment
+        calls = []
+
+        def crash(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 3:
+                raise RuntimeError('preempted')
+            return run_segment(*args, **kwargs)
+
+        monkeypatch.setattr(ngspicepy.transient.checkpoint, 'run_segment',
+                            crash)
+        with pytest.raises(RuntimeError):
+            checkpointed_tran(netlists_path + 'tran_check.net', '1m', '1',
+                              checkpoint, segment='250m')
+        assert load_tran(checkpoint)['time'][-1] == pytest.approx(0.5)
+
+        vectors = resume_tran(checkpoint)
+        assert len(calls) == 5
+        assert vectors['time'][-1] == pytest.approx(1)
+
+        with pytest.raises(ValueError):
+            checkpointed_tran(netlists_path + 'tran_check.net', '1m', '2',
+                              checkpoint)
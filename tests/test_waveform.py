@@ -0,0 +1,180 @@
+import os
+import sys
+
+import numpy as np
+
+import pytest
+
+module_path = os.path.dirname(os.path.curdir + os.path.sep)
+sys.path.insert(0, os.path.abspath(module_path))
+
+from ngspicepy.waveform import lttb, minmax, periodic_grid, resample,\
+    spectral_analysis, spectral_plan, Spectrum, window
+
+t = np.linspace(0, 1, 100001)
+y = np.sin(2 * np.pi * 5 * t)
+
+
+class TestWindow:
+    def test_window(self):
+        assert window(t, 0.25, 0.5) == (25000, 50001)
+        assert window(t, None, 0.5) == (0, 50001)
+        assert window(t, 0.25, None) == (25000, 100001)
+        assert window(t, 2, 3) == (100001, 100001)
+
+    def test_descending(self):
+        start, stop = window(t[::-1], 0.25, 0.5)
+        assert (start, stop) == (50000, 75001)
+        assert t[::-1][start] == 0.5
+        assert t[::-1][stop - 1] == 0.25
+
+
+class TestMinmax:
+    def test_minmax(self):
+        t_d, y_d = minmax(t, y, 1000)
+        assert len(t_d) == len(y_d) <= 1000
+        assert y_d.max() == y.max()
+        assert y_d.min() == y.min()
+        assert np.all(np.diff(t_d) >= 0)
+        assert np.all(np.interp(t_d, t, y) == y_d)
+
+    def test_short(self):
+        t_d, y_d = minmax(t[:10], y[:10], 1000)
+        assert np.all(y_d == y[:10])
+
+        with pytest.raises(ValueError):
+            minmax(t, y, 1)
+
+
+class TestLttb:
+    def test_lttb(self):
+        t_d, y_d = lttb(t, y, 1000)
+        assert len(t_d) == len(y_d) == 1000
+        assert t_d[0] == t[0] and t_d[-1] == t[-1]
+        assert np.all(np.diff(t_d) > 0)
+        assert y_d.max() == pytest.approx(1, abs=1e-6)
+
+        with pytest.raises(ValueError):
+            lttb(t, y, 2)
+
+
+class TestResample:
+    def test_resample(self):
+        t1 = np.linspace(0, 1, 101)
+        random = np.random.RandomState(0)
+        t2 = np.sort(np.concatenate(([0, 1], random.rand(500))))
+        plots = [{'time': t1, 'a': t1, 'b': 2 * t1},
+                 {'time': t2, 'a': 3 * t2, 'b': 1 - t2}]
+        grid, data = resample(plots, ['a', 'b'], npoints=11)
+        assert data.shape == (2, 2, 11)
+        assert np.allclose(grid, np.linspace(0, 1, 11))
+        assert np.allclose(data[0, 0], grid)
+        assert np.allclose(data[0, 1], 2 * grid)
+        assert np.allclose(data[1, 0], 3 * grid)
+        assert np.allclose(data[1, 1], 1 - grid)
+
+    def test_grid_out(self):
+        plots = [{'time': t, 'y': y}] * 3
+        grid = np.linspace(0.1, 0.2, 7)
+        out = np.zeros((3, 1, 7))
+        grid_r, data = resample(plots, ['y'], grid=grid, out=out)
+        assert data is out
+        assert np.allclose(out[2, 0], np.sin(2 * np.pi * 5 * grid))
+
+        with pytest.raises(ValueError):
+            resample(plots, ['y'], grid=grid, out=np.zeros((2, 1, 7)))
+
+        with pytest.raises(ValueError):
+            resample(plots, ['y'])
+
+    def test_plots(self):
+        import ngspicepy as ng
+
+        ng.reset()
+        ng.load_netlist('tests/netlists/tran_check.net')
+        ng.run_tran('1u 1m')
+        ng.run_tran('2u 1m')
+        grid, data = resample(['tran1', 'tran2'], ['V(1)', 'V(2)'],
+                              npoints=100)
+        assert data.shape == (2, 2, 100)
+        assert np.allclose(data[0], data[1], atol=1e-2)
+        ng.reset()
+
+
+class TestSpectral:
+    def signal(self, t, distortion=0.01):
+        return 0.5 + np.sin(2 * np.pi * 1e3 * t) +\
+            distortion * np.sin(2 * np.pi * 3e3 * t + 0.3)
+
+    def test_metrics(self):
+        t = periodic_grid(1e3, 4, 1024, 4e-3)
+        assert t[0] == 0 and t[1] == pytest.approx(4e-3 / 1024)
+        data = np.stack([self.signal(t), self.signal(t, 0.1)])
+        for window in ['rectangular', 'hanning', 'hamming']:
+            spectrum = Spectrum(data, 1e3, 4, window=window)
+            assert spectrum.dc == pytest.approx([0.5, 0.5])
+            assert spectrum.harmonics[:, :3] == pytest.approx(
+                np.array([[1, 0, 0.01], [1, 0, 0.1]]), abs=1e-9)
+            assert spectrum.thd == pytest.approx([0.01, 0.1])
+            assert spectrum.sfdr == pytest.approx([40, 20])
+            assert spectrum.sndr == pytest.approx([40, 20], abs=1e-6)
+        assert spectrum.frequencies[4] == 1e3
+        # A window spreads the power over the bins of its main lobe.
+        assert spectrum.power[0, 4] < 0.5
+        assert Spectrum(data, 1e3, 4).power[0, 4] == pytest.approx(0.5)
+
+        with pytest.raises(ValueError):
+            Spectrum(data, 1e3, 4, window='kaiser')
+        with pytest.raises(ValueError):
+            Spectrum(data, 1e3, 512)
+
+    def test_window_periods(self):
+        # The main lobes of DC and of the harmonics would overlap.
+        for window, nperiods in [('hanning', 2), ('hamming', 1),
+                                 ('blackman', 6)]:
+            t = periodic_grid(1e3, nperiods, 1024, nperiods * 1e-3)
+            with pytest.raises(ValueError):
+                Spectrum(self.signal(t), 1e3, nperiods, window=window)
+        t = periodic_grid(1e3, 7, 1024, 7e-3)
+        spectrum = Spectrum(self.signal(t), 1e3, 7, window='blackman')
+        assert spectrum.harmonics[:3] == pytest.approx([1, 0, 0.01],
+                                                       abs=1e-9)
+        assert spectrum.sndr == pytest.approx(40, abs=1e-6)
+
+    def test_windows(self):
+        # Known tones on a grid wide enough for every main lobe.
+        t = periodic_grid(1e3, 8, 2048, 8e-3)
+        data = 0.5 + np.sin(2 * np.pi * 1e3 * t) +\
+            0.01 * np.sin(2 * np.pi * 2e3 * t + 0.3) +\
+            0.001 * np.sin(2 * np.pi * 5e3 * t)
+        for window in ['rectangular', 'hanning', 'hamming', 'blackman']:
+            spectrum = Spectrum(data, 1e3, 8, window=window)
+            assert spectrum.dc == pytest.approx(0.5)
+            assert spectrum.harmonics[:5] == pytest.approx(
+                np.array([1, 0.01, 0, 0, 0.001]), abs=1e-12)
+            assert spectrum.thd == pytest.approx(np.hypot(0.01, 0.001))
+            assert spectrum.sfdr == pytest.approx(40)
+
+    def test_enob(self):
+        t = periodic_grid(1e3, 7, 4096, 1)
+        quantized = np.round(np.sin(2 * np.pi * 1e3 * t) * 2 ** 9) / 2 ** 9
+        assert Spectrum(quantized, 1e3, 7).enob == pytest.approx(10, abs=0.1)
+
+    def test_plan_cache(self):
+        spectral_plan.cache_clear()
+        t = periodic_grid(1e3, 4, 1024, 4e-3)
+        Spectrum(self.signal(t), 1e3, 4)
+        Spectrum(self.signal(t), 1e3, 4)
+        assert spectral_plan.cache_info().hits == 1
+
+    def test_analysis(self):
+        plots = []
+        for seed in range(3):
+            t = np.sort(np.random.RandomState(seed).uniform(0, 5e-3, 20000))
+            t[0], t[-1] = 0, 5e-3
+            plots.append({'time': t, 'v': self.signal(t)})
+        spectrum = spectral_analysis(plots, ['v'], 1e3, nperiods=2,
+                                     npoints=512)
+        assert spectrum.thd.shape == (3, 1)
+        assert spectrum.thd == pytest.approx(0.01, abs=1e-3)
+        assert spectrum.dc == pytest.approx(0.5, abs=1e-3)
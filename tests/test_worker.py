@@ -0,0 +1,116 @@
+import ctypes
+import gc
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+
+import pytest
+
+module_path = os.path.dirname(os.path.curdir + os.path.sep)
+sys.path.insert(0, os.path.abspath(module_path))
+
+import ngspicepy as ng
+
+from ngspicepy.worker import pack, PlotData, unpack
+from ngspicepy.worker.transport import discard, Packed, segment_name,\
+    shared_memory
+
+netlists_path = 'tests/netlists/'
+
+
+def crash():
+    ctypes.string_at(0)
+
+
+def hang():
+    time.sleep(60)
+
+
+def sweep(step):
+    ng.load_netlist(netlists_path + 'dc_ac_check.net')
+    ng.run_dc('v1', 0, 1, step)
+    return ng.Plot()
+
+
+class TestWorker:
+    def test_api(self):
+        with ng.Worker() as worker:
+            worker.load_netlist(netlists_path + 'tran_check.net')
+            worker.run_tran('1u 10m')
+            assert worker.get_plot_names() == ['tran1', 'const']
+            t = worker.get_data('time')
+            assert isinstance(t, np.ndarray)
+            assert t[-1] == pytest.approx(10e-3)
+            assert worker.restarts == 0
+
+            with pytest.raises(AttributeError):
+                worker.Netlist
+
+            with pytest.raises(ValueError):
+                worker.get_data('foo')
+
+    def test_call(self):
+        with ng.Worker() as worker:
+            plot = worker.call(sweep, 0.1)
+            assert isinstance(plot, PlotData)
+            assert plot.name == 'dc1'
+            assert len(plot['v-sweep']) == 11
+
+    def test_crash(self):
+        warmup = [('load_netlist', (netlists_path + 'dc_ac_check.net',), {})]
+        with ng.Worker(warmup=warmup) as worker:
+            with pytest.raises(RuntimeError):
+                worker.call(crash)
+            assert worker.restarts == 1
+            # The new worker was warmed up.
+            worker.run_dc('v1 0 1 0.1')
+            assert worker.current_plot() == 'dc1'
+
+    def test_hang(self):
+        with ng.Worker(timeout=2) as worker:
+            with pytest.raises(TimeoutError):
+                worker.call(hang)
+            assert worker.restarts == 1
+            assert worker.send_command('echo hello') == ['hello']
+
+
+class TestTransport:
+    def test_pack(self):
+        small = np.ones(3)
+        assert isinstance(pack({'a': small})['a'], np.ndarray)
+
+        result = {'a': np.arange(100000.0),
+                  'b': [np.ones(10000, dtype=complex), small],
+                  'plot': PlotData('tran1', {'time': 1},
+                                   {'time': np.linspace(0, 1, 10000)})}
+        packed = pack(result)
+        assert isinstance(packed, Packed)
+        # The arrays share one segment.
+        assert packed.size >= 800000 + 160000 + 80000
+
+        data = unpack(pickle.loads(pickle.dumps(packed)))
+        assert np.all(data['a'] == result['a'])
+        assert not data['a'].flags.owndata
+        assert data['b'][0].dtype == np.complex128
+        assert np.all(data['b'][1] == small)
+        assert data['plot'].name == 'tran1'
+        assert data['plot'].v_types == {'time': 1}
+
+        # Views keep the segment alive.
+        view = data['a'][10:20]
+        del data
+        gc.collect()
+        assert view[0] == 10
+
+    def test_discard(self):
+        name = segment_name()
+        packed = pack({'a': np.arange(100000.0)}, name)
+        assert packed.name == name
+        discard(name)
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+        # Discarding a missing or unpacked segment does nothing.
+        discard(name)